@@ -0,0 +1,91 @@
+"""
+Benchmark do interpretador.
+
+Uso
+---
+    python benchmark.py [repeticoes]
+
+Mede o tempo médio por instrução de alguns programas, para comparar \
+    o custo de cada tipo de instrução (ex: desvios x aritmética).
+
+A quantidade de instruções é a contada pelo interpretador \
+    (``instrucoes_executadas``), com o HALT.
+
+A última coluna é o tempo por instrução com o histórico da execução \
+    reversa ligado (``HistoricoExecucao``), para medir o custo de gravar.
+"""
+
+import sys
+import time
+from interpretador_assembly.execucao_reversa import HistoricoExecucao
+from interpretador_assembly.interpretador_assembly import InterpretadorAssembly
+
+VOLTAS = 1000
+
+# (nome, código)
+PROGRAMAS = [
+    (
+        "sequencial",
+        "MOVE A, 0\n" + "ADD A, 1\n" * VOLTAS + "HALT",
+    ),
+    (
+        "laco_jfalse",
+        f"""
+            MOVE    A, 0
+    laco:   ADD     A, 1
+            CMP     A, {VOLTAS}
+            JFALSE  laco
+            HALT
+        """,
+    ),
+    (
+        "laco_jtrue_jump",
+        f"""
+            MOVE    A, 0
+    laco:   ADD     A, 1
+            CMP     A, {VOLTAS}
+            JTRUE   fim
+            JUMP    laco
+    fim:    HALT
+        """,
+    ),
+    (
+        "saltos",
+        "".join(f"s{i}: JUMP s{i + 1}\n" for i in range(VOLTAS)) + f"s{VOLTAS}: HALT",
+    ),
+]
+
+
+def medir(codigo:str, repeticoes:int, historico=False):
+    """
+    Retorna ``(tempo, instrucoes)``: o menor tempo, em segundos, de \
+        executar o código e quantas instruções foram executadas.
+
+    ``historico``: grava o histórico da execução reversa
+    """
+    interpretador = InterpretadorAssembly()
+    interpretador.executar_validacao(codigo)
+    interpretador.carregar_codigo(codigo)
+    historico_execucao = HistoricoExecucao(interpretador) if historico else None
+
+    melhor_tempo = float("inf")
+    for _ in range(repeticoes):
+        interpretador.reiniciar_estado()
+        if historico_execucao is not None:
+            historico_execucao.ligar()
+        inicio = time.perf_counter()
+        interpretador.executar_codigo()
+        melhor_tempo = min(melhor_tempo, time.perf_counter() - inicio)
+    return melhor_tempo, interpretador.instrucoes_executadas
+
+
+if __name__ == "__main__":
+    REPETICOES = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    print(f"{'programa':<20}{'instruções':>12}{'total (ms)':>12}{'ns/instrução':>14}"
+          f"{'com histórico':>15}")
+    for nome, codigo in PROGRAMAS:
+        tempo, quantidade = medir(codigo, REPETICOES)
+        tempo_historico, _ = medir(codigo, REPETICOES, historico=True)
+        print(f"{nome:<20}{quantidade:>12}{tempo * 1e3:>12.3f}{tempo / quantidade * 1e9:>14.1f}"
+              f"{tempo_historico / quantidade * 1e9:>15.1f}")
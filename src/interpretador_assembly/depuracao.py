@@ -0,0 +1,315 @@
+"""
+Pontos de parada (breakpoints) e observação (watchpoints).
+
+Em vez de conferir cada ``set_operator``, o ``Depurador`` analisa os \
+    operandos do programa carregado e troca, em ``instrucoes_decodificadas``, \
+    só as instruções que podem mexer nos locais observados (pelas \
+    ``escritas`` e ``efeitos`` de cada mnemônico) por uma versão \
+    instrumentada. O laço de execução não muda, e o resto do programa \
+    roda na velocidade normal.
+
+- Ponto de parada: índice de instrução ou label, dispara antes de executar
+- Observação: endereço de memória, variável do VAR ou registrador, \
+    dispara quando o valor muda
+
+Cada ponto tem uma ``acao``, chamada com o evento. Sem ``acao``, \
+    a execução pausa e ``continuar()`` retorna o evento.
+
+Exemplo
+---
+```python
+depurador = Depurador(interpretador)
+depurador.adicionar_ponto_parada("fim")
+depurador.observar("valor", acao=print)
+evento = depurador.continuar()   # pausa em "fim"
+evento = depurador.continuar()   # None: terminou
+```
+"""
+
+from interpretador_assembly.erros.execucao_pausada import ExecucaoPausada
+from interpretador_assembly.instrumentacao import MnemonicoEnvolvido, desenvolver, envolver
+
+# valor de registrador que ainda não existe
+AUSENTE = object()
+
+
+class MnemonicoInstrumentado(MnemonicoEnvolvido):
+    """
+    Envolve o mnemônico de uma instrução: confere os pontos de parada \
+        antes de executar e os valores observados depois.
+    """
+
+    # por fora do histórico: a pausa acontece antes de gravar a instrução
+    ordem = 2
+
+    def __init__(self, depurador, indice:int, parada:bool, observacoes:list):
+        super().__init__()
+        self.depurador = depurador
+        self.indice = indice
+        self.parada = parada
+        self.observacoes = observacoes
+
+    def executar(self, interpretador_assembly, params:list):
+        depurador = self.depurador
+        if self.parada:
+            if depurador.retomar_em == self.indice:
+                depurador.retomar_em = None
+            else:
+                depurador.disparar_parada(self.indice)
+
+        antes = [observacao.ler(interpretador_assembly) for observacao in self.observacoes]
+        tomado = self.original.executar(interpretador_assembly, params)
+
+        for observacao, valor_anterior in zip(self.observacoes, antes):
+            valor_atual = observacao.ler(interpretador_assembly)
+            if valor_atual != valor_anterior:
+                depurador.disparar_observacao(self.indice, observacao, valor_anterior,
+                                              valor_atual, tomado)
+        return tomado
+
+
+class Observacao:
+    """
+    Local observado: ``("memoria", endereco)`` ou ``("registrador", nome)``.
+    """
+
+    def __init__(self, tipo:str, local, nome:str, acao=None):
+        self.tipo = tipo
+        self.local = local
+        self.nome = nome
+        self.acao = acao
+
+    def ler(self, interpretador):
+        "Valor atual do local observado"
+        if self.tipo == "memoria":
+            return interpretador.memory[self.local]
+        return interpretador.registers.get(self.local, AUSENTE)
+
+
+class Depurador:
+    """
+    Pontos de parada e observação de um interpretador com programa carregado.
+
+    ``indices_instrumentados``: instruções trocadas pela versão instrumentada
+    """
+
+    def __init__(self, interpretador):
+        self.interpretador = interpretador
+        self.pontos_parada = {}     # {indice: acao}
+        self.observacoes = []
+        self.envoltorios = {}       # {indice: MnemonicoInstrumentado}
+        self.programa = None
+        self.retomar_em = None
+
+    @property
+    def indices_instrumentados(self):
+        "Índices das instruções instrumentadas, em ordem"
+        return sorted(self.envoltorios)
+
+    def adicionar_ponto_parada(self, local, acao=None):
+        "Ponto de parada numa instrução (índice ou label)"
+        self.pontos_parada[self.resolver_instrucao(local)] = acao
+        self.instrumentar()
+
+    def remover_ponto_parada(self, local):
+        "Remove o ponto de parada"
+        self.pontos_parada.pop(self.resolver_instrucao(local), None)
+        self.instrumentar()
+
+    def observar(self, local, acao=None):
+        """
+        Observa um local: endereço de memória (número), variável do VAR \
+            ou registrador (qualquer outro nome).
+        """
+        local = str(local)
+        if local.isnumeric():
+            observacao = Observacao("memoria", int(local), f"[{local}]", acao)
+        else:
+            enderecos = self.enderecos_possiveis(local)
+            if len(enderecos) > 1:
+                raise ValueError(f"variable '{local}' is bound to more than one address")
+            if enderecos:
+                observacao = Observacao("memoria", enderecos.pop(), local, acao)
+            else:
+                observacao = Observacao("registrador", local, local, acao)
+
+        self.observacoes.append(observacao)
+        self.instrumentar()
+        return observacao
+
+    def remover_observacao(self, observacao:Observacao):
+        "Remove a observação retornada por ``observar()``"
+        self.observacoes.remove(observacao)
+        self.instrumentar()
+
+    def remover_tudo(self):
+        "Remove todos os pontos e devolve o programa original"
+        self.pontos_parada = {}
+        self.observacoes = []
+        self.instrumentar()
+
+    def resolver_instrucao(self, local):
+        "Índice da instrução (não vazia), a partir do índice ou de uma label"
+        if isinstance(local, int) or str(local).isnumeric():
+            indice = int(local)
+        elif local in self.interpretador.labels:
+            indice = self.interpretador.labels[local]
+        else:
+            raise ValueError(f"label '{local}' is not defined")
+        programa = self.interpretador.instrucoes_decodificadas
+        if not 0 <= indice < len(programa):
+            raise ValueError(f"instruction {indice} is out of the program")
+
+        # label sozinha na linha: para na próxima instrução
+        while indice + 1 < len(programa) and programa[indice] is None:
+            indice += 1
+        return indice
+
+    def variaveis_do_programa(self):
+        "``{nome: {enderecos}}`` dos VAR do programa e das variáveis já vinculadas"
+        variaveis = {}
+        for instrucao in self.interpretador.instrucoes_decodificadas:
+            if instrucao is None or instrucao[1] is None or len(instrucao[2]) != 2:
+                continue
+            efeitos = instrucao[1].efeitos or ()
+            nome, endereco = instrucao[2]
+            if "vincula_variavel" in efeitos and str(endereco).isnumeric():
+                variaveis.setdefault(nome, set()).add(int(endereco))
+        for nome, endereco in self.interpretador.variaveis.items():
+            variaveis.setdefault(nome, set()).add(endereco)
+        return variaveis
+
+    def enderecos_possiveis(self, operando:str, variaveis=None):
+        "Endereços de memória que o operando pode acessar"
+        if variaveis is None:
+            variaveis = self.variaveis_do_programa()
+        enderecos = set(variaveis.get(operando, ()))
+        if operando in self.interpretador.labels:
+            enderecos.add(self.interpretador.labels[operando])
+        return enderecos
+
+    def pode_alterar(self, instrucao, observacao:Observacao, variaveis:dict):
+        """
+        Se a instrução pode mudar o local observado, pelos operandos \
+            e pelas ``escritas`` e ``efeitos`` declarados no mnemônico.
+
+        Mnemônicos sem ``escritas`` ou ``efeitos`` declarados sempre \
+            são instrumentados.
+        """
+        _, mnemonico, parametros = instrucao
+        if mnemonico is None:
+            return False
+        escritas = mnemonico.escritas
+        efeitos = mnemonico.efeitos_instrucao(parametros)
+        if escritas is None or efeitos is None:
+            return True
+
+        nomes_parametros = [parametro["nome"] for parametro in mnemonico.parametros]
+        operandos_escritos = [operando for nome, operando in zip(nomes_parametros, parametros)
+                              if nome in escritas and isinstance(operando, str)]
+
+        if observacao.tipo == "registrador":
+            return observacao.local in operandos_escritos or observacao.local in escritas
+
+        if "memoria_indireta" in efeitos or "memoria_bloco" in efeitos:
+            return True
+        for operando in operandos_escritos:
+            if operando.isnumeric():
+                if int(operando) == observacao.local:
+                    return True
+            elif observacao.local in self.enderecos_possiveis(operando, variaveis):
+                return True
+        return False
+
+    def instrumentar(self):
+        "Tira a instrumentação do depurador e instrumenta as instruções que precisam"
+        programa = self.interpretador.instrucoes_decodificadas
+        if self.programa is programa:
+            for indice, envoltorio in self.envoltorios.items():
+                desenvolver(programa, indice, envoltorio)
+        self.programa = programa
+        self.envoltorios = {}
+
+        variaveis = self.variaveis_do_programa()
+        for indice, instrucao in enumerate(programa):
+            if instrucao is None:
+                continue
+            observacoes = [observacao for observacao in self.observacoes
+                           if self.pode_alterar(instrucao, observacao, variaveis)]
+            parada = indice in self.pontos_parada
+            if not observacoes and not parada:
+                continue
+
+            if instrucao[1] is None:
+                continue
+            self.envoltorios[indice] = envolver(
+                programa, indice, MnemonicoInstrumentado(self, indice, parada, observacoes))
+
+    def evento(self, tipo:str, indice:int, **dados):
+        "Monta o evento passado para a ação ou retornado pela pausa"
+        return {
+            "tipo": tipo,
+            "indice": indice,
+            "instrucao": self.interpretador.instrucoes[indice].strip(),
+            **dados,
+        }
+
+    def disparar_parada(self, indice:int):
+        "Chama a ação do ponto de parada, ou pausa antes de executar a instrução"
+        evento = self.evento("parada", indice)
+        acao = self.pontos_parada.get(indice)
+        if acao is not None:
+            acao(evento)
+            return
+
+        # a instrução volta a ser contada quando a execução continuar
+        self.interpretador.contagem_instrucoes[indice] -= 1
+        self.interpretador.instrucoes_executadas -= 1
+        self.retomar_em = indice
+        raise ExecucaoPausada(evento)
+
+    def disparar_observacao(self, indice:int, observacao:Observacao, anterior, atual,
+                            tomado=None):
+        """
+        Chama a ação da observação, ou pausa depois de executar a instrução.
+
+        ``tomado``: retorno do ``executar()`` da instrução (desvio tomado)
+        """
+        evento = self.evento("observacao", indice, local=observacao.nome,
+                             anterior=None if anterior is AUSENTE else anterior, atual=atual)
+        if observacao.acao is not None:
+            observacao.acao(evento)
+            return
+
+        # faz o que o laço de execução faria depois da instrução
+        interpretador = self.interpretador
+        if tomado:
+            interpretador.contagem_desvios_tomados[indice] += 1
+        interpretador.linha_codigo += 1
+        raise ExecucaoPausada(evento)
+
+    def continuar(self, limite_instrucoes=None):
+        """
+        Executa (ou continua) o programa até terminar ou pausar.
+
+        Retorna o evento da pausa, ou None se o programa terminou.
+        """
+        if self.programa is not self.interpretador.instrucoes_decodificadas:
+            self.instrumentar()
+
+        try:
+            self.interpretador.executar_codigo(limite_instrucoes)
+        except ExecucaoPausada as pausa:
+            return pausa.evento
+
+        # o HALT para o laço antes de executar o mnemônico
+        indice = self.interpretador.linha_codigo
+        if indice in self.pontos_parada and self.retomar_em != indice:
+            self.retomar_em = indice
+            evento = self.evento("parada", indice)
+            acao = self.pontos_parada[indice]
+            if acao is None:
+                return evento
+            acao(evento)
+        self.retomar_em = None
+        return None
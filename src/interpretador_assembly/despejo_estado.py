@@ -0,0 +1,300 @@
+"""
+Despejo (dump) do estado da máquina: registradores, linha e memória.
+
+O ``print(interpretador)`` formata a memória inteira, todas as instruções \
+    e labels numa string só. Aqui o despejo é limitado e escrito direto \
+    no arquivo, célula por célula, sem montar a string inteira.
+
+Filtros
+---
+- ``inicio``, ``fim``: intervalo de endereços ``[inicio, fim)``
+- ``nao_zero``: só células diferentes de 0
+- ``desde``: só o que mudou desde um ``Instantaneo`` (``capturar()``). \
+    Toda célula que mudou aparece, mesmo com ``nao_zero``: uma célula \
+    zerada depois do instantâneo também é uma mudança
+
+Formatos
+---
+- ``json``: ``{"linha_codigo", "registradores", "memoria": {endereco: valor}}``
+- ``hex``: linhas de 8 células, como um hexdump; células fora do filtro \
+    aparecem como ``--``
+- ``binario``: compacto, lido de volta com ``ler_binario()``
+
+```
+cabeçalho     "<4sHIII"  IAED, versão, linha_codigo, registradores, células
+registrador   "<H" + nome UTF-8 + valor
+célula        "<I" endereço + valor
+valor         "<B" tipo + "<q" (inteiro), "<d" (real) ou "<I" + texto UTF-8 (repr)
+```
+
+Exemplo
+---
+```python
+antes = capturar(interpretador)
+interpretador.executar_codigo()
+with open("estado.json", "w", encoding="utf-8") as arquivo:
+    escrever_json(interpretador, arquivo, desde=antes)
+```
+"""
+
+import json
+import struct
+from ast import literal_eval
+from itertools import compress
+from operator import ne
+from interpretador_assembly.erros.despejo_invalido_error import DespejoInvalidoError
+
+ASSINATURA = b"IAED"
+VERSAO = 1
+
+CABECALHO = struct.Struct("<4sHIII")
+TAMANHO_NOME = struct.Struct("<H")
+ENDERECO = struct.Struct("<I")
+TIPO = struct.Struct("<B")
+INTEIRO = struct.Struct("<q")
+REAL = struct.Struct("<d")
+TAMANHO_TEXTO = struct.Struct("<I")
+
+TIPO_INTEIRO = 0
+TIPO_REAL = 1
+TIPO_OUTRO = 2
+
+CELULAS_POR_LINHA = 8
+
+FORMATOS = ("json", "hex", "binario")
+
+
+class Instantaneo:
+    "Cópia da memória e dos registradores, para o filtro ``desde``"
+
+    def __init__(self, memoria:list, registradores:dict, linha_codigo:int):
+        self.memoria = memoria
+        self.registradores = registradores
+        self.linha_codigo = linha_codigo
+
+
+def capturar(interpretador):
+    "Guarda o estado atual, para despejar só o que mudar depois"
+    return Instantaneo(list(interpretador.memory), dict(interpretador.registers),
+                       interpretador.linha_codigo)
+
+
+def celulas(memoria:list, inicio=0, fim=None, nao_zero=False, desde=None):
+    """
+    Gera ``(endereco, valor)`` das células da memória que passam nos filtros.
+
+    Só a fatia ``[inicio, fim)`` é copiada, não a memória inteira. Com \
+        ``desde``, ``nao_zero`` não tira as células que mudaram para 0.
+    """
+    fim = len(memoria) if fim is None else min(fim, len(memoria))
+    inicio = max(inicio, 0)
+    if inicio >= fim:
+        return
+
+    valores = memoria[inicio:fim]
+    enderecos = range(inicio, inicio + len(valores))
+    if desde is not None:
+        anteriores = desde.memoria[inicio:fim]
+        if valores == anteriores:
+            return
+        anteriores += [None] * (len(valores) - len(anteriores))
+        # compress e map selecionam as células em C, sem laço em Python
+        mudadas = list(map(ne, valores, anteriores))
+        enderecos = list(compress(enderecos, mudadas))
+        valores = list(compress(valores, mudadas))
+    elif nao_zero:
+        enderecos = compress(enderecos, valores)
+        valores = compress(valores, valores)
+    yield from zip(enderecos, valores)
+
+
+def registradores(interpretador, desde=None):
+    "Registradores, ou só os que mudaram desde o instantâneo"
+    if desde is None:
+        return dict(interpretador.registers)
+    anteriores = desde.registradores
+    return {nome: valor for nome, valor in interpretador.registers.items()
+            if nome not in anteriores or anteriores[nome] != valor}
+
+
+def escrever_json(interpretador, arquivo, inicio=0, fim=None, nao_zero=False, desde=None):
+    "Escreve o estado em JSON no arquivo (texto), uma célula por vez"
+    arquivo.write('{"linha_codigo": ')
+    arquivo.write(json.dumps(interpretador.linha_codigo))
+    arquivo.write(', "registradores": ')
+    arquivo.write(json.dumps(registradores(interpretador, desde), ensure_ascii=False, default=str))
+    arquivo.write(', "memoria": {')
+    arquivo.writelines(
+        f'{", " if posicao else ""}"{endereco}": '
+        f'{valor if type(valor) is int else json.dumps(valor, ensure_ascii=False, default=str)}'
+        for posicao, (endereco, valor) in enumerate(
+            celulas(interpretador.memory, inicio, fim, nao_zero, desde)))
+    arquivo.write("}}\n")
+
+
+def formatar_hex(valor):
+    "Inteiro em hexadecimal, outros valores com ``repr``"
+    if isinstance(valor, int):
+        return f"{valor:#x}" if valor >= 0 else f"-{-valor:#x}"
+    return repr(valor)
+
+
+def escrever_hex(interpretador, arquivo, inicio=0, fim=None, nao_zero=False, desde=None):
+    """
+    Escreve o estado como hexdump no arquivo (texto).
+
+    Só as linhas com alguma célula que passa nos filtros são escritas.
+    """
+    arquivo.write(f"linha_codigo: {interpretador.linha_codigo}\n")
+    for nome, valor in registradores(interpretador, desde).items():
+        arquivo.write(f"{nome}: {formatar_hex(valor)}\n")
+
+    linha_atual = None
+    colunas = []
+
+    def escrever_linha():
+        arquivo.write(f"{linha_atual:08x}: {' '.join(colunas)}\n")
+
+    for endereco, valor in celulas(interpretador.memory, inicio, fim, nao_zero, desde):
+        linha = endereco - endereco % CELULAS_POR_LINHA
+        if linha != linha_atual:
+            if linha_atual is not None:
+                colunas.extend(["--"] * (CELULAS_POR_LINHA - len(colunas)))
+                escrever_linha()
+            linha_atual = linha
+            colunas = []
+        colunas.extend(["--"] * (endereco - linha - len(colunas)))
+        colunas.append(formatar_hex(valor))
+    if linha_atual is not None:
+        colunas.extend(["--"] * (CELULAS_POR_LINHA - len(colunas)))
+        escrever_linha()
+
+
+def empacotar_valor(valor):
+    "Valor no formato binário"
+    if isinstance(valor, int) and -2**63 <= valor < 2**63:
+        return TIPO.pack(TIPO_INTEIRO) + INTEIRO.pack(valor)
+    if isinstance(valor, float):
+        return TIPO.pack(TIPO_REAL) + REAL.pack(valor)
+    texto = repr(valor).encode("utf-8")
+    return TIPO.pack(TIPO_OUTRO) + TAMANHO_TEXTO.pack(len(texto)) + texto
+
+
+def escrever_binario(interpretador, arquivo, inicio=0, fim=None, nao_zero=False, desde=None):
+    """
+    Escreve o estado no formato binário compacto no arquivo (binário).
+
+    A quantidade de células vai no cabeçalho, que é reescrito no fim \
+        se o arquivo permitir ``seek``; senão as células são contadas antes.
+    """
+    valores_registradores = registradores(interpretador, desde)
+    filtros = (inicio, fim, nao_zero, desde)
+
+    reescrever = arquivo.seekable()
+    if reescrever:
+        posicao_cabecalho = arquivo.tell()
+        quantidade_celulas = 0
+    else:
+        quantidade_celulas = sum(1 for _ in celulas(interpretador.memory, *filtros))
+
+    arquivo.write(CABECALHO.pack(ASSINATURA, VERSAO, interpretador.linha_codigo,
+                                 len(valores_registradores), quantidade_celulas))
+    for nome, valor in valores_registradores.items():
+        nome = str(nome).encode("utf-8")
+        arquivo.write(TAMANHO_NOME.pack(len(nome)) + nome + empacotar_valor(valor))
+
+    contadas = 0
+    for endereco, valor in celulas(interpretador.memory, *filtros):
+        arquivo.write(ENDERECO.pack(endereco) + empacotar_valor(valor))
+        contadas += 1
+
+    if reescrever:
+        posicao_final = arquivo.tell()
+        arquivo.seek(posicao_cabecalho)
+        arquivo.write(CABECALHO.pack(ASSINATURA, VERSAO, interpretador.linha_codigo,
+                                     len(valores_registradores), contadas))
+        arquivo.seek(posicao_final)
+
+
+def ler_binario(dados:bytes):
+    """
+    Lê um despejo binário.
+
+    Retorna
+    ---
+    ``{"linha_codigo", "registradores": {nome: valor}, "memoria": {endereco: valor}}``
+    """
+    if len(dados) < CABECALHO.size:
+        raise DespejoInvalidoError("state dump too small")
+    assinatura, versao, linha_codigo, quantidade_registradores, quantidade_celulas = \
+        CABECALHO.unpack_from(dados, 0)
+    if assinatura != ASSINATURA:
+        raise DespejoInvalidoError("not a state dump")
+    if versao != VERSAO:
+        raise DespejoInvalidoError(f"unsupported state dump version {versao}")
+    posicao = CABECALHO.size
+
+    def ler_valor():
+        nonlocal posicao
+        (tipo,) = TIPO.unpack_from(dados, posicao)
+        posicao += TIPO.size
+        if tipo == TIPO_INTEIRO:
+            (valor,) = INTEIRO.unpack_from(dados, posicao)
+            posicao += INTEIRO.size
+        elif tipo == TIPO_REAL:
+            (valor,) = REAL.unpack_from(dados, posicao)
+            posicao += REAL.size
+        elif tipo == TIPO_OUTRO:
+            (tamanho,) = TAMANHO_TEXTO.unpack_from(dados, posicao)
+            posicao += TAMANHO_TEXTO.size
+            texto = dados[posicao:posicao + tamanho].decode("utf-8")
+            posicao += tamanho
+            try:
+                valor = literal_eval(texto)
+            except (ValueError, TypeError, SyntaxError, RecursionError) as erro:
+                raise DespejoInvalidoError(
+                    f"corrupted state dump: invalid value {texto!r}") from erro
+        else:
+            raise DespejoInvalidoError(f"unknown value type {tipo}")
+        return valor
+
+    try:
+        registradores_lidos = {}
+        for _ in range(quantidade_registradores):
+            (tamanho,) = TAMANHO_NOME.unpack_from(dados, posicao)
+            posicao += TAMANHO_NOME.size
+            nome = dados[posicao:posicao + tamanho].decode("utf-8")
+            posicao += tamanho
+            registradores_lidos[nome] = ler_valor()
+
+        memoria = {}
+        for _ in range(quantidade_celulas):
+            (endereco,) = ENDERECO.unpack_from(dados, posicao)
+            posicao += ENDERECO.size
+            memoria[endereco] = ler_valor()
+    except struct.error as erro:
+        raise DespejoInvalidoError("corrupted state dump: truncated") from erro
+    except UnicodeDecodeError as erro:
+        raise DespejoInvalidoError("corrupted state dump: invalid UTF-8 text") from erro
+
+    return {"linha_codigo": linha_codigo, "registradores": registradores_lidos,
+            "memoria": memoria}
+
+
+ESCRITORES = {
+    "json": escrever_json,
+    "hex": escrever_hex,
+    "binario": escrever_binario,
+}
+
+
+def despejar(interpretador, caminho:str, formato="json", **filtros):
+    "Abre o arquivo e escreve o despejo no formato escolhido"
+    if formato not in ESCRITORES:
+        raise ValueError(f"unknown dump format '{formato}'")
+    if formato == "binario":
+        with open(caminho, "wb") as arquivo:
+            escrever_binario(interpretador, arquivo, **filtros)
+    else:
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            ESCRITORES[formato](interpretador, arquivo, **filtros)
@@ -0,0 +1,4 @@
+"""Classe para erros de despejo de estado inválido"""
+
+class DespejoInvalidoError(Exception):
+    "To represent invalid or corrupted binary state dumps"
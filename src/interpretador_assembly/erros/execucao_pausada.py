@@ -0,0 +1,8 @@
+"""Classe para pausas do depurador"""
+
+class ExecucaoPausada(Exception):
+    "To stop the execution at a breakpoint or watchpoint"
+
+    def __init__(self, evento:dict):
+        super().__init__(f"execution paused at instruction {evento['indice']}")
+        self.evento = evento
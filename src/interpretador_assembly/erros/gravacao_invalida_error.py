@@ -0,0 +1,4 @@
+"""Classe para erros de gravação inválida"""
+
+class GravacaoInvalidaError(Exception):
+    "To represent invalid or corrupted INT recordings"
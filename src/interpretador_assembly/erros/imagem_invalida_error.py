@@ -0,0 +1,4 @@
+"""Classe para erros de imagem binária inválida"""
+
+class ImagemInvalidaError(Exception):
+    "To represent invalid or corrupted binary program images"
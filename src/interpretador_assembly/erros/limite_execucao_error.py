@@ -0,0 +1,4 @@
+"""Classe para erros de limite de execução"""
+
+class LimiteExecucaoError(Exception):
+    "To represent programs that exceeded the execution limits"
@@ -0,0 +1,4 @@
+"""Classe para erros de mnemônico inválido"""
+
+class MnemonicoInvalidoError(Exception):
+    "To represent mnemonic classes with invalid declarations"
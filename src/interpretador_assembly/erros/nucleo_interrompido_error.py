@@ -0,0 +1,4 @@
+"""Classe para erros de núcleo interrompido"""
+
+class NucleoInterrompidoError(Exception):
+    "To represent cores whose process exited without reporting a result"
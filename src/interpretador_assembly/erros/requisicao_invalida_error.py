@@ -0,0 +1,4 @@
+"""Classe para erros de requisição inválida do servidor"""
+
+class RequisicaoInvalidaError(Exception):
+    "To represent server requests with an invalid initial state"
@@ -0,0 +1,4 @@
+"""Classe para erros semânticos"""
+
+class SemanticError(Exception):
+    "To represent semantic errors"
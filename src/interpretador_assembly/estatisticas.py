@@ -0,0 +1,116 @@
+"""
+Estatísticas de execução do interpretador.
+
+Os contadores são mantidos pelo ``InterpretadorAssembly`` durante a execução \
+    (um contador por instrução, não um log por evento) e juntados aqui \
+    depois da execução, com ``InterpretadorAssembly.obter_estatisticas()``.
+
+Exportação
+---
+- ``para_dict()`` / ``para_json()``
+- ``para_prometheus()``: formato texto do Prometheus
+"""
+
+import json
+
+
+class EstatisticasExecucao:
+    """
+    Contadores de uma execução.
+
+    Atributos
+    ---
+    ``instrucoes_executadas``: total de instruções executadas
+
+    ``execucoes_por_instrucao``: quantas vezes cada instrução foi executada, \
+        pelo índice da instrução
+
+    ``desvios``: para cada JTRUE/JFALSE (e outros desvios), \
+        quantas vezes desviou ou não
+
+    ``leituras_memoria`` / ``escritas_memoria``: acessos à memória
+
+    ``chamadas_int``: quantas vezes o INT foi executado
+
+    ``tempos``: duração em segundos das fases ``validacao``, \
+        ``carregamento`` e ``execucao``
+    """
+
+    def __init__(self, instrucoes_executadas=0, execucoes_por_instrucao=None,
+                 desvios=None, leituras_memoria=0, escritas_memoria=0,
+                 chamadas_int=0, tempos=None):
+        self.instrucoes_executadas = instrucoes_executadas
+        self.execucoes_por_instrucao = execucoes_por_instrucao or []
+        self.desvios = desvios or []
+        self.leituras_memoria = leituras_memoria
+        self.escritas_memoria = escritas_memoria
+        self.chamadas_int = chamadas_int
+        self.tempos = tempos or {}
+
+    def __str__(self) -> str:
+        return self.para_json()
+
+    def para_dict(self):
+        "Estatísticas como dicionário"
+        return {
+            "instrucoes_executadas": self.instrucoes_executadas,
+            "execucoes_por_instrucao": self.execucoes_por_instrucao,
+            "desvios": self.desvios,
+            "leituras_memoria": self.leituras_memoria,
+            "escritas_memoria": self.escritas_memoria,
+            "chamadas_int": self.chamadas_int,
+            "tempos": self.tempos,
+        }
+
+    def para_json(self):
+        "Estatísticas em JSON"
+        return json.dumps(self.para_dict(), ensure_ascii=False)
+
+    def para_prometheus(self, prefixo="interpretador_assembly"):
+        """
+        Estatísticas no formato texto do Prometheus.
+
+        Exemplo:
+        ```
+        # TYPE interpretador_assembly_instrucoes_executadas_total counter
+        interpretador_assembly_instrucoes_executadas_total 3001
+        ```
+        """
+        linhas = []
+
+        def metrica(nome, tipo, ajuda, amostras):
+            linhas.append(f"# HELP {prefixo}_{nome} {ajuda}")
+            linhas.append(f"# TYPE {prefixo}_{nome} {tipo}")
+            for rotulos, valor in amostras:
+                texto_rotulos = ",".join(
+                    f'{chave}="{escapar_rotulo(str(v))}"' for chave, v in rotulos.items())
+                if texto_rotulos:
+                    texto_rotulos = "{" + texto_rotulos + "}"
+                linhas.append(f"{prefixo}_{nome}{texto_rotulos} {valor}")
+
+        metrica("instrucoes_executadas_total", "counter", "Executed instructions",
+                [({}, self.instrucoes_executadas)])
+
+        amostras_desvios = []
+        for desvio in self.desvios:
+            rotulos = {"indice": desvio["indice"], "instrucao": desvio["instrucao"]}
+            amostras_desvios.append(({**rotulos, "resultado": "tomado"}, desvio["tomados"]))
+            amostras_desvios.append(({**rotulos, "resultado": "nao_tomado"}, desvio["nao_tomados"]))
+        metrica("desvios_total", "counter", "Taken and not taken branches per instruction",
+                amostras_desvios)
+
+        metrica("leituras_memoria_total", "counter", "Memory reads",
+                [({}, self.leituras_memoria)])
+        metrica("escritas_memoria_total", "counter", "Memory writes",
+                [({}, self.escritas_memoria)])
+        metrica("chamadas_int_total", "counter", "INT calls",
+                [({}, self.chamadas_int)])
+        metrica("fase_segundos", "gauge", "Duration of each phase in seconds",
+                [({"fase": fase}, tempo) for fase, tempo in self.tempos.items()])
+
+        return "\n".join(linhas) + "\n"
+
+
+def escapar_rotulo(valor:str):
+    "Escapa o valor de um rótulo do Prometheus"
+    return valor.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
@@ -0,0 +1,258 @@
+"""
+Execução reversa, com um histórico das alterações de cada instrução.
+
+Com o ``HistoricoExecucao`` ligado, cada instrução executada guarda só \
+    o que mudou: o valor antigo dos registradores e células de memória \
+    escritos, e a linha da instrução. Não há cópia do estado inteiro.
+
+O histórico é um buffer circular com ``capacidade`` instruções: as mais \
+    antigas são descartadas, então a memória usada é limitada.
+
+Voltar
+---
+- ``voltar(n)``: desfaz as últimas ``n`` instruções
+- ``voltar_ate(local)``: volta até a instrução (label ou índice) \
+    ou até ``local(interpretador)`` ser verdadeiro
+- ``voltar_ate_alteracao(local)``: volta até antes da última mudança \
+    do endereço, variável ou registrador
+
+Depois de voltar, ``executar_codigo()`` continua dali. Entradas e saídas \
+    do INT não são desfeitas.
+
+O HALT executado também é uma entrada do histórico (sem alterações), \
+    registrada pelo laço de execução: ``voltar(1)`` depois do HALT só \
+    desfaz a contagem dele.
+
+Exemplo
+---
+```python
+historico = HistoricoExecucao(interpretador, capacidade=10000)
+historico.ligar()
+interpretador.executar_codigo()
+historico.voltar_ate_alteracao("valor")
+```
+"""
+
+from collections import deque
+from interpretador_assembly.instrumentacao import MnemonicoEnvolvido, desenvolver, envolver
+
+# valor de registrador que não existia antes da instrução
+AUSENTE = object()
+
+MEMORIA = 0
+REGISTRADOR = 1
+VARIAVEL = 2
+DESVIO = 3
+MEMORIA_BLOCO = 4
+PARADA = 5
+
+
+class RegistradoresComHistorico(dict):
+    "Registradores que guardam o valor antigo no histórico a cada escrita"
+
+    def __init__(self, historico, registradores:dict):
+        super().__init__(registradores)
+        self.historico = historico
+
+    def __setitem__(self, nome, valor):
+        self.historico.alteracoes.append((REGISTRADOR, nome, self.get(nome, AUSENTE)))
+        super().__setitem__(nome, valor)
+
+
+class MnemonicoComHistorico(MnemonicoEnvolvido):
+    "Envolve o mnemônico de uma instrução, abrindo uma entrada no histórico"
+
+    ordem = 1
+
+    def __init__(self, historico, indice:int):
+        super().__init__()
+        self.historico = historico
+        self.indice = indice
+
+    def executar(self, interpretador_assembly, params:list):
+        historico = self.historico
+        historico.alteracoes = alteracoes = []
+        historico.entradas.append((self.indice, alteracoes))
+        tomado = self.original.executar(interpretador_assembly, params)
+
+        # desvio tomado, para desfazer a contagem do laço de execução
+        if tomado:
+            alteracoes.append((DESVIO, None, None))
+        return tomado
+
+
+class HistoricoExecucao:
+    """
+    Histórico das alterações de cada instrução, para executar ao contrário.
+
+    ``capacidade``: quantas instruções ficam no histórico
+    """
+
+    def __init__(self, interpretador, capacidade=100000):
+        if capacidade < 1:
+            raise ValueError("capacidade must be at least 1")
+        self.interpretador = interpretador
+        self.capacidade = capacidade
+
+        # cada entrada: (índice da instrução, [(tipo, local, valor antigo), ...])
+        self.entradas = deque(maxlen=capacidade)
+        self.alteracoes = []
+        self.envoltorios = {}      # {indice: MnemonicoComHistorico}
+        self.programa = None
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def ligar(self):
+        """
+        Começa a gravar, a partir do estado atual.
+
+        Deve ser chamado de novo depois de ``reiniciar_estado()``, \
+            que troca o dicionário de registradores.
+        """
+        interpretador = self.interpretador
+        self.entradas.clear()
+        self.alteracoes = []
+
+        if not isinstance(interpretador.registers, RegistradoresComHistorico):
+            interpretador.registers = RegistradoresComHistorico(self, interpretador.registers)
+        interpretador.historico = self
+
+        programa = interpretador.instrucoes_decodificadas
+        if self.programa is programa:
+            return
+        self.programa = programa
+        self.envoltorios = {}
+        for indice, instrucao in enumerate(programa):
+            if instrucao is None or instrucao[1] is None:
+                continue
+            self.envoltorios[indice] = envolver(programa, indice, MnemonicoComHistorico(self, indice))
+
+    def desligar(self):
+        "Para de gravar e devolve o programa e os registradores originais"
+        interpretador = self.interpretador
+        if isinstance(interpretador.registers, RegistradoresComHistorico):
+            interpretador.registers = dict(interpretador.registers)
+        interpretador.historico = None
+
+        if self.programa is interpretador.instrucoes_decodificadas:
+            for indice, envoltorio in self.envoltorios.items():
+                desenvolver(self.programa, indice, envoltorio)
+        self.programa = None
+        self.envoltorios = {}
+        self.entradas.clear()
+
+    def registrar_memoria(self, endereco:int, valor_antigo):
+        "Chamado pelo ``set_memory()`` antes de escrever"
+        self.alteracoes.append((MEMORIA, endereco, valor_antigo))
+
+    def registrar_memoria_bloco(self, endereco:int, valores_antigos:list):
+        "Chamado pelo ``set_memory_bloco()`` antes de escrever"
+        self.alteracoes.append((MEMORIA_BLOCO, endereco, valores_antigos))
+
+    def registrar_parada(self, indice:int):
+        "Chamado pelo laço de execução quando executa o HALT"
+        self.entradas.append((indice, [(PARADA, None, None)]))
+
+    def registrar_variavel(self, label:str):
+        "Chamado pelo ``vincular_variavel()`` antes de vincular"
+        interpretador = self.interpretador
+        self.alteracoes.append((VARIAVEL, label, (
+            interpretador.labels.get(label, AUSENTE),
+            interpretador.variaveis.get(label, AUSENTE))))
+
+    def desfazer(self):
+        "Desfaz a última instrução do histórico e retorna a entrada desfeita"
+        interpretador = self.interpretador
+        indice, alteracoes = entrada = self.entradas.pop()
+
+        registradores = interpretador.registers
+        for tipo, local, valor_antigo in reversed(alteracoes):
+            if tipo in (DESVIO, PARADA):
+                continue
+            if tipo == MEMORIA:
+                interpretador.memory[local] = valor_antigo
+            elif tipo == MEMORIA_BLOCO:
+                interpretador.memory[local:local + len(valor_antigo)] = valor_antigo
+            elif tipo == REGISTRADOR:
+                # dict.__setitem__ não grava de novo no histórico
+                if valor_antigo is AUSENTE:
+                    dict.pop(registradores, local, None)
+                else:
+                    dict.__setitem__(registradores, local, valor_antigo)
+            else:
+                for dicionario, valor in zip(
+                        (interpretador.labels, interpretador.variaveis), valor_antigo):
+                    if valor is AUSENTE:
+                        dicionario.pop(local, None)
+                    else:
+                        dicionario[local] = valor
+
+        if alteracoes and alteracoes[-1][0] == DESVIO:
+            interpretador.contagem_desvios_tomados[indice] -= 1
+        interpretador.contagem_instrucoes[indice] -= 1
+        interpretador.instrucoes_executadas -= 1
+        interpretador.linha_codigo = indice
+        return entrada
+
+    def voltar(self, quantidade=1):
+        "Desfaz até ``quantidade`` instruções e retorna quantas foram desfeitas"
+        desfeitas = 0
+        while desfeitas < quantidade and self.entradas:
+            self.desfazer()
+            desfeitas += 1
+        return desfeitas
+
+    def voltar_ate(self, local):
+        """
+        Volta até a instrução ``local`` (label ou índice) estar para executar, \
+            ou até ``local(interpretador)`` ser verdadeiro.
+
+        Retorna quantas instruções foram desfeitas, ou None se o histórico \
+            acabou antes.
+        """
+        if callable(local):
+            condicao = local
+        else:
+            programa = self.interpretador.instrucoes_decodificadas
+            indice = self.interpretador.labels[local] if local in self.interpretador.labels \
+                else int(local)
+            # label sozinha na linha: a instrução é a próxima
+            while indice + 1 < len(programa) and programa[indice] is None:
+                indice += 1
+            condicao = lambda interpretador: interpretador.linha_codigo == indice
+
+        desfeitas = 0
+        while self.entradas:
+            self.desfazer()
+            desfeitas += 1
+            if condicao(self.interpretador):
+                return desfeitas
+        return None
+
+    def voltar_ate_alteracao(self, local):
+        """
+        Volta até antes da última instrução que mudou o local \
+            (endereço de memória, variável do VAR ou registrador).
+
+        Retorna quantas instruções foram desfeitas, ou None se o histórico \
+            acabou antes.
+        """
+        local = str(local)
+        if local.isnumeric():
+            alvo = (MEMORIA, int(local))
+        elif local in self.interpretador.variaveis:
+            alvo = (MEMORIA, self.interpretador.variaveis[local])
+        else:
+            alvo = (REGISTRADOR, local)
+
+        desfeitas = 0
+        while self.entradas:
+            _, alteracoes = self.desfazer()
+            desfeitas += 1
+            if any((tipo, endereco) == alvo or (
+                    tipo == MEMORIA_BLOCO and alvo[0] == MEMORIA and
+                    endereco <= alvo[1] < endereco + len(valores))
+                   for tipo, endereco, valores in alteracoes):
+                return desfeitas
+        return None
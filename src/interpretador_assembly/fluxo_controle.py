@@ -0,0 +1,288 @@
+"""
+Grafo de fluxo de controle (CFG) do programa carregado.
+
+O programa é dividido em blocos básicos: sequências de instruções que \
+    sempre executam do começo ao fim. Um bloco novo começa:
+
+- na primeira instrução
+- em cada label que é destino de desvio
+- depois de cada desvio (JUMP, JTRUE, JFALSE) e de cada parada (HALT)
+
+Sobre o grafo são calculados alcançabilidade, dominadores e laços \
+    (laços naturais, pelas arestas de retorno), com a profundidade de \
+    aninhamento de cada bloco.
+
+O grafo é calculado uma vez por programa, com ``obter_grafo()``.
+"""
+
+
+class BlocoBasico:
+    """
+    Bloco básico: instruções ``inicio`` até ``fim - 1``.
+
+    ``sucessores`` e ``predecessores`` são índices de blocos.
+    """
+
+    def __init__(self, indice:int, inicio:int, fim:int):
+        self.indice = indice
+        self.inicio = inicio
+        self.fim = fim
+        self.labels = []
+        self.sucessores = []
+        self.predecessores = []
+        self.profundidade_laco = 0
+
+    def __repr__(self) -> str:
+        return f"BlocoBasico({self.indice}, {self.inicio}..{self.fim - 1}, " \
+            f"sucessores={self.sucessores})"
+
+
+class Laco:
+    """
+    Laço natural: ``cabecalho`` domina todos os ``blocos`` do laço, \
+        e ``retornos`` são os blocos com aresta de volta para o cabeçalho.
+    """
+
+    def __init__(self, cabecalho:int, blocos:set, retornos:list):
+        self.cabecalho = cabecalho
+        self.blocos = blocos
+        self.retornos = retornos
+        self.profundidade = 1
+
+    def __repr__(self) -> str:
+        return f"Laco(cabecalho={self.cabecalho}, blocos={sorted(self.blocos)}, " \
+            f"profundidade={self.profundidade})"
+
+
+class GrafoFluxoControle:
+    """
+    Grafo de fluxo de controle de ``instrucoes_decodificadas``.
+
+    Atributos
+    ---
+    ``blocos``: lista de ``BlocoBasico``, o bloco 0 é a entrada
+
+    ``bloco_da_instrucao``: índice do bloco de cada instrução
+
+    ``alcancaveis``: blocos que podem ser executados a partir da entrada
+
+    ``dominadores``: ``{bloco: conjunto de blocos que o dominam}``
+
+    ``dominador_imediato``: ``{bloco: dominador imediato}``, \
+        a entrada não tem dominador imediato
+
+    ``lacos``: lista de ``Laco``
+    """
+
+    def __init__(self, instrucoes_decodificadas:list, labels:dict):
+        self.programa = instrucoes_decodificadas
+        self.blocos = []
+        self.bloco_da_instrucao = []
+        self.alcancaveis = set()
+        self.dominadores = {}
+        self.dominador_imediato = {}
+        self.lacos = []
+
+        self.dividir_blocos(labels)
+        self.ligar_blocos()
+        self.calcular_alcancaveis()
+        self.calcular_dominadores()
+        self.encontrar_lacos()
+
+    @staticmethod
+    def tipo_desvio(instrucao):
+        """
+        Retorna como a instrução muda o fluxo.
+
+        ``"incondicional"``, ``"condicional"``, ``"parada"`` (efeito \
+            ``"parada"``, ex: HALT) ou None
+        """
+        if instrucao is None:
+            return None
+        _, mnemonico, _ = instrucao
+        if mnemonico is None:
+            return None
+        if mnemonico.efeitos and "parada" in mnemonico.efeitos:
+            return "parada"
+        return mnemonico.desvio
+
+    def dividir_blocos(self, labels:dict):
+        "Divide as instruções em blocos básicos"
+        programa = self.programa
+        if not programa:
+            return
+
+        inicios = {0}
+        for indice, instrucao in enumerate(programa):
+            tipo = self.tipo_desvio(instrucao)
+            if tipo is None:
+                continue
+            if indice + 1 < len(programa):
+                inicios.add(indice + 1)
+            if tipo != "parada":
+                inicios.add(instrucao[2][0])
+
+        inicios = sorted(inicio for inicio in inicios if inicio < len(programa))
+        self.bloco_da_instrucao = [0] * len(programa)
+        for indice_bloco, inicio in enumerate(inicios):
+            fim = inicios[indice_bloco + 1] if indice_bloco + 1 < len(inicios) else len(programa)
+            self.blocos.append(BlocoBasico(indice_bloco, inicio, fim))
+            self.bloco_da_instrucao[inicio:fim] = [indice_bloco] * (fim - inicio)
+
+        for label, indice in labels.items():
+            if isinstance(indice, int) and 0 <= indice < len(programa):
+                bloco = self.blocos[self.bloco_da_instrucao[indice]]
+                if bloco.inicio == indice:
+                    bloco.labels.append(label)
+
+    def ligar_blocos(self):
+        "Cria as arestas entre os blocos"
+        for bloco in self.blocos:
+            ultima = self.programa[bloco.fim - 1]
+            tipo = self.tipo_desvio(ultima)
+
+            sucessores = []
+            if tipo in ("incondicional", "condicional"):
+                sucessores.append(self.bloco_da_instrucao[ultima[2][0]])
+            if tipo in (None, "condicional") and bloco.fim < len(self.programa):
+                sucessores.append(self.bloco_da_instrucao[bloco.fim])
+
+            for sucessor in dict.fromkeys(sucessores):
+                bloco.sucessores.append(sucessor)
+                self.blocos[sucessor].predecessores.append(bloco.indice)
+
+    def calcular_alcancaveis(self):
+        "Blocos alcançáveis a partir da entrada"
+        if not self.blocos:
+            return
+        pendentes = [0]
+        while pendentes:
+            bloco = pendentes.pop()
+            if bloco in self.alcancaveis:
+                continue
+            self.alcancaveis.add(bloco)
+            pendentes.extend(self.blocos[bloco].sucessores)
+
+    def ordem_reversa_pos(self):
+        "Blocos alcançáveis em pós-ordem reversa, para as análises iterativas"
+        visitados = set()
+        ordem = []
+        pilha = [(0, iter(self.blocos[0].sucessores))] if self.blocos else []
+        if pilha:
+            visitados.add(0)
+        while pilha:
+            bloco, sucessores = pilha[-1]
+            proximo = next((s for s in sucessores if s not in visitados), None)
+            if proximo is None:
+                pilha.pop()
+                ordem.append(bloco)
+            else:
+                visitados.add(proximo)
+                pilha.append((proximo, iter(self.blocos[proximo].sucessores)))
+        return ordem[::-1]
+
+    def calcular_dominadores(self):
+        "Dominadores de cada bloco alcançável (algoritmo iterativo)"
+        ordem = self.ordem_reversa_pos()
+        if not ordem:
+            return
+
+        todos = set(ordem)
+        self.dominadores = {bloco: set(todos) for bloco in ordem}
+        self.dominadores[0] = {0}
+
+        mudou = True
+        while mudou:
+            mudou = False
+            for bloco in ordem[1:]:
+                predecessores = [p for p in self.blocos[bloco].predecessores
+                                 if p in self.alcancaveis]
+                novo = set.intersection(*(self.dominadores[p] for p in predecessores)) \
+                    if predecessores else set()
+                novo = novo | {bloco}
+                if novo != self.dominadores[bloco]:
+                    self.dominadores[bloco] = novo
+                    mudou = True
+
+        # dominador imediato: o dominador estrito dominado por todos os outros
+        for bloco, dominadores in self.dominadores.items():
+            estritos = dominadores - {bloco}
+            for candidato in estritos:
+                if estritos <= self.dominadores[candidato]:
+                    self.dominador_imediato[bloco] = candidato
+                    break
+
+    def domina(self, bloco_a:int, bloco_b:int):
+        "Se ``bloco_a`` domina ``bloco_b``"
+        return bloco_a in self.dominadores.get(bloco_b, ())
+
+    def encontrar_lacos(self):
+        "Laços naturais, a partir das arestas de retorno (b -> a, com a dominando b)"
+        retornos_por_cabecalho = {}
+        for bloco in self.alcancaveis:
+            for sucessor in self.blocos[bloco].sucessores:
+                if self.domina(sucessor, bloco):
+                    retornos_por_cabecalho.setdefault(sucessor, []).append(bloco)
+
+        for cabecalho, retornos in sorted(retornos_por_cabecalho.items()):
+            blocos = {cabecalho}
+            pendentes = list(retornos)
+            while pendentes:
+                bloco = pendentes.pop()
+                if bloco in blocos:
+                    continue
+                blocos.add(bloco)
+                pendentes.extend(p for p in self.blocos[bloco].predecessores
+                                 if p in self.alcancaveis)
+            self.lacos.append(Laco(cabecalho, blocos, retornos))
+
+        # profundidade: quantos laços contêm o laço (ou o bloco)
+        for laco in self.lacos:
+            laco.profundidade = sum(1 for outro in self.lacos if laco.blocos <= outro.blocos)
+        for bloco in self.blocos:
+            bloco.profundidade_laco = sum(1 for laco in self.lacos if bloco.indice in laco.blocos)
+
+    def instrucao_alcancavel(self, indice:int):
+        "Se a instrução pode ser executada"
+        return self.bloco_da_instrucao[indice] in self.alcancaveis
+
+    def caminhos_quentes(self):
+        """
+        Blocos candidatos a caminho quente: blocos dentro de laços, \
+            do mais aninhado para o menos aninhado.
+        """
+        candidatos = [bloco for bloco in self.blocos if bloco.profundidade_laco > 0]
+        return sorted(candidatos, key=lambda bloco: (-bloco.profundidade_laco, bloco.inicio))
+
+    def resumo(self):
+        "Resumo do grafo, para relatórios"
+        return {
+            "blocos": len(self.blocos),
+            "blocos_inalcancaveis": [bloco.indice for bloco in self.blocos
+                                     if bloco.indice not in self.alcancaveis],
+            "lacos": [
+                {
+                    "cabecalho": laco.cabecalho,
+                    "labels": self.blocos[laco.cabecalho].labels,
+                    "blocos": sorted(laco.blocos),
+                    "profundidade": laco.profundidade,
+                }
+                for laco in self.lacos
+            ],
+            "profundidade_maxima": max((laco.profundidade for laco in self.lacos), default=0),
+            "caminhos_quentes": [bloco.indice for bloco in self.caminhos_quentes()],
+        }
+
+
+def obter_grafo(interpretador):
+    """
+    Retorna o grafo do programa carregado no interpretador.
+
+    O grafo fica guardado no interpretador e só é recalculado \
+        quando o programa (``instrucoes_decodificadas``) muda.
+    """
+    grafo = interpretador.grafo_fluxo
+    if grafo is None or grafo.programa is not interpretador.instrucoes_decodificadas:
+        grafo = GrafoFluxoControle(interpretador.instrucoes_decodificadas, interpretador.labels)
+        interpretador.grafo_fluxo = grafo
+    return grafo
@@ -0,0 +1,291 @@
+"""
+Formato binário de programa (imagem).
+
+O código-fonte validado e carregado é montado numa imagem compacta, que \
+    pode ser executada sem análise léxica e sintática: a imagem é aberta \
+    com ``mmap`` e decodificada direto dos bytes.
+
+Estrutura
+---
+Os números são varints (LEB128 sem sinal: 7 bits por byte, o bit mais \
+    alto indica que tem mais bytes), então índices e endereços pequenos \
+    ocupam 1 byte.
+```
+cabeçalho       "IASM", versão (1 byte), quantidade de instruções, \
+                mnemônicos, strings, labels e variáveis
+strings         tamanho + texto UTF-8, sem repetição
+mnemônicos      índice da string com o nome, quantidade de parâmetros
+instruções      opcode (1 byte) + um número por parâmetro
+labels          índice da string com o nome, índice da instrução
+variáveis       índice da string com o nome, endereço de memória (VAR)
+```
+- O opcode é o índice na tabela de mnemônicos, que tem uma entrada por \
+    nome e quantidade de parâmetros, então a instrução não guarda a \
+    quantidade (HALT ocupa 1 byte)
+- ``255`` seguido de uma quantidade ``n`` são ``n`` linhas vazias \
+    (comentários, labels sozinhas)
+- Cada parâmetro é o índice de uma string. Nos desvios, o primeiro \
+    parâmetro é o índice da instrução de destino
+- As strings de ``STRINGS_PADRAO`` (mnemônicos e registradores comuns) \
+    não são gravadas: os índices ``0`` até ``len(STRINGS_PADRAO) - 1`` \
+    são delas, e a tabela de strings da imagem continua depois
+"""
+
+import mmap
+import re
+from interpretador_assembly.erros.imagem_invalida_error import ImagemInvalidaError
+from interpretador_assembly.interpretador_assembly import remover_comentario
+
+ASSINATURA = b"IASM"
+VERSAO = 2
+
+OPCODE_VAZIO = 255
+
+# Só pode crescer no fim: as imagens guardam os índices
+STRINGS_PADRAO = (
+    "ADD", "MOVE", "SUBT", "MULT", "DIV", "JUMP", "JTRUE", "JFALSE", "CMP", "CMAIOR",
+    "CMENOR", "VAR", "INT", "HALT", "CAS", "FADD", "BARREIRA", "MOVEBLOCO", "PREENCHER",
+    "CARREGARTEXTO", "A", "B", "C", "D", "CP", "0", "1", "2",
+)
+
+
+def escrever_varint(saida:bytearray, valor:int):
+    "Acrescenta o número como varint"
+    if valor < 0:
+        raise ImagemInvalidaError(f"negative value {valor} in image")
+    while valor >= 0x80:
+        saida.append((valor & 0x7f) | 0x80)
+        valor >>= 7
+    saida.append(valor)
+
+
+def ler_varint(dados, posicao:int):
+    "Lê um varint. Retorna ``(valor, posição seguinte)``"
+    valor = 0
+    deslocamento = 0
+    while True:
+        byte = dados[posicao]
+        posicao += 1
+        valor |= (byte & 0x7f) << deslocamento
+        if byte < 0x80:
+            return valor, posicao
+        deslocamento += 7
+
+
+def montar(interpretador):
+    """
+    Monta a imagem do programa carregado no interpretador.
+
+    O interpretador precisa ter passado por ``executar_validacao()`` \
+        e ``carregar_codigo()``.
+    """
+    strings = {texto: indice for indice, texto in enumerate(STRINGS_PADRAO)}
+    mnemonicos = {}     # {(nome, quantidade de parâmetros): opcode}
+
+    def indice_string(texto:str):
+        if texto not in strings:
+            strings[texto] = len(strings)
+        return strings[texto]
+
+    instrucoes = bytearray()
+    variaveis = []
+    vazias = 0
+    for instrucao in interpretador.instrucoes_decodificadas:
+        if instrucao is None:
+            vazias += 1
+            continue
+        if vazias:
+            instrucoes.append(OPCODE_VAZIO)
+            escrever_varint(instrucoes, vazias)
+            vazias = 0
+
+        nome_mnemonico, mnemonico, parametros = instrucao
+        chave = (nome_mnemonico, len(parametros))
+        if chave not in mnemonicos:
+            if len(mnemonicos) == OPCODE_VAZIO:
+                raise ImagemInvalidaError(f"more than {OPCODE_VAZIO} mnemonics")
+            mnemonicos[chave] = len(mnemonicos)
+        instrucoes.append(mnemonicos[chave])
+
+        # nos desvios, o primeiro parâmetro já é o índice da instrução
+        for posicao, parametro in enumerate(parametros):
+            if posicao == 0 and mnemonico is not None and mnemonico.desvio:
+                escrever_varint(instrucoes, parametro)
+            else:
+                escrever_varint(instrucoes, indice_string(parametro))
+
+        # Dados iniciais: endereços associados pelo VAR
+        if nome_mnemonico == "VAR" and len(parametros) == 2 and parametros[1].isnumeric():
+            variaveis.append((indice_string(parametros[0]), int(parametros[1])))
+    if vazias:
+        instrucoes.append(OPCODE_VAZIO)
+        escrever_varint(instrucoes, vazias)
+
+    labels = [(indice_string(label), indice) for label, indice in interpretador.labels.items()]
+    tabela_mnemonicos = [(indice_string(nome), quantidade) for nome, quantidade in mnemonicos]
+
+    imagem = bytearray(ASSINATURA)
+    imagem.append(VERSAO)
+    for quantidade in (len(interpretador.instrucoes_decodificadas), len(mnemonicos),
+                       len(strings) - len(STRINGS_PADRAO), len(labels), len(variaveis)):
+        escrever_varint(imagem, quantidade)
+
+    for texto in list(strings)[len(STRINGS_PADRAO):]:
+        dados = texto.encode("utf-8")
+        escrever_varint(imagem, len(dados))
+        imagem += dados
+    for nome, quantidade in tabela_mnemonicos:
+        escrever_varint(imagem, nome)
+        escrever_varint(imagem, quantidade)
+    imagem += instrucoes
+    for nome, valor in labels + variaveis:
+        escrever_varint(imagem, nome)
+        escrever_varint(imagem, valor)
+
+    return bytes(imagem)
+
+
+def tamanho_codigo_sem_comentarios(codigo:str):
+    """
+    Tamanho em bytes do código-fonte sem comentários, linhas vazias \
+        e espaços repetidos, para comparar com o tamanho da imagem.
+    """
+    linhas = (" ".join(re.split(r"\s+", remover_comentario(linha).strip()))
+              for linha in codigo.splitlines())
+    return len("\n".join(linha for linha in linhas if linha).encode("utf-8"))
+
+
+def montar_codigo(interpretador, codigo:str):
+    "Valida, carrega e monta a imagem do código-fonte"
+    interpretador.executar_validacao(codigo)
+    interpretador.carregar_codigo(codigo)
+    return montar(interpretador)
+
+
+def salvar_imagem(caminho:str, imagem:bytes):
+    "Salva a imagem num arquivo"
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(imagem)
+
+
+def decodificar_imagem(interpretador, dados):
+    """
+    Carrega a imagem no interpretador, sem validar o código.
+
+    ``dados`` pode ser ``bytes`` ou um ``mmap``.
+
+    Retorna
+    ---
+    ``{nome: endereco}`` das variáveis declaradas com VAR
+    """
+    if len(dados) < len(ASSINATURA) + 1:
+        raise ImagemInvalidaError("image too small")
+    if dados[:len(ASSINATURA)] != ASSINATURA:
+        raise ImagemInvalidaError("not a program image")
+    versao = dados[len(ASSINATURA)]
+    if versao != VERSAO:
+        raise ImagemInvalidaError(f"unsupported image version {versao}")
+
+    posicao = len(ASSINATURA) + 1
+
+    def ler():
+        nonlocal posicao
+        valor, posicao = ler_varint(dados, posicao)
+        return valor
+
+    try:
+        (quantidade_instrucoes, quantidade_mnemonicos, quantidade_strings,
+         quantidade_labels, quantidade_variaveis) = (ler() for _ in range(5))
+
+        strings = list(STRINGS_PADRAO)
+        for _ in range(quantidade_strings):
+            tamanho = ler()
+            if posicao + tamanho > len(dados):
+                raise ImagemInvalidaError("corrupted image: truncated strings")
+            strings.append(bytes(dados[posicao:posicao + tamanho]).decode("utf-8"))
+            posicao += tamanho
+
+        mnemonicos = [(strings[ler()], ler()) for _ in range(quantidade_mnemonicos)]
+
+        instrucoes = []
+        while len(instrucoes) < quantidade_instrucoes:
+            opcode = dados[posicao]
+            posicao += 1
+            if opcode == OPCODE_VAZIO:
+                vazias = ler()
+                if len(instrucoes) + vazias > quantidade_instrucoes:
+                    raise ImagemInvalidaError("corrupted image: too many instructions")
+                instrucoes.extend([None] * vazias)
+                continue
+            nome_mnemonico, quantidade_parametros = mnemonicos[opcode]
+            instrucoes.append((nome_mnemonico, [ler() for _ in range(quantidade_parametros)]))
+
+        labels = {strings[ler()]: ler() for _ in range(quantidade_labels)}
+        variaveis = {strings[ler()]: ler() for _ in range(quantidade_variaveis)}
+
+        instrucoes_texto, instrucoes_decodificadas = decodificar_instrucoes(
+            interpretador, instrucoes, strings, labels)
+    except (IndexError, ValueError, UnicodeDecodeError) as erro:
+        raise ImagemInvalidaError(f"corrupted image: {erro}") from erro
+
+    if len(instrucoes) != quantidade_instrucoes:
+        raise ImagemInvalidaError("corrupted image: wrong instruction count")
+
+    interpretador.instrucoes = instrucoes_texto
+    interpretador.instrucoes_decodificadas = instrucoes_decodificadas
+    interpretador.labels = labels
+    interpretador.reiniciar_estado()
+
+    return variaveis
+
+
+def decodificar_instrucoes(interpretador, instrucoes, strings, labels):
+    """
+    Transforma as instruções da imagem em ``instrucoes`` (texto) \
+        e ``instrucoes_decodificadas``, como no ``carregar_codigo()``.
+    """
+    # nome da label de cada instrução, para reconstruir o texto dos desvios
+    labels_por_indice = {}
+    for label, indice in labels.items():
+        labels_por_indice.setdefault(indice, label)
+
+    instrucoes_texto = []
+    instrucoes_decodificadas = []
+    for instrucao in instrucoes:
+        if instrucao is None:
+            instrucoes_texto.append("")
+            instrucoes_decodificadas.append(None)
+            continue
+
+        nome_mnemonico, valores = instrucao
+        mnemonico = interpretador.mnemonicos.get(nome_mnemonico)
+
+        parametros = []
+        parametros_texto = []
+        for posicao, valor in enumerate(valores):
+            if posicao == 0 and mnemonico is not None and mnemonico.desvio:
+                parametros.append(valor)
+                parametros_texto.append(labels_por_indice.get(valor, str(valor)))
+            else:
+                parametros.append(strings[valor])
+                parametros_texto.append(strings[valor])
+
+        instrucoes_texto.append(f"{nome_mnemonico} {', '.join(parametros_texto)}".strip())
+        instrucoes_decodificadas.append((nome_mnemonico, mnemonico, parametros))
+
+    return instrucoes_texto, instrucoes_decodificadas
+
+
+def carregar_imagem(interpretador, caminho:str):
+    """
+    Abre a imagem com ``mmap`` e carrega no interpretador.
+
+    Retorna as variáveis declaradas com VAR, como em ``decodificar_imagem()``.
+    """
+    with open(caminho, "rb") as arquivo:
+        try:
+            dados = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as erro:
+            raise ImagemInvalidaError("empty image") from erro
+        with dados:
+            return decodificar_imagem(interpretador, dados)
@@ -0,0 +1,243 @@
+"""
+Gravação e reprodução das entradas e saídas do INT.
+
+Programas com ``INT 1`` esperam o teclado, então não dá para rodar de novo \
+    uma execução real em lote. O ``GravadorInt`` guarda cada caractere lido \
+    (``INT 1``) e escrito (``INT 2``), com a quantidade de instruções \
+    executadas até ali, e o ``ReprodutorInt`` devolve as mesmas entradas \
+    sem terminal.
+
+No modo rápido da reprodução, as instruções que só escrevem na saída \
+    (``INT 2``) não executam: são trocadas por um envoltório (ver \
+    ``instrumentacao``) que só conta quantas executaram, e os caracteres \
+    gravados dessas saídas são escritos de uma vez no fim.
+
+Formato do arquivo (little-endian)
+---
+```
+cabeçalho   "<4sH"   IAGR, versão
+eventos     "<BQI"   tipo (1 entrada, 2 saída), instruções executadas, código do caractere
+```
+"""
+
+import struct
+from interpretador_assembly.erros.gravacao_invalida_error import GravacaoInvalidaError
+from interpretador_assembly.instrumentacao import MnemonicoEnvolvido, desenvolver, envolver
+
+ASSINATURA = b"IAGR"
+VERSAO = 1
+
+CABECALHO = struct.Struct("<4sH")
+EVENTO = struct.Struct("<BQI")
+
+EVENTO_ENTRADA = 1
+EVENTO_SAIDA = 2
+
+
+def instrucoes_executadas(interpretador):
+    "Quantidade de instruções executadas até agora"
+    # contador do laço de execução, sem percorrer contagem_instrucoes a cada INT
+    return interpretador.instrucoes_executadas
+
+
+def so_escreve_saida(mnemonico, parametros:list):
+    "Se a instrução só escreve na saída, sem escritas nem desvio (ex: INT 2)"
+    return mnemonico.efeitos_instrucao(parametros) == ["saida"] and \
+        mnemonico.escritas == [] and not mnemonico.desvio
+
+
+class SaidaGravada(MnemonicoEnvolvido):
+    "Instrução de saída no modo rápido: não executa, só conta para o reprodutor"
+
+    # por dentro das outras camadas: o histórico e o depurador continuam vendo a instrução
+    ordem = 0
+
+    def __init__(self, reprodutor):
+        super().__init__()
+        self.reprodutor = reprodutor
+
+    def executar(self, interpretador_assembly, params:list):
+        self.reprodutor.saidas_executadas += 1
+
+
+class GravadorInt:
+    """
+    Grava as entradas e saídas do INT num arquivo.
+
+    Exemplo
+    ---
+    ```python
+    with GravadorInt(interpretador, "sessao.iagr"):
+        interpretador.executar_codigo()
+    ```
+    """
+
+    def __init__(self, interpretador, caminho:str):
+        self.interpretador = interpretador
+        self.entrada_original = interpretador.entrada
+        self.saida_original = interpretador.saida
+
+        self.arquivo = open(caminho, "wb")  # pylint: disable=consider-using-with
+        self.arquivo.write(CABECALHO.pack(ASSINATURA, VERSAO))
+
+        interpretador.entrada = self.ler_entrada
+        interpretador.saida = self.escrever_saida
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def ler_entrada(self):
+        "Lê da entrada original e grava o caractere usado pelo INT 1"
+        texto = self.entrada_original()
+        if texto:
+            self.arquivo.write(EVENTO.pack(
+                EVENTO_ENTRADA, instrucoes_executadas(self.interpretador), ord(texto[0])))
+        return texto
+
+    def escrever_saida(self, texto:str):
+        "Grava o caractere do INT 2 e escreve na saída original"
+        self.arquivo.write(EVENTO.pack(
+            EVENTO_SAIDA, instrucoes_executadas(self.interpretador), ord(texto)))
+        self.saida_original(texto)
+
+    def fechar(self):
+        "Fecha o arquivo e devolve a entrada e saída originais"
+        self.interpretador.entrada = self.entrada_original
+        self.interpretador.saida = self.saida_original
+        self.arquivo.close()
+
+
+def ler_gravacao(caminho:str):
+    "Retorna a lista de eventos ``(tipo, instrucoes_executadas, codigo)`` do arquivo"
+    with open(caminho, "rb") as arquivo:
+        dados = arquivo.read()
+
+    if len(dados) < CABECALHO.size:
+        raise GravacaoInvalidaError("recording too small")
+    assinatura, versao = CABECALHO.unpack_from(dados, 0)
+    if assinatura != ASSINATURA:
+        raise GravacaoInvalidaError("not an INT recording")
+    if versao != VERSAO:
+        raise GravacaoInvalidaError(f"unsupported recording version {versao}")
+    if (len(dados) - CABECALHO.size) % EVENTO.size:
+        raise GravacaoInvalidaError("corrupted recording: truncated event")
+
+    return list(EVENTO.iter_unpack(dados[CABECALHO.size:]))
+
+
+class ReprodutorInt:
+    """
+    Reproduz uma gravação: o INT 1 lê as entradas gravadas, sem terminal.
+
+    Parâmetros
+    ---
+    ``rapido``: não executa as instruções de saída (INT 2) nem confere \
+        as saídas; os caracteres gravados das saídas executadas são \
+        escritos de uma vez, numa chamada da saída original, ao restaurar
+
+    Divergências
+    ---
+    Se o programa ler ou escrever algo diferente da gravação (ou em outra \
+        instrução), a primeira diferença fica em ``divergencia``.
+
+    Exemplo
+    ---
+    ```python
+    with ReprodutorInt(interpretador, "sessao.iagr") as reprodutor:
+        interpretador.executar_codigo()
+    print(reprodutor.divergencia)
+    ```
+    """
+
+    def __init__(self, interpretador, caminho:str, rapido=False):
+        self.interpretador = interpretador
+        self.rapido = rapido
+        self.divergencia = None
+        self.entrada_original = interpretador.entrada
+        self.saida_original = interpretador.saida
+
+        eventos = ler_gravacao(caminho)
+        self.entradas = iter([evento for evento in eventos if evento[0] == EVENTO_ENTRADA])
+        saidas = [evento for evento in eventos if evento[0] == EVENTO_SAIDA]
+        self.saidas = iter(saidas)
+
+        interpretador.entrada = self.ler_entrada
+        interpretador.saida = self.descartar_saida if rapido else self.escrever_saida
+
+        # modo rápido: {indice: SaidaGravada} das instruções de saída
+        self.texto_gravado = "".join(chr(codigo) for _, _, codigo in saidas)
+        self.programa = None
+        self.envoltorios = {}
+        self.saidas_executadas = 0
+        if rapido:
+            self.programa = programa = interpretador.instrucoes_decodificadas
+            for indice, instrucao in enumerate(programa):
+                if instrucao is not None and instrucao[1] is not None \
+                        and so_escreve_saida(instrucao[1], instrucao[2]):
+                    self.envoltorios[indice] = envolver(programa, indice, SaidaGravada(self))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.restaurar()
+
+    def restaurar(self):
+        """
+        Devolve a entrada, a saída e as instruções originais. No modo \
+            rápido, escreve as saídas gravadas que foram executadas.
+        """
+        self.interpretador.entrada = self.entrada_original
+        self.interpretador.saida = self.saida_original
+
+        for indice, envoltorio in self.envoltorios.items():
+            desenvolver(self.programa, indice, envoltorio)
+        self.envoltorios = {}
+        if self.saidas_executadas:
+            self.saida_original(self.texto_gravado[:self.saidas_executadas])
+            self.saidas_executadas = 0
+
+    def ler_entrada(self):
+        "Retorna a próxima entrada gravada"
+        evento = next(self.entradas, None)
+        if evento is None:
+            raise EOFError("no more recorded input for INT 1")
+
+        _, instrucoes_gravadas, codigo = evento
+        self.conferir(EVENTO_ENTRADA, instrucoes_gravadas, codigo, codigo)
+        return chr(codigo)
+
+    def escrever_saida(self, texto:str):
+        "Escreve a saída e confere com a gravação"
+        evento = next(self.saidas, None)
+        if evento is None:
+            self.registrar_divergencia(EVENTO_SAIDA, None, ord(texto))
+        else:
+            _, instrucoes_gravadas, codigo = evento
+            self.conferir(EVENTO_SAIDA, instrucoes_gravadas, codigo, ord(texto))
+        self.saida_original(texto)
+
+    def descartar_saida(self, _texto:str):
+        "Saída do modo rápido, para instruções de saída não trocadas pelo envoltório"
+
+    def conferir(self, tipo, instrucoes_gravadas, codigo_gravado, codigo):
+        "Registra divergência se o evento não for igual ao gravado"
+        if self.divergencia is not None:
+            return
+        if codigo != codigo_gravado or \
+                instrucoes_executadas(self.interpretador) != instrucoes_gravadas:
+            self.registrar_divergencia(tipo, (instrucoes_gravadas, codigo_gravado), codigo)
+
+    def registrar_divergencia(self, tipo, gravado, codigo):
+        "Guarda a primeira divergência encontrada"
+        if self.divergencia is None:
+            self.divergencia = {
+                "tipo": "entrada" if tipo == EVENTO_ENTRADA else "saida",
+                "linha_codigo": self.interpretador.linha_codigo,
+                "instrucoes_executadas": instrucoes_executadas(self.interpretador),
+                "gravado": gravado,
+                "codigo": codigo,
+            }
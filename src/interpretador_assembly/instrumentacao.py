@@ -0,0 +1,96 @@
+"""
+Camadas de instrumentação das instruções.
+
+O ``Depurador`` e o ``HistoricoExecucao`` trocam instruções de \
+    ``instrucoes_decodificadas`` por uma versão que faz algo antes ou \
+    depois de executar o mnemônico original. Para o resto do interpretador \
+    (estatísticas, grafo de fluxo, memoização, o próprio depurador), a \
+    instrução envolvida tem que continuar igual à original.
+
+O ``MnemonicoEnvolvido`` repassa ao original tudo o que não define: \
+    ``parametros``, ``desvio``, ``leituras``, ``escritas``, ``efeitos``, \
+    ``custo``, ``efeitos_instrucao()`` e atributos próprios do mnemônico.
+
+Camadas
+---
+Vários envoltórios podem estar na mesma instrução. ``envolver()`` e \
+    ``desenvolver()`` colocam e tiram uma camada só, sem mexer nas \
+    outras, e as camadas ficam sempre na ordem de ``ordem`` (a maior por fora):
+
+- ``Depurador`` (2): pausa num ponto de parada antes de qualquer \
+    outra camada registrar a instrução
+- ``HistoricoExecucao`` (1): grava as alterações da instrução
+"""
+
+from interpretador_assembly.modelos.mnemonico import Mnemonico
+
+
+class MnemonicoEnvolvido(Mnemonico):
+    """
+    Envolve um mnemônico, repassando os metadados para ele.
+
+    ``original`` é definido pelo ``envolver()``. Subclasses sobrescrevem \
+        ``executar()``, chamam ``self.original.executar()`` e retornam \
+        o resultado dele (desvio tomado).
+    """
+
+    # posição da camada: maior fica por fora
+    ordem = 0
+
+    # pylint: disable=super-init-not-called
+    # Mnemonico.__init__ criaria metadados próprios, que esconderiam os do original
+    def __init__(self):
+        self.original = None
+
+    def __getattr__(self, nome):
+        # só é chamado para atributos que o envoltório não tem
+        if nome == "original":
+            raise AttributeError(nome)
+        return getattr(self.original, nome)
+
+    def efeitos_instrucao(self, params:list):
+        return self.original.efeitos_instrucao(params)
+
+    def executar(self, interpretador_assembly, params:list):
+        return self.original.executar(interpretador_assembly, params)
+
+
+def envolver(programa:list, indice:int, envoltorio:MnemonicoEnvolvido):
+    """
+    Coloca a camada ``envoltorio`` na instrução ``indice``, abaixo das \
+        camadas de ``ordem`` maior.
+    """
+    nome_mnemonico, mnemonico, parametros = programa[indice]
+    acima = None
+    while isinstance(mnemonico, MnemonicoEnvolvido) and mnemonico.ordem > envoltorio.ordem:
+        acima, mnemonico = mnemonico, mnemonico.original
+
+    envoltorio.original = mnemonico
+    if acima is None:
+        programa[indice] = (nome_mnemonico, envoltorio, parametros)
+    else:
+        acima.original = envoltorio
+    return envoltorio
+
+
+def desenvolver(programa:list, indice:int, envoltorio:MnemonicoEnvolvido):
+    """
+    Tira só a camada ``envoltorio`` da instrução ``indice``, \
+        mantendo as outras camadas.
+
+    Retorna se a camada foi encontrada.
+    """
+    instrucao = programa[indice]
+    if instrucao is None:
+        return False
+    nome_mnemonico, mnemonico, parametros = instrucao
+    if mnemonico is envoltorio:
+        programa[indice] = (nome_mnemonico, envoltorio.original, parametros)
+        return True
+
+    while isinstance(mnemonico, MnemonicoEnvolvido):
+        if mnemonico.original is envoltorio:
+            mnemonico.original = envoltorio.original
+            return True
+        mnemonico = mnemonico.original
+    return False
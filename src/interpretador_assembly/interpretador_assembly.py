@@ -19,10 +19,41 @@ O interpretador vai fazer injeção de dependência, procurando na pasta mnemoni
 
 from typing import Dict
 import re
+import time
 import importlib
 import importlib.resources
 from interpretador_assembly.erros.lexical_error import LexicalError
-from interpretador_assembly.modelos.mnemonico import Mnemonico
+from interpretador_assembly.erros.limite_execucao_error import LimiteExecucaoError
+from interpretador_assembly.erros.mnemonico_invalido_error import MnemonicoInvalidoError
+from interpretador_assembly.erros.semantic_error import SemanticError
+from interpretador_assembly.estatisticas import EstatisticasExecucao
+from interpretador_assembly.modelos.mnemonico import Mnemonico, TIPOS_PARAMETRO, DESVIOS, EFEITOS
+
+EFEITOS_ENTRADA_SAIDA = {"entrada", "saida"}
+
+# Trecho da linha antes do comentário. Literal de texto ("...") pode ter
+# qualquer caractere menos '"', inclusive '--' e ':'; sem aspas de
+# fechamento, vai até o fim da linha (e a validação acusa a aspa faltando)
+ANTES_DO_COMENTARIO = re.compile(r'(?:"[^"]*"?|[^"-]|-(?!-))*')
+
+
+def remover_comentario(linha:str):
+    "Linha sem o comentário (``--`` fora de literal de texto)"
+    return ANTES_DO_COMENTARIO.match(linha).group()
+
+
+def separar_label(instrucao:str):
+    """
+    Retorna ``(label, instrucao)``. ``label`` é None se a linha não tiver label.
+
+    Só conta o ``:`` antes do primeiro literal de texto.
+    """
+    aspas = instrucao.find('"')
+    posicao = instrucao.find(':', 0, len(instrucao) if aspas < 0 else aspas)
+    if posicao < 0:
+        return None, instrucao
+    return instrucao[:posicao].strip(), instrucao[posicao + 1:]
+
 
 class InterpretadorAssembly:
     """
@@ -57,19 +88,108 @@ Labels:\t\t{self.labels}\
         "expected_closing": lambda l,n,t: \
             f"expected closing '{t}' at line {n}\n{l}",
         "expected_operator": lambda l,n,t: f"expected operator after '{t}' at line {n}\n{l}",
+        "unexpected_operator": lambda l,n,t: f"unexpected operator '{t}' at line {n}\n{l}",
+    }
+    MENSAGENS_ERRO_SEMANTICO = {
+        "undefined_label": lambda l,n,t: f"label '{t}' is not defined, at instruction {n}\n{l}",
     }
 
     def __init__(self):
+        self.labels = {}
+        self.instrucoes = []
+        self.instrucoes_decodificadas = []
+        self.mnemonicos:Dict[str, Mnemonico] = dict()
+        self.injetar_mnemonicos()
+
+        # Funções usadas pelo INT para ler e escrever caracteres.
+        # Podem ser trocadas para rodar sem terminal (ex: servidor)
+        self.entrada = input
+        self.saida = print
+
+        # Duração em segundos de cada fase (validacao, carregamento, execucao)
+        self.tempos_fases = {}
+
+        # Grafo de fluxo de controle do programa, ver fluxo_controle.obter_grafo()
+        self.grafo_fluxo = None
+
+        # Opcional: mapa_memoria.MapaAcessosMemoria, para contar acessos por endereço
+        self.mapa_memoria = None
+
+        # Sincronização entre núcleos (ver multinucleo.py), usada pelos
+        # mnemônicos atômicos e pela BARREIRA. Sem núcleos, ficam None
+        self.trava_memoria = None
+        self.barreira = None
+
+        # Opcional: execucao_reversa.HistoricoExecucao, para voltar instruções
+        self.historico = None
+
+        self.reiniciar_estado()
+
+    def reiniciar_estado(self):
+        """
+        Volta registradores, memória e linha de execução ao estado inicial.
+
+        As instruções e labels carregadas não são alteradas, então o mesmo \
+            programa pode ser executado de novo sem validar e carregar.
+        """
         self.registers = {
             'CP': 0         # CP = "ComPare"
             }
-        self.labels = {}
         self.variaveis = {}
         self.memory = [0] * 255 + [1.2]
         self.linha_codigo = 0
-        self.instrucoes = []
-        self.mnemonicos:Dict[str, Mnemonico] = dict()
-        self.injetar_mnemonicos()
+        self.zerar_contadores()
+
+    def zerar_contadores(self):
+        """
+        Zera os contadores de execução (ver ``obter_estatisticas()``).
+
+        Os contadores são por instrução, em listas do tamanho do programa, \
+            para a contagem custar só um ``+= 1`` por instrução executada.
+
+        ``instrucoes_executadas`` é o total (a soma de ``contagem_instrucoes``), \
+            atualizado durante a execução, para quem precisa dele no meio \
+            (ex: gravação do INT) não somar a lista inteira.
+        """
+        quantidade_instrucoes = len(self.instrucoes_decodificadas)
+        self.instrucoes_executadas = 0
+        self.contagem_instrucoes = [0] * quantidade_instrucoes
+        self.contagem_desvios_tomados = [0] * quantidade_instrucoes
+        self.leituras_memoria = 0
+        self.escritas_memoria = 0
+
+    def obter_estatisticas(self):
+        "Retorna as estatísticas da última execução"
+        desvios = []
+        chamadas_int = 0
+        for indice, instrucao in enumerate(self.instrucoes_decodificadas):
+            if instrucao is None:
+                continue
+            _, mnemonico, _ = instrucao
+            execucoes = self.contagem_instrucoes[indice]
+
+            if mnemonico is not None and mnemonico.efeitos and \
+                    EFEITOS_ENTRADA_SAIDA.intersection(mnemonico.efeitos):
+                chamadas_int += execucoes
+
+            if mnemonico is not None and mnemonico.desvio == "condicional":
+                tomados = self.contagem_desvios_tomados[indice]
+                desvios.append({
+                    "indice": indice,
+                    "instrucao": self.instrucoes[indice].strip(),
+                    "tomados": tomados,
+                    "nao_tomados": execucoes - tomados,
+                })
+
+        return EstatisticasExecucao(
+            instrucoes_executadas=self.instrucoes_executadas,
+            execucoes_por_instrucao=list(self.contagem_instrucoes),
+            desvios=desvios,
+            leituras_memoria=self.leituras_memoria,
+            escritas_memoria=self.escritas_memoria,
+            chamadas_int=chamadas_int,
+            tempos=dict(self.tempos_fases),
+        )
 
 
     def carregar_codigo(self, code):
@@ -100,42 +220,116 @@ Labels:\t\t{self.labels}\
             "label1": 2
         }
         ```
+
+        Depois de carregar, as instruções também são decodificadas \
+            (ver ``decodificar_programa()``).
         """
+        inicio = time.perf_counter()
+
         for _, linha in enumerate(code.split('\n')):
 
-            linha_tratada = linha.split("--")[0].strip()
+            linha_tratada = remover_comentario(linha).strip()
 
             # se linha tratada estiver vazia, pula para a próxima linha
             if not linha_tratada:
                 continue
 
-            # Se a linha tiver ':', ela possui label
-            if ':' in linha_tratada:
-                # separa a label do resto da linha tratada
-                label, linha_tratada = linha_tratada.split(':', 1)
-                label = label.strip()  # remove espaço em branco da label
-
+            # Se a linha tiver ':' (fora de literal de texto), ela possui label
+            label, linha_tratada = separar_label(linha_tratada)
+            if label is not None:
                 # len(instrucoes) nesse contexto é sempre a linha atual do label
                 self.labels[label] = len(self.instrucoes)
 
             # Adiciona linha tratada nas instruções
             self.instrucoes.append(linha_tratada)
 
+        self.decodificar_programa()
+
+        self.tempos_fases["carregamento"] = time.perf_counter() - inicio
+
+    def decodificar_instrucao(self, instrucao:str):
+        """
+        Transforma uma instrução em ``(nome_mnemonico, mnemonico, parametros)``.
+
+        Exemplo:
+        ```
+        "MOVE      A, 1"  ->  ("MOVE", <MOVE>, ["A", "1"])
+        ```
+
+        Instrução vazia vira ``None``. Se o mnemônico não existir, \
+            ``mnemonico`` é ``None`` e a instrução é ignorada na execução.
+        """
+        if not instrucao.strip():
+            return None
+
+        # token_1 pode ser label ou um mnemônico
+        # *parametros será a lista de parâmetros: [parametro_1, param_2, ...]
+        # literal de texto com espaços ("Ola mundo") é um parâmetro só
+        if '"' in instrucao:
+            token_1, *parametros = re.findall(r'"[^"]*",?|\S+', instrucao)
+        else:
+            token_1, *parametros = instrucao.split()
+
+        # Tira vírgula dos parâmetros
+        parametros = [i.strip(',') for i in parametros]
+
+        return token_1, self.mnemonicos.get(token_1), parametros
+
+    def decodificar_programa(self):
+        """
+        Decodifica todas as instruções em ``instrucoes_decodificadas``.
+
+        A label de destino dos mnemônicos de desvio (JUMP, JTRUE, JFALSE) \
+            é trocada pelo índice da instrução, então durante a execução \
+            o desvio só atribui a linha, sem procurar a label no dicionário.
+
+        Erros
+        ---
+        ``SemanticError``: se um desvio usar uma label que não existe
+        """
+        self.instrucoes_decodificadas = []
+        for indice, instrucao in enumerate(self.instrucoes):
+            decodificada = self.decodificar_instrucao(instrucao)
+            if decodificada is not None:
+                decodificada = self.resolver_desvio(decodificada, indice)
+            self.instrucoes_decodificadas.append(decodificada)
+
+        self.zerar_contadores()
+
+    def resolver_desvio(self, decodificada:tuple, indice:int):
+        "Troca a label de destino de um desvio pelo índice da instrução"
+        nome_mnemonico, mnemonico, parametros = decodificada
+        if mnemonico is None or not mnemonico.desvio:
+            return decodificada
+
+        nome_label = parametros[0] if parametros else ""
+        if nome_label not in self.labels:
+            raise SemanticError(self.MENSAGENS_ERRO_SEMANTICO["undefined_label"](
+                self.instrucoes[indice], indice, nome_label))
+
+        return nome_mnemonico, mnemonico, [self.labels[nome_label], *parametros[1:]]
+
     def executar_validacao(self, code):
         "Load instructions to compiler"
+        inicio = time.perf_counter()
         self.instrucoes = []
         self.labels = {}
         for i, line in enumerate(code.split('\n')):
-            line_1 = line.split("--")[0].strip()
+            line_1 = remover_comentario(line).strip()
             if not line_1:
                 continue
 
             self.analisar_erro_lexico(line, i)
             self.analisar_erro_sintatico(line, i)
 
-    def executar_codigo(self):
+        self.tempos_fases["validacao"] = time.perf_counter() - inicio
+
+    def executar_codigo(self, limite_instrucoes=None):
         """
         Executa o código
+
+        ``limite_instrucoes``: se informado, lança ``LimiteExecucaoError`` \
+            quando o programa executar mais instruções que o limite.
         
         1. Transformar isntrução em lista de tokens
 
@@ -151,35 +345,58 @@ Labels:\t\t{self.labels}\
         
         Por que não transformar instruções em lista de uma vez só?
         - Para poder fazer a validação do código em texto
+
+        A transformação é feita uma vez só, no ``carregar_codigo()``, \
+            e aqui são usadas as ``instrucoes_decodificadas``.
         """
-        # Percorre pela lista de instruções assembly
-        while self.linha_codigo < len(self.instrucoes):
+        inicio = time.perf_counter()
+        try:
+            self.executar_programa(limite_instrucoes)
+        finally:
+            self.tempos_fases["execucao"] = time.perf_counter() - inicio
 
-            # obtém instrução assembly na respectiva linha
-            instrucao = self.instrucoes[self.linha_codigo]
+    def executar_programa(self, limite_instrucoes=None):
+        "Laço principal de execução, usado pelo ``executar_codigo()``"
+        programa = self.instrucoes_decodificadas
+        contagem_instrucoes = self.contagem_instrucoes
+        contagem_desvios_tomados = self.contagem_desvios_tomados
+        limite_total = None if limite_instrucoes is None \
+            else self.instrucoes_executadas + limite_instrucoes
+
+        # Percorre pela lista de instruções decodificadas
+        while self.linha_codigo < len(programa):
+
+            # obtém instrução decodificada na respectiva linha
+            indice = self.linha_codigo
+            instrucao = programa[indice]
 
             # se não tiver mais instruções, vai para próxima linha
-            if not instrucao:
+            if instrucao is None:
                 self.linha_codigo += 1
                 continue
 
-            # 1. Transformar instrução em lista de tokens
-            # token_1 pode ser label ou um mnemônico
-            # *parametros será a lista de parâmetros: [parametro_1, param_2, ...]
-            token_1, *parametros = instrucao.split()
-
-            # Se token_1 for mnemônico HALT, para de executar o código
-            if token_1 == "HALT":
+            # linhas vazias não contam no limite
+            if limite_total is not None and self.instrucoes_executadas >= limite_total:
+                raise LimiteExecucaoError(
+                    f"instruction limit of {limite_instrucoes} exceeded "
+                    f"at line {self.linha_codigo}")
+
+            nome_mnemonico, mnemonico, parametros = instrucao
+            contagem_instrucoes[indice] += 1
+            self.instrucoes_executadas += 1
+
+            # Se for mnemônico HALT, para de executar o código
+            if nome_mnemonico == "HALT":
+                # o HALT não passa pelo mnemônico, então o histórico é avisado aqui
+                if self.historico is not None:
+                    self.historico.registrar_parada(indice)
                 return
 
-            # Se token_1 for um mnemônico que existe na lista de mnemônicos, executa
-            if token_1 in self.mnemonicos:
-                nome_mnemonico = token_1
-
-                # Tira vírgula dos parâmetros
-                parametros = [i.strip(',') for i in parametros]
-
-                self.executar_mnemonico(nome_mnemonico, parametros)
+            # Se for um mnemônico que existe na lista de mnemônicos, executa
+            if mnemonico is not None:
+                # desvios retornam se foram tomados (ver Mnemonico.executar)
+                if mnemonico.executar(self, parametros):
+                    contagem_desvios_tomados[indice] += 1
 
             self.linha_codigo += 1
 
@@ -187,8 +404,9 @@ Labels:\t\t{self.labels}\
         "Check for lexical errors in a given line of assembly code"
 
         # Check for invalid characters
+        # literais de texto viram "", então podem ter qualquer caractere
         line = line.strip()
-        line_1 = line.split("--")[0].split()
+        line_1 = self.treat_line(line).split()
         if not line_1:
             return
 
@@ -213,8 +431,10 @@ Labels:\t\t{self.labels}\
     def treat_line(self, line:str):
         "Treat assembly line and return teated line and a list of tokens"
         line_treated = line.strip()  # Ignore spaces
-        line_treated = line_treated.split("--")[0]  # Ignore comment
-        line_treated = re.sub(r'"[^"]*"', '""', line_treated)
+        line_treated = remover_comentario(line_treated)  # Ignore comment
+        # literal sem aspas de fechamento fica só com a aspa de abertura
+        line_treated = re.sub(r'"[^"]*("|$)',
+                              lambda literal: '""' if literal.group(1) else '"', line_treated)
         return line_treated
 
     def analisar_erro_sintatico(self, line:str, line_index):
@@ -292,6 +512,12 @@ Labels:\t\t{self.labels}\
                 raise SyntaxError(self.MENSAGENS_ERRO_SINTATICO[
                     "expected_token"](line, line_index, ','))
 
+            # Erro: mais parâmetros que o mnemônico aceita
+            parametros = self.mnemonicos[mnemonico].parametros
+            if parametros and len(operators) > len(parametros):
+                raise SyntaxError(self.MENSAGENS_ERRO_SINTATICO[
+                    "unexpected_operator"](line, line_index, operators[len(parametros)].strip(',')))
+
             # Erro: tipo de parâmetro incorreto
             if self.mnemonicos[mnemonico].parametros:
                 for i, operator in enumerate(operators):
@@ -337,9 +563,11 @@ Labels:\t\t{self.labels}\
 
     def token_e_literal(self, operator:str):
         "Se token é literal ('abc' ou 123)"
-        operador_e_str = len(operator) > 1 and operator[0]+operator[-1] == '""'
+        return self.token_e_texto(operator) or operator.isnumeric()
 
-        return operador_e_str or operator.isnumeric()
+    def token_e_texto(self, operator:str):
+        "Se token é literal de texto (\"abc\")"
+        return len(operator) > 1 and operator[0]+operator[-1] == '""'
 
     def token_e_mnemonico(self, operator):
         "Se token é mnemonico"
@@ -357,6 +585,8 @@ Labels:\t\t{self.labels}\
             tipos_encontrados += ["label"]
         if self.token_e_literal(token):
             tipos_encontrados += ["literal"]
+        if self.token_e_texto(token):
+            tipos_encontrados += ["texto"]
         if self.token_e_nome_variavel(token):
             tipos_encontrados += ["nome_variavel"]
         if self.token_e_mnemonico(token):
@@ -375,7 +605,7 @@ Labels:\t\t{self.labels}\
             return self.registers[operator]
         # memory
         elif self.token_e_label(operator):
-            return self.memory[self.labels[operator]]
+            return self.get_memory(self.labels[operator])
         # value
         else:
             if operator.isnumeric():
@@ -388,15 +618,67 @@ Labels:\t\t{self.labels}\
     def set_operator(self, operator_value, destino:str):
         "Set operator value based on register or label"
         if destino in self.labels:
-            label = self.labels[destino]
-            self.memory[label] = operator_value
+            self.set_memory(self.labels[destino], operator_value)
         else:
             self.registers[destino] = operator_value
 
+    def get_endereco(self, operator:str):
+        "Get memory address from label or address literal"
+        if operator in self.labels:
+            return self.labels[operator]
+        return int(operator)
+
     def get_memory(self, memory_address:int):
         "Get content from memory address"
+        self.leituras_memoria += 1
+        if self.mapa_memoria is not None:
+            self.mapa_memoria.registrar_leitura(memory_address)
         return self.memory[memory_address]
 
+    def set_memory(self, memory_address:int, value):
+        "Set content of memory address"
+        self.escritas_memoria += 1
+        if self.mapa_memoria is not None:
+            self.mapa_memoria.registrar_escrita(memory_address)
+        if self.historico is not None:
+            self.historico.registrar_memoria(memory_address, self.memory[memory_address])
+        self.memory[memory_address] = value
+
+    def validar_bloco(self, memory_address:int, quantidade:int):
+        "Check that the memory block is inside the memory"
+        if quantidade < 0 or memory_address < 0 or memory_address + quantidade > len(self.memory):
+            raise IndexError(f"memory block [{memory_address}, {memory_address + quantidade}) "
+                             f"out of range (memory size {len(self.memory)})")
+
+    def get_memory_bloco(self, memory_address:int, quantidade:int):
+        "Get ``quantidade`` contents from memory, starting at memory address"
+        self.validar_bloco(memory_address, quantidade)
+        self.leituras_memoria += quantidade
+        if self.mapa_memoria is not None:
+            for endereco in range(memory_address, memory_address + quantidade):
+                self.mapa_memoria.registrar_leitura(endereco)
+        return self.memory[memory_address:memory_address + quantidade]
+
+    def set_memory_bloco(self, memory_address:int, valores:list):
+        "Set contents of memory, starting at memory address, with one slice assignment"
+        quantidade = len(valores)
+        self.validar_bloco(memory_address, quantidade)
+        self.escritas_memoria += quantidade
+        if self.mapa_memoria is not None:
+            for endereco in range(memory_address, memory_address + quantidade):
+                self.mapa_memoria.registrar_escrita(endereco)
+        if self.historico is not None:
+            self.historico.registrar_memoria_bloco(
+                memory_address, self.memory[memory_address:memory_address + quantidade])
+        self.memory[memory_address:memory_address + quantidade] = valores
+
+    def vincular_variavel(self, label:str, memory_address:int):
+        "Associa a label ao endereço de memória (usado pelo VAR)"
+        if self.historico is not None:
+            self.historico.registrar_variavel(label)
+        self.labels[label] = memory_address
+        self.variaveis[label] = memory_address
+
     def injetar_mnemonicos(self):
         """
         Para injeção de dependência.
@@ -434,7 +716,57 @@ Labels:\t\t{self.labels}\
             obj = getattr(modulo_arquivo, dado)
             if isinstance(obj, type) and issubclass(obj, Mnemonico) and obj is not Mnemonico:
                 nome_mnemonico = obj.__name__
-                self.mnemonicos[nome_mnemonico] = obj()
+                mnemonico = obj()
+                self.validar_mnemonico(nome_mnemonico, mnemonico)
+                self.mnemonicos[nome_mnemonico] = mnemonico
+
+    @staticmethod
+    def validar_mnemonico(nome_mnemonico:str, mnemonico:Mnemonico):
+        """
+        Confere os parâmetros e metadados declarados pelo mnemônico \
+            (ver ``Mnemonico``).
+
+        Erros
+        ---
+        ``MnemonicoInvalidoError``: se alguma declaração for inválida
+        """
+        def erro(mensagem):
+            return MnemonicoInvalidoError(f"mnemonic '{nome_mnemonico}': {mensagem}")
+
+        nomes_parametros = []
+        for parametro in mnemonico.parametros:
+            if not isinstance(parametro, dict) or "nome" not in parametro \
+                    or "tipos_permitidos" not in parametro:
+                raise erro("each parameter needs 'nome' and 'tipos_permitidos'")
+            tipos_invalidos = set(parametro["tipos_permitidos"]) - TIPOS_PARAMETRO
+            if tipos_invalidos:
+                raise erro(f"unknown parameter types {sorted(tipos_invalidos)}")
+            nomes_parametros.append(parametro["nome"])
+
+        if mnemonico.desvio not in DESVIOS:
+            raise erro(f"unknown desvio '{mnemonico.desvio}'")
+        if mnemonico.desvio and (not mnemonico.parametros or
+                                 "label" not in mnemonico.parametros[0]["tipos_permitidos"]):
+            raise erro("the first parameter of a branch must be a label")
+
+        # leituras e escritas: parâmetros ou registradores (em maiúsculas)
+        for atributo in ("leituras", "escritas"):
+            locais = getattr(mnemonico, atributo)
+            if locais is None:
+                continue
+            for local in locais:
+                if local not in nomes_parametros and not (local.isupper() and local.isalnum()):
+                    raise erro(f"'{local}' in {atributo} is not a parameter or a register")
+
+        if mnemonico.efeitos is not None:
+            efeitos_invalidos = set(mnemonico.efeitos) - EFEITOS
+            if efeitos_invalidos:
+                raise erro(f"unknown effects {sorted(efeitos_invalidos)}")
+
+        # bool também é int
+        if not isinstance(mnemonico.custo, int) or isinstance(mnemonico.custo, bool) \
+                or mnemonico.custo <= 0:
+            raise erro("custo must be a positive integer")
 
 
     def executar_mnemonico(self, nome_mnemonico:str, parametros: list[str]):
@@ -444,4 +776,4 @@ Labels:\t\t{self.labels}\
         Exemplo:
         ADD, SUBT
         """
-        self.mnemonicos[nome_mnemonico].executar(self, parametros)
+        return self.mnemonicos[nome_mnemonico].executar(self, parametros)
@@ -0,0 +1,163 @@
+"""
+Mapa de acessos à memória (heatmap).
+
+Opcional: conta as leituras e escritas de cada endereço de memória feitas \
+    pelo ``get_operator``, ``set_operator``, ``get_memory``, ``set_memory`` \
+    (labels do VAR e INT passam por eles).
+
+Amostragem
+---
+Com ``taxa_amostragem = N``, cada acesso é contado com probabilidade 1/N, \
+    para poder deixar ligado em produção com custo limitado. \
+    ``estimar()`` multiplica as contagens por N.
+
+O intervalo até o próximo acesso contado é sorteado (distribuição \
+    geométrica), com um gerador com ``semente`` para o resultado ser \
+    reproduzível. Leituras e escritas têm sorteios separados. Um intervalo \
+    fixo (1 de cada N) coincidiria com laços periódicos: um laço que passa \
+    por N endereços em rodízio teria todas as amostras no mesmo endereço.
+
+Viés e erro da estimativa
+---
+A estimativa de um endereço com ``n`` acessos é ``N * amostras``, com \
+    ``amostras ~ Binomial(n, 1/N)``: não tem viés (valor esperado ``n``), \
+    e o desvio padrão é ``sqrt(n * (N - 1))``, um erro relativo de \
+    ``sqrt((N - 1) / n)``. Endereços pouco acessados (``n`` perto de N ou \
+    menor) podem aparecer com 0 ou com ``N``; só os endereços quentes têm \
+    estimativa precisa.
+
+Exemplo
+---
+```python
+interpretador.mapa_memoria = MapaAcessosMemoria(len(interpretador.memory), 10)
+interpretador.executar_codigo()
+print(interpretador.mapa_memoria.heatmap_texto(interpretador.variaveis))
+```
+"""
+
+import math
+import random
+from array import array
+
+# Do menos acessado para o mais acessado
+TONS = " ░▒▓█"
+
+
+class MapaAcessosMemoria:
+    """
+    Contagem de leituras e escritas por endereço.
+
+    ``leituras`` e ``escritas`` são ``array('Q')``, que pode ser usado \
+        direto pelo NumPy (``numpy.frombuffer``), sem cópia.
+    """
+
+    def __init__(self, tamanho_memoria:int, taxa_amostragem=1, semente=0):
+        if taxa_amostragem < 1:
+            raise ValueError("taxa_amostragem must be at least 1")
+        self.taxa_amostragem = taxa_amostragem
+        self.semente = semente
+        self.leituras = array('Q', bytes(8 * tamanho_memoria))
+        self.escritas = array('Q', bytes(8 * tamanho_memoria))
+
+        # contagem regressiva até a próxima leitura e escrita amostradas
+        self.gerador = random.Random(semente)
+        self.proxima_leitura = self.sortear_intervalo()
+        self.proxima_escrita = self.sortear_intervalo()
+
+    def sortear_intervalo(self):
+        """
+        Quantos acessos até o próximo contado (contando ele), \
+            na distribuição geométrica com probabilidade 1/N
+        """
+        if self.taxa_amostragem == 1:
+            return 1
+        return int(math.log(1.0 - self.gerador.random()) /
+                   math.log(1.0 - 1.0 / self.taxa_amostragem)) + 1
+
+    def registrar_leitura(self, endereco:int):
+        "Conta uma leitura, se for a vez da amostra"
+        self.proxima_leitura -= 1
+        if self.proxima_leitura:
+            return
+        self.proxima_leitura = self.sortear_intervalo()
+        self.leituras[endereco] += 1
+
+    def registrar_escrita(self, endereco:int):
+        "Conta uma escrita, se for a vez da amostra"
+        self.proxima_escrita -= 1
+        if self.proxima_escrita:
+            return
+        self.proxima_escrita = self.sortear_intervalo()
+        self.escritas[endereco] += 1
+
+    def estimar(self, contagens:array):
+        "Contagens multiplicadas pela taxa de amostragem"
+        if self.taxa_amostragem == 1:
+            return array('Q', contagens)
+        return array('Q', (contagem * self.taxa_amostragem for contagem in contagens))
+
+    def para_numpy(self):
+        """
+        Retorna ``(leituras, escritas)`` como arrays do NumPy, sem cópia.
+
+        Precisa do NumPy instalado.
+        """
+        import numpy  # pylint: disable=import-outside-toplevel
+        return numpy.frombuffer(self.leituras, dtype=numpy.uint64), \
+            numpy.frombuffer(self.escritas, dtype=numpy.uint64)
+
+    def zerar(self):
+        "Zera as contagens"
+        tamanho = len(self.leituras)
+        self.leituras = array('Q', bytes(8 * tamanho))
+        self.escritas = array('Q', bytes(8 * tamanho))
+        self.gerador = random.Random(self.semente)
+        self.proxima_leitura = self.sortear_intervalo()
+        self.proxima_escrita = self.sortear_intervalo()
+
+    def heatmap_texto(self, variaveis:dict, largura=30):
+        """
+        Heatmap em texto, uma linha por label do VAR, \
+            e uma linha por endereço acessado sem label.
+
+        ``variaveis``: ``{label: endereco}``, ex: ``interpretador.variaveis``
+
+        Exemplo:
+        ```
+        label          endereço   leituras   escritas
+        valor                 0         14          6  ██████████████
+        [12]                 12          2          0  █
+        ```
+        """
+        linhas_mapa = []
+        enderecos_com_label = set()
+        for label, endereco in sorted(variaveis.items(), key=lambda item: item[1]):
+            enderecos_com_label.add(endereco)
+            linhas_mapa.append((label, endereco))
+
+        for endereco, (leituras, escritas) in enumerate(zip(self.leituras, self.escritas)):
+            if (leituras or escritas) and endereco not in enderecos_com_label:
+                linhas_mapa.append((f"[{endereco}]", endereco))
+
+        taxa = self.taxa_amostragem
+        maximo = max((self.leituras[e] + self.escritas[e] for _, e in linhas_mapa), default=0)
+
+        texto = [f"{'label':<14}{'endereço':>9}{'leituras':>11}{'escritas':>11}"]
+        if taxa > 1:
+            texto[0] += f"  (estimado, amostragem 1/{taxa})"
+        for nome, endereco in linhas_mapa:
+            leituras = self.leituras[endereco] * taxa
+            escritas = self.escritas[endereco] * taxa
+            total = self.leituras[endereco] + self.escritas[endereco]
+
+            barra = ""
+            if maximo:
+                tamanho = total * largura / maximo
+                barra = TONS[-1] * int(tamanho)
+                resto = tamanho - int(tamanho)
+                if resto and int(tamanho) < largura:
+                    barra += TONS[int(resto * (len(TONS) - 1))]
+
+            texto.append(f"{nome:<14}{endereco:>9}{leituras:>11}{escritas:>11}  {barra.rstrip()}")
+
+        return "\n".join(texto)
@@ -0,0 +1,248 @@
+"""
+Memoização de execuções determinísticas.
+
+Um programa que não lê a entrada (``INT 1``) nem depende de outros \
+    núcleos sempre chega no mesmo estado final a partir do mesmo estado \
+    inicial. O ``CacheResultados`` guarda esse estado final e a saída do \
+    ``INT 2``, indexados pelo hash do programa e do estado inicial \
+    (registradores, memória e limite de instruções), e devolve o resultado \
+    sem executar.
+
+A chave também tem a assinatura dos mnemônicos (``assinatura_mnemonicos()``) \
+    e ``VERSAO_RESULTADOS``: um resultado guardado no disco por outra versão \
+    do interpretador, ou com outro conjunto de mnemônicos, não é reaproveitado.
+
+É opcional: o servidor só usa com ``--memoizar``.
+
+Níveis
+---
+- memória: LRU limitado por quantidade e por bytes
+- disco (opcional): um arquivo JSON por resultado em ``diretorio``, \
+    também limitado por bytes; os resultados lidos do disco voltam para a memória
+
+Exemplo
+---
+```python
+cache = CacheResultados(diretorio="resultados")
+if programa_deterministico(interpretador):
+    assinatura = assinatura_mnemonicos(interpretador.mnemonicos)
+    chave = cache.gerar_chave(hash_programa, assinatura,
+                              interpretador.registers, interpretador.memory)
+    resultado = cache.obter(chave)
+```
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+# programas com instruções com estes efeitos não são memoizados
+EFEITOS_NAO_DETERMINISTICOS = {"entrada", "sincronizacao"}
+
+# mudar quando o interpretador passar a dar outro resultado para o mesmo
+# programa sem que os mnemônicos mudem (ex: laço de execução, formato do resultado)
+VERSAO_RESULTADOS = 1
+
+METADADOS_MNEMONICO = ("parametros", "desvio", "leituras", "escritas", "efeitos", "custo")
+
+
+def assinatura_codigo(codigo):
+    "Bytecode, nomes e constantes do código, sem o caminho do arquivo"
+    constantes = [assinatura_codigo(constante) if hasattr(constante, "co_code")
+                  else repr(constante) for constante in codigo.co_consts]
+    return [codigo.co_code.hex(), list(codigo.co_names), constantes]
+
+
+def valor_assinatura(valor):
+    "Valores fora do JSON na assinatura; conjuntos ordenados, para não depender do hash"
+    if isinstance(valor, (set, frozenset)):
+        return sorted(valor, key=repr)
+    return str(valor)
+
+
+def assinatura_mnemonicos(mnemonicos:dict):
+    """
+    Hash da tabela de mnemônicos: nome, classe, metadados e o código \
+        de ``executar()`` e ``efeitos_instrucao()`` de cada um.
+    """
+    tabela = []
+    for nome in sorted(mnemonicos):
+        mnemonico = mnemonicos[nome]
+        classe = type(mnemonico)
+        tabela.append([
+            nome, classe.__module__, classe.__qualname__,
+            [getattr(mnemonico, atributo) for atributo in METADADOS_MNEMONICO],
+            assinatura_codigo(classe.executar.__code__),
+            assinatura_codigo(classe.efeitos_instrucao.__code__),
+        ])
+    dados = json.dumps(tabela, sort_keys=True, default=valor_assinatura)
+    return hashlib.sha256(dados.encode("utf-8")).hexdigest()
+
+
+def programa_deterministico(interpretador):
+    """
+    Se o programa carregado sempre dá o mesmo resultado para o mesmo \
+        estado inicial, pelos ``efeitos`` das instruções.
+
+    Instrução com efeitos não declarados torna o programa não determinístico. \
+        Instrução de mnemônico ``puro`` é determinística com qualquer parâmetro.
+    """
+    for instrucao in interpretador.instrucoes_decodificadas:
+        if instrucao is None or instrucao[1] is None or instrucao[1].puro:
+            continue
+        _, mnemonico, parametros = instrucao
+        efeitos = mnemonico.efeitos_instrucao(parametros)
+        if efeitos is None or EFEITOS_NAO_DETERMINISTICOS.intersection(efeitos):
+            return False
+    return True
+
+
+class CacheResultados:
+    """
+    Cache LRU de resultados de execução, com nível opcional em disco.
+
+    Limites
+    ---
+    ``max_resultados``: quantidade máxima de resultados na memória
+
+    ``max_bytes``: soma máxima do tamanho dos resultados na memória, \
+        em bytes do JSON
+
+    ``diretorio``: pasta do nível em disco (None: sem disco)
+
+    ``max_bytes_disco``: soma máxima do tamanho dos arquivos no disco
+    """
+
+    def __init__(self, max_resultados=1024, max_bytes=64 * 1024 * 1024,
+                 diretorio=None, max_bytes_disco=1024 * 1024 * 1024):
+        self.max_resultados = max_resultados
+        self.max_bytes = max_bytes
+        self.resultados = OrderedDict()     # {chave: JSON do resultado}
+        self.bytes_usados = 0
+        self.acertos = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+        self.remocoes = 0
+
+        self.diretorio = diretorio
+        self.max_bytes_disco = max_bytes_disco
+        self.bytes_disco = 0
+        if diretorio is not None:
+            os.makedirs(diretorio, exist_ok=True)
+            self.bytes_disco = sum(os.path.getsize(caminho) for caminho in self.arquivos_disco())
+
+    @staticmethod
+    def gerar_chave(chave_programa:str, assinatura:str, registradores:dict, memoria,
+                    limite_instrucoes=None):
+        """
+        Hash do programa, da versão do interpretador, da assinatura dos \
+            mnemônicos (``assinatura_mnemonicos()``), do estado inicial \
+            e do limite de instruções
+        """
+        estado = json.dumps([registradores, list(memoria), limite_instrucoes],
+                            sort_keys=True, default=str)
+        return hashlib.sha256(f"{VERSAO_RESULTADOS}:{chave_programa}:{assinatura}:{estado}"
+                              .encode("utf-8")).hexdigest()
+
+    def caminho_disco(self, chave:str):
+        "Arquivo do resultado no nível em disco"
+        return os.path.join(self.diretorio, f"{chave}.json")
+
+    def arquivos_disco(self):
+        "Arquivos de resultado no disco"
+        return [os.path.join(self.diretorio, nome) for nome in os.listdir(self.diretorio)
+                if nome.endswith(".json")]
+
+    def obter(self, chave:str):
+        "Retorna o resultado do cache, ou None se não estiver no cache"
+        dados = self.resultados.get(chave)
+        if dados is not None:
+            # marca como usado recentemente
+            self.resultados.move_to_end(chave)
+            self.acertos += 1
+            return json.loads(dados)
+
+        if self.diretorio is not None:
+            try:
+                with open(self.caminho_disco(chave), "rb") as arquivo:
+                    dados = arquivo.read()
+            except FileNotFoundError:
+                dados = None
+            if dados is not None:
+                self.acertos_disco += 1
+                self.adicionar_memoria(chave, dados)
+                return json.loads(dados)
+
+        self.falhas += 1
+        return None
+
+    def adicionar(self, chave:str, resultado:dict):
+        """
+        Adiciona o resultado na memória e no disco, removendo os menos \
+            usados se passar dos limites.
+
+        ``resultado``: dicionário serializável em JSON, \
+            ex: ``{"registradores", "memoria", "linha_codigo", "saida"}``
+        """
+        dados = json.dumps(resultado, ensure_ascii=False).encode("utf-8")
+        self.adicionar_memoria(chave, dados)
+        if self.diretorio is not None:
+            self.adicionar_disco(chave, dados)
+
+    def adicionar_memoria(self, chave:str, dados:bytes):
+        "Adiciona no nível em memória"
+        # resultado maior que o cache inteiro não é guardado
+        if len(dados) > self.max_bytes:
+            return
+
+        if chave in self.resultados:
+            self.bytes_usados -= len(self.resultados.pop(chave))
+
+        self.resultados[chave] = dados
+        self.bytes_usados += len(dados)
+
+        while len(self.resultados) > self.max_resultados or self.bytes_usados > self.max_bytes:
+            _, removido = self.resultados.popitem(last=False)
+            self.bytes_usados -= len(removido)
+            self.remocoes += 1
+
+    def adicionar_disco(self, chave:str, dados:bytes):
+        "Adiciona no nível em disco, removendo os arquivos mais antigos se passar do limite"
+        if len(dados) > self.max_bytes_disco:
+            return
+
+        caminho = self.caminho_disco(chave)
+        if os.path.exists(caminho):
+            self.bytes_disco -= os.path.getsize(caminho)
+
+        # grava num temporário e renomeia, para outro processo não ler pela metade
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(dados)
+        os.replace(temporario, caminho)
+        self.bytes_disco += len(dados)
+
+        if self.bytes_disco > self.max_bytes_disco:
+            for antigo in sorted(self.arquivos_disco(), key=os.path.getmtime):
+                if self.bytes_disco <= self.max_bytes_disco:
+                    break
+                self.bytes_disco -= os.path.getsize(antigo)
+                os.remove(antigo)
+                self.remocoes += 1
+
+    def estatisticas(self):
+        "Contadores do cache, para dimensionar os limites"
+        consultas = self.acertos + self.acertos_disco + self.falhas
+        return {
+            "resultados": len(self.resultados),
+            "bytes": self.bytes_usados,
+            "bytes_disco": self.bytes_disco,
+            "max_resultados": self.max_resultados,
+            "max_bytes": self.max_bytes,
+            "acertos": self.acertos,
+            "acertos_disco": self.acertos_disco,
+            "falhas": self.falhas,
+            "remocoes": self.remocoes,
+            "taxa_acerto": (self.acertos + self.acertos_disco) / consultas if consultas else 0.0,
+        }
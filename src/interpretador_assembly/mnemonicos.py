@@ -1,5 +1,6 @@
 """Arquivo para classe do mnemonico ADD"""
 
+from contextlib import nullcontext
 from interpretador_assembly.modelos.mnemonico import Mnemonico
 from interpretador_assembly.interpretador_assembly import InterpretadorAssembly
 
@@ -24,6 +25,12 @@ class ADD(Mnemonico):
             }
         ]
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["variavel_destino", "variavel_origem"]
+        self.escritas = ["variavel_destino"]
+        self.efeitos = []
+        self.custo = 1
+
     def executar(self, interpretador_assembly, params:list):
         # Ler parâmetros
         destino, origem = params
@@ -56,6 +63,12 @@ class MOVE(Mnemonico):
             }
         ]
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["origem"]
+        self.escritas = ["destino"]
+        self.efeitos = []
+        self.custo = 1
+
     def executar(self, interpretador_assembly, params:list):
         # Ler parâmetros
         destino, origem = params
@@ -87,6 +100,12 @@ class SUBT(Mnemonico):
             }
         ]
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["variavel_destino", "variavel_origem"]
+        self.escritas = ["variavel_destino"]
+        self.efeitos = []
+        self.custo = 1
+
     def executar(self, interpretador_assembly, params:list):
         """
         Adiciona um número ao registrador
@@ -132,6 +151,12 @@ class MULT(Mnemonico):
             }
         ]
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["variavel_destino", "variavel_origem"]
+        self.escritas = ["variavel_destino"]
+        self.efeitos = []
+        self.custo = 2
+
     def executar(self, interpretador_assembly, params:list):
         """
         Adiciona um número ao registrador
@@ -177,6 +202,12 @@ class DIV(Mnemonico):
             }
         ]
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["variavel_destino", "variavel_origem"]
+        self.escritas = ["variavel_destino"]
+        self.efeitos = []
+        self.custo = 3
+
     def executar(self, interpretador_assembly, params:list):
         """
         Adiciona um número ao registrador
@@ -204,44 +235,43 @@ class DIV(Mnemonico):
 
 class JUMP(Mnemonico):
     """
-    Classe do mnemonico MULT
+    Desvia a execução para a linha da label
     """
 
     def __init__(self):
         super().__init__()
 
+        self.desvio = "incondicional"
+
         # parâmetros do mnemônico
         self.parametros = [
             {
-                "nome": "variavel_destino",
-                "tipos_permitidos": ["registrador", "label"]
+                "nome": "nome_label",
+                "tipos_permitidos": ["label"]
             },
-            {
-                "nome": "variavel_origem",
-                "tipos_permitidos": ["registrador", "label", "literal"]
-            }
         ]
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = []
+        self.escritas = []
+        self.efeitos = []
+        self.custo = 1
+
     def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
         """
-        Adiciona um número ao registrador
-        A soma será destino + origem
-
         Parâmetros
         ---
-        ``variavel_destino`` (registrador ou label):
-            O local onde o resultado da adição é salvo
-
-        ``variavel_origem`` (registrador, label, literal):
-            Um dos valores a ser somado
+        ``nome_label`` (label):
+            Já vem resolvida pelo ``carregar_codigo()``, \
+                como índice da instrução de destino
         """
 
         # Ler parâmetros
-        nome_label = params[0]
+        indice_destino = params[0]
 
         # jump na linha da label
-        interpretador_assembly.linha_codigo = \
-            interpretador_assembly.labels[nome_label] - 1
+        interpretador_assembly.linha_codigo = indice_destino - 1
+        return True
 
 
 class JTRUE(Mnemonico):
@@ -252,6 +282,8 @@ class JTRUE(Mnemonico):
     def __init__(self):
         super().__init__()
 
+        self.desvio = "condicional"
+
         # parâmetros desse mnemônico
         self.parametros = [
             {
@@ -260,47 +292,58 @@ class JTRUE(Mnemonico):
             },
         ]
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["CP"]
+        self.escritas = []
+        self.efeitos = []
+        self.custo = 1
+
     def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
         # Ler parâmetros
-        nome_label = params
+        indice_destino = params[0]
 
         # Executar
         cmp_deu_true = interpretador_assembly.registers['CP'] == 1
 
         if cmp_deu_true:
-            interpretador_assembly.executar_mnemonico("JUMP", nome_label)
+            interpretador_assembly.linha_codigo = indice_destino - 1
+        return cmp_deu_true
 
 
 class JFALSE(Mnemonico):
     """
-    Classe do mnemonico MULT
+    Jump to label or line number if CMP is false
     """
 
     def __init__(self):
         super().__init__()
 
+        self.desvio = "condicional"
+
         # parâmetros do mnemônico
         self.parametros = [
             {
-                "nome": "variavel_destino",
-                "tipos_permitidos": ["registrador", "label"]
+                "nome": "nome_label",
+                "tipos_permitidos": ["label"]
             },
-            {
-                "nome": "variavel_origem",
-                "tipos_permitidos": ["registrador", "label", "literal"]
-            }
         ]
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["CP"]
+        self.escritas = []
+        self.efeitos = []
+        self.custo = 1
+
     def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
         # Ler parâmetros
-        nome_label = params
-
-        # valor_<alguma coisa> singifica o seguinte:
-        # se for registrador, label, etc ele obtém o valor
+        indice_destino = params[0]
 
         # Calcular
-        if interpretador_assembly.registers['CP'] == 0:
-            interpretador_assembly.executar_mnemonico("JUMP", nome_label)
+        cmp_deu_false = interpretador_assembly.registers['CP'] == 0
+
+        if cmp_deu_false:
+            interpretador_assembly.linha_codigo = indice_destino - 1
+        return cmp_deu_false
 
 
 class CMP(Mnemonico):
@@ -329,6 +372,12 @@ class CMP(Mnemonico):
             }
         ]
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["valor_1", "valor_2"]
+        self.escritas = ["CP"]
+        self.efeitos = []
+        self.custo = 1
+
     def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
         # Ler parâmetros
         valor_1, valor_2 = params
@@ -370,6 +419,12 @@ class CMAIOR(Mnemonico):
             }
         ]
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["valor_1", "valor_2"]
+        self.escritas = ["CP"]
+        self.efeitos = []
+        self.custo = 1
+
     def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
         # Ler parâmetros
         valor_1, valor_2 = params
@@ -411,6 +466,12 @@ class CMENOR(Mnemonico):
             }
         ]
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["valor_1", "valor_2"]
+        self.escritas = ["CP"]
+        self.efeitos = []
+        self.custo = 1
+
     def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
         # Ler parâmetros
         valor_1, valor_2 = params
@@ -446,12 +507,18 @@ class VAR(Mnemonico):
             }
         ]
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = []
+        self.escritas = []
+        self.efeitos = ["vincula_variavel"]
+        self.custo = 1
+
     def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
         # Ler parâmetros
         label, endereco = params
 
         # Executar
-        interpretador_assembly.labels[label] = int(endereco)
+        interpretador_assembly.vincular_variavel(label, int(endereco))
 
 class INT(Mnemonico):
     """
@@ -475,6 +542,21 @@ class INT(Mnemonico):
             }
         ]
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        # INT 1 com variável escreve no endereço guardado nela
+        self.leituras = ["comando", "endereco"]
+        self.escritas = []
+        self.efeitos = ["entrada", "saida", "memoria_indireta"]
+        self.custo = 5
+
+    def efeitos_instrucao(self, params:list):
+        # INT 1 só lê, INT 2 só escreve
+        if params and params[0] == "1":
+            return ["entrada", "memoria_indireta"]
+        if params and params[0] == "2":
+            return ["saida"]
+        return self.efeitos
+
     def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
         # Ler parâmetros
         comando, endereco = params
@@ -486,13 +568,14 @@ class INT(Mnemonico):
 
         # Lê caractede ASCII da entrada de texto e salva no endereço de memória
         if comando == "1":
-            interpretador_assembly.memory[valor_endereco] = ord(input()[0])
+            interpretador_assembly.set_memory(
+                valor_endereco, ord(interpretador_assembly.entrada()[0]))
 
         # Imprime caractere ASCII do endereço de memória
         if comando == "2":
             if interpretador_assembly.token_e_endereco(endereco):
                 valor_endereco = int(interpretador_assembly.get_memory(int(endereco)))
-            print(chr(valor_endereco))
+            interpretador_assembly.saida(chr(valor_endereco))
 
 
 class HALT(Mnemonico):
@@ -506,5 +589,272 @@ class HALT(Mnemonico):
         # parâmetros do mnemônico
         self.parametros = []  # nenhum
 
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = []
+        self.escritas = []
+        self.efeitos = ["parada"]
+        self.custo = 1
+
     def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
         pass
+
+
+class CAS(Mnemonico):
+    """
+    Compare-and-swap atômico, para programas com vários núcleos.
+
+    Se a memória em ``endereco`` for igual a ``esperado``, troca por ``novo``.
+
+    Retorna
+    ---
+    - Se trocou: CP = 1
+    - Se não trocou: CP = 0
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        # parâmetros do mnemônico
+        self.parametros = [
+            {
+                "nome": "endereco",
+                "tipos_permitidos": ["label", "endereco"]
+            },
+            {
+                "nome": "esperado",
+                "tipos_permitidos": ["registrador", "label", "literal"]
+            },
+            {
+                "nome": "novo",
+                "tipos_permitidos": ["registrador", "label", "literal"]
+            }
+        ]
+
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["endereco", "esperado", "novo"]
+        self.escritas = ["endereco", "CP"]
+        self.efeitos = ["sincronizacao"]
+        self.custo = 3
+
+    def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
+        # Ler parâmetros
+        endereco, esperado, novo = params
+
+        valor_esperado = interpretador_assembly.get_operator(esperado)
+        valor_novo = interpretador_assembly.get_operator(novo)
+        endereco = interpretador_assembly.get_endereco(endereco)
+
+        # Executar: ler, comparar e escrever sem outro núcleo no meio
+        with interpretador_assembly.trava_memoria or nullcontext():
+            trocou = interpretador_assembly.get_memory(endereco) == valor_esperado
+            if trocou:
+                interpretador_assembly.set_memory(endereco, valor_novo)
+
+        interpretador_assembly.registers['CP'] = int(trocou)
+
+
+class FADD(Mnemonico):
+    """
+    Fetch-and-add atômico, para programas com vários núcleos.
+
+    Soma ``incremento`` na memória em ``endereco`` e guarda \
+        o valor antigo em ``destino``.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        # parâmetros do mnemônico
+        self.parametros = [
+            {
+                "nome": "destino",
+                "tipos_permitidos": ["registrador", "label"]
+            },
+            {
+                "nome": "endereco",
+                "tipos_permitidos": ["label", "endereco"]
+            },
+            {
+                "nome": "incremento",
+                "tipos_permitidos": ["registrador", "label", "literal"]
+            }
+        ]
+
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["endereco", "incremento"]
+        self.escritas = ["destino", "endereco"]
+        self.efeitos = ["sincronizacao"]
+        self.custo = 3
+
+    def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
+        # Ler parâmetros
+        destino, endereco, incremento = params
+
+        valor_incremento = interpretador_assembly.get_operator(incremento)
+        endereco = interpretador_assembly.get_endereco(endereco)
+
+        # Executar: ler e somar sem outro núcleo no meio
+        with interpretador_assembly.trava_memoria or nullcontext():
+            valor_antigo = interpretador_assembly.get_memory(endereco)
+            interpretador_assembly.set_memory(endereco, valor_antigo + valor_incremento)
+
+        interpretador_assembly.set_operator(valor_antigo, destino)
+
+
+class BARREIRA(Mnemonico):
+    """
+    Espera todos os núcleos chegarem na barreira.
+
+    Sem vários núcleos, não faz nada.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        # parâmetros do mnemônico
+        self.parametros = []  # nenhum
+
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = []
+        self.escritas = []
+        self.efeitos = ["sincronizacao"]
+        self.custo = 10
+
+    def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
+        if interpretador_assembly.barreira is not None:
+            interpretador_assembly.barreira.wait()
+
+
+class MOVEBLOCO(Mnemonico):
+    """
+    Copia ``quantidade`` células da memória, de ``origem`` para ``destino``.
+
+    A cópia é feita de uma vez (atribuição de fatia), então funciona \
+        mesmo com os blocos sobrepostos.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        # parâmetros do mnemônico
+        self.parametros = [
+            {
+                "nome": "destino",
+                "tipos_permitidos": ["label", "endereco"]
+            },
+            {
+                "nome": "origem",
+                "tipos_permitidos": ["label", "endereco"]
+            },
+            {
+                "nome": "quantidade",
+                "tipos_permitidos": ["registrador", "label", "literal"]
+            }
+        ]
+
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["origem", "quantidade"]
+        self.escritas = ["destino"]
+        self.efeitos = ["memoria_bloco"]
+        self.custo = 4
+
+    def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
+        # Ler parâmetros
+        destino, origem, quantidade = params
+
+        endereco_destino = interpretador_assembly.get_endereco(destino)
+        endereco_origem = interpretador_assembly.get_endereco(origem)
+        quantidade = int(interpretador_assembly.get_operator(quantidade))
+
+        # Executar
+        valores = interpretador_assembly.get_memory_bloco(endereco_origem, quantidade)
+        interpretador_assembly.set_memory_bloco(endereco_destino, valores)
+
+
+class PREENCHER(Mnemonico):
+    """
+    Preenche ``quantidade`` células da memória, a partir de ``destino``, \
+        com ``valor``.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        # parâmetros do mnemônico
+        self.parametros = [
+            {
+                "nome": "destino",
+                "tipos_permitidos": ["label", "endereco"]
+            },
+            {
+                "nome": "valor",
+                "tipos_permitidos": ["registrador", "label", "literal"]
+            },
+            {
+                "nome": "quantidade",
+                "tipos_permitidos": ["registrador", "label", "literal"]
+            }
+        ]
+
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["valor", "quantidade"]
+        self.escritas = ["destino"]
+        self.efeitos = ["memoria_bloco"]
+        self.custo = 3
+
+    def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
+        # Ler parâmetros
+        destino, valor, quantidade = params
+
+        endereco_destino = interpretador_assembly.get_endereco(destino)
+        valor = interpretador_assembly.get_operator(valor)
+        quantidade = int(interpretador_assembly.get_operator(quantidade))
+
+        # Executar
+        interpretador_assembly.set_memory_bloco(endereco_destino, [valor] * quantidade)
+
+
+class CARREGARTEXTO(Mnemonico):
+    """
+    Escreve um literal de texto na memória, a partir de ``destino``: \
+        o código ASCII de cada caractere (como o ``INT 1``), e um 0 no fim.
+
+    Exemplo
+    ---
+    ```
+        CARREGARTEXTO   10, "Ola mundo"     -- memória 10..18 = 79, 108, ..., 111
+                                            -- memória 19 = 0
+    ```
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        # parâmetros do mnemônico
+        self.parametros = [
+            {
+                "nome": "destino",
+                "tipos_permitidos": ["label", "endereco"]
+            },
+            {
+                "nome": "texto",
+                "tipos_permitidos": ["texto"]
+            }
+        ]
+
+        # o que o mnemônico lê, escreve e faz além disso (ver Mnemonico)
+        self.leituras = ["texto"]
+        self.escritas = ["destino"]
+        self.efeitos = ["memoria_bloco"]
+        self.custo = 3
+
+    def executar(self, interpretador_assembly:InterpretadorAssembly, params:list):
+        # Ler parâmetros
+        # o tipo "texto" garante as aspas já na validação
+        destino, texto = params
+
+        endereco_destino = interpretador_assembly.get_endereco(destino)
+
+        # Executar
+        valores = [ord(caractere) for caractere in texto[1:-1]] + [0]
+        interpretador_assembly.set_memory_bloco(endereco_destino, valores)
@@ -23,6 +23,22 @@ a=1
 
 from abc import ABC, abstractmethod
 
+# "texto": só literal de texto entre aspas ("Ola mundo")
+TIPOS_PARAMETRO = {"registrador", "label", "literal", "endereco", "variavel", "nome_variavel",
+                   "texto"}
+DESVIOS = {None, "incondicional", "condicional"}
+
+# Efeitos que um mnemônico pode declarar em ``efeitos``
+EFEITOS = {
+    "entrada",              # lê da entrada (interpretador.entrada)
+    "saida",                # escreve na saída (interpretador.saida)
+    "memoria_indireta",     # acessa a memória num endereço calculado na execução
+    "memoria_bloco",        # acessa vários endereços a partir do endereço do parâmetro
+    "vincula_variavel",     # muda labels e variáveis (VAR)
+    "sincronizacao",        # espera ou trava outros núcleos
+    "parada",               # para a execução (HALT)
+}
+
 class Mnemonico(ABC):
     "Classe abstrata de mnemônico."
 
@@ -47,13 +63,72 @@ class Mnemonico(ABC):
                     },
                 ]
             ```
-            - Tipos permitidos: registrador, label, literal
+            - Tipos permitidos: ver ``TIPOS_PARAMETRO``
+
+        desvio (str ou None):
+            Se o mnemônico desvia a execução para uma label.
+            - ``None``: não desvia
+            - ``"incondicional"``: sempre desvia (ex: JUMP)
+            - ``"condicional"``: desvia dependendo do CP (ex: JTRUE)
+
+            O primeiro parâmetro de um mnemônico de desvio é a label de destino.
+            Ela é resolvida uma vez ao carregar o código, então ``executar()`` \
+                recebe o índice da instrução de destino em vez do nome da label.
+
+        leituras, escritas (list ou None):
+            O que o mnemônico lê e escreve: nomes de ``parametros`` \
+                e registradores usados sem estar nos parâmetros (ex: ``"CP"``).
+            ``None``: não informado, as ferramentas consideram que lê \
+                e escreve qualquer coisa.
+
+            Exemplo (CMP):
+            ```
+                >>> leituras = ["valor_1", "valor_2"]
+                >>> escritas = ["CP"]
+            ```
+
+        efeitos (list ou None):
+            Efeitos além dos parâmetros e registradores (ver ``EFEITOS``).
+            ``[]``: nenhum. ``None``: não informado.
+
+        custo (int):
+            Custo relativo de executar, em relação ao MOVE (1).
+
+        O interpretador confere esses atributos ao carregar os mnemônicos \
+            (ver ``validar_mnemonico()``).
         """
 
         self.parametros = dict()
+        self.desvio = None
+        self.leituras = None
+        self.escritas = None
+        self.efeitos = None
+        self.custo = 1
+
+    @property
+    def puro(self):
+        """
+        Se o resultado depende só do que o mnemônico lê, \
+            sem desvio nem efeitos (ex: ADD, CMP).
+        """
+        return self.efeitos == [] and not self.desvio and \
+            self.leituras is not None and self.escritas is not None
+
+    def efeitos_instrucao(self, params:list):
+        """
+        Efeitos de uma instrução com estes parâmetros.
+
+        Por padrão, ``efeitos``. Mnemônicos com efeitos que dependem dos \
+            parâmetros (ex: INT 1 lê, INT 2 escreve) sobrescrevem este método.
+        """
+        return self.efeitos
 
     @abstractmethod
     def executar(self, interpretador_assembly, params:list):
         """
         Método principal para executar o mnemônico
+
+        Mnemônicos com ``desvio`` retornam se o desvio foi tomado \
+            (mesmo quando o destino é a próxima instrução), para as \
+            estatísticas. Os outros não retornam nada.
         """
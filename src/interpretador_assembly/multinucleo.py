@@ -0,0 +1,241 @@
+"""
+Emulação de vários núcleos, cada um num processo do sistema operacional.
+
+Cada núcleo é um ``InterpretadorAssembly`` com seus próprios registradores \
+    e linha de código, mas todos usam a mesma memória, criada com \
+    ``multiprocessing.shared_memory``. Assim os programas paralelos usam \
+    vários núcleos da CPU de verdade.
+
+Sincronização
+---
+- ``CAS`` e ``FADD``: operações atômicas na memória, protegidas por uma trava
+- ``BARREIRA``: espera todos os núcleos chegarem nela
+
+O registrador ``NUCLEO`` de cada núcleo começa com o índice do núcleo \
+    (0, 1, ...), para o programa dividir o trabalho.
+
+Exemplo
+---
+```python
+resultado = executar_multinucleo('''
+    VAR contador, 10
+    FADD A, contador, 1
+    BARREIRA
+''', quantidade_nucleos=4)
+resultado["memoria"][10]  # 4
+```
+"""
+
+import multiprocessing
+import queue
+from array import array
+from multiprocessing import shared_memory
+from interpretador_assembly.erros.nucleo_interrompido_error import NucleoInterrompidoError
+from interpretador_assembly.interpretador_assembly import InterpretadorAssembly
+
+TAMANHO_CELULA = 8  # cada célula é um double
+
+# segundos de espera na fila de resultados entre as verificações dos processos
+INTERVALO_VERIFICACAO = 0.1
+
+
+class MemoriaCompartilhada:
+    """
+    Memória do interpretador em ``shared_memory``, usada no lugar da lista \
+        ``interpretador.memory``.
+
+    Cada célula guarda um double. Valores inteiros são devolvidos como \
+        ``int``, para o resultado ser igual ao da memória em lista.
+    """
+
+    def __init__(self, memoria_compartilhada:shared_memory.SharedMemory, tamanho:int):
+        self.memoria_compartilhada = memoria_compartilhada
+        self.tamanho = tamanho
+        self.celulas = memoria_compartilhada.buf[:tamanho * TAMANHO_CELULA].cast('d')
+
+    @classmethod
+    def criar(cls, valores_iniciais:list):
+        "Cria a memória compartilhada com os valores iniciais"
+        tamanho = len(valores_iniciais)
+        memoria = cls(shared_memory.SharedMemory(
+            create=True, size=max(tamanho * TAMANHO_CELULA, 1)), tamanho)
+        memoria[:] = valores_iniciais
+        return memoria
+
+    @classmethod
+    def anexar(cls, nome:str, tamanho:int):
+        "Abre uma memória compartilhada já criada, pelo nome"
+        return cls(shared_memory.SharedMemory(name=nome), tamanho)
+
+    @property
+    def nome(self):
+        "Nome da memória compartilhada, para os outros processos anexarem"
+        return self.memoria_compartilhada.name
+
+    @staticmethod
+    def converter(valor:float):
+        "Double para int, se o valor for inteiro"
+        return int(valor) if valor.is_integer() else valor
+
+    def __len__(self):
+        return self.tamanho
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self.converter(valor) for valor in self.celulas[indice].tolist()]
+        return self.converter(self.celulas[indice])
+
+    def __setitem__(self, indice, valor):
+        if isinstance(indice, slice):
+            self.celulas[indice] = array('d', (float(v) for v in valor))
+        else:
+            self.celulas[indice] = float(valor)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __repr__(self) -> str:
+        return repr(self[:])
+
+    def fechar(self):
+        "Fecha a memória neste processo"
+        self.celulas.release()
+        self.memoria_compartilhada.close()
+
+    def destruir(self):
+        "Fecha e apaga a memória compartilhada (só no processo que criou)"
+        self.fechar()
+        self.memoria_compartilhada.unlink()
+
+
+def executar_nucleo(indice, codigo, nome_memoria, tamanho_memoria, trava, barreira,
+                    resultados, limite_instrucoes):
+    """
+    Executa um núcleo. Roda no processo filho.
+
+    O resultado vai para a fila ``resultados``.
+    """
+    interpretador = InterpretadorAssembly()
+    memoria = MemoriaCompartilhada.anexar(nome_memoria, tamanho_memoria)
+    saida = []
+    erro = None
+    try:
+        interpretador.executar_validacao(codigo)
+        interpretador.carregar_codigo(codigo)
+
+        interpretador.memory = memoria
+        interpretador.trava_memoria = trava
+        interpretador.barreira = barreira
+        interpretador.registers["NUCLEO"] = indice
+        interpretador.saida = saida.append
+
+        interpretador.executar_codigo(limite_instrucoes)
+    except Exception as erro_nucleo:  # pylint: disable=broad-except
+        erro = {"tipo": type(erro_nucleo).__name__, "mensagem": str(erro_nucleo)}
+        # libera os outros núcleos que estão esperando na barreira
+        barreira.abort()
+    finally:
+        interpretador.memory = []
+        memoria.fechar()
+
+    resultados.put({
+        "nucleo": indice,
+        "registradores": interpretador.registers,
+        "linha_codigo": interpretador.linha_codigo,
+        "saida": saida,
+        "erro": erro,
+    })
+
+
+def coletar_resultados(processos:list, resultados, barreira):
+    """
+    Lê da fila o resultado de cada núcleo, em ordem de núcleo.
+
+    Erros
+    ---
+    ``NucleoInterrompidoError``: se o processo de um núcleo terminar sem \
+        mandar o resultado (ex: morto pelo sistema). Os outros núcleos \
+        são parados.
+    """
+    nucleos = {}
+    while len(nucleos) < len(processos):
+        try:
+            resultado = resultados.get(timeout=INTERVALO_VERIFICACAO)
+        except queue.Empty:
+            interrompidos = [indice for indice, processo in enumerate(processos)
+                             if indice not in nucleos and processo.exitcode is not None]
+            if not interrompidos:
+                continue
+            try:
+                # o resultado pode ter chegado na fila junto com o fim do processo
+                resultado = resultados.get(timeout=INTERVALO_VERIFICACAO)
+            except queue.Empty:
+                barreira.abort()
+                for processo in processos:
+                    processo.terminate()
+                    processo.join()
+                indice = interrompidos[0]
+                raise NucleoInterrompidoError(
+                    f"core {indice} exited with code {processos[indice].exitcode} "
+                    "without a result") from None
+        nucleos[resultado["nucleo"]] = resultado
+    return [nucleos[indice] for indice in range(len(processos))]
+
+
+def executar_multinucleo(codigo, quantidade_nucleos:int, memoria_inicial=None,
+                         limite_instrucoes=None, tempo_limite_barreira=None):
+    """
+    Executa o programa em ``quantidade_nucleos`` processos com memória compartilhada.
+
+    Parâmetros
+    ---
+    ``codigo``: código assembly, o mesmo para todos os núcleos, \
+        ou uma lista com um código por núcleo
+
+    ``memoria_inicial``: lista com a memória inicial \
+        (padrão: a memória inicial do interpretador)
+
+    ``tempo_limite_barreira``: segundos de espera na BARREIRA até desistir
+
+    Retorna
+    ---
+    ``{"memoria": [...], "nucleos": [resultado de cada núcleo]}``
+
+    Erros
+    ---
+    ``NucleoInterrompidoError``: se o processo de um núcleo terminar sem \
+        mandar o resultado
+    """
+    codigos = codigo if isinstance(codigo, list) else [codigo] * quantidade_nucleos
+    if len(codigos) != quantidade_nucleos:
+        raise ValueError("one code per core is required")
+
+    if memoria_inicial is None:
+        memoria_inicial = InterpretadorAssembly().memory
+
+    memoria = MemoriaCompartilhada.criar(memoria_inicial)
+    try:
+        trava = multiprocessing.Lock()
+        barreira = multiprocessing.Barrier(quantidade_nucleos, timeout=tempo_limite_barreira)
+        resultados = multiprocessing.Queue()
+
+        processos = [
+            multiprocessing.Process(target=executar_nucleo, args=(
+                indice, codigos[indice], memoria.nome, len(memoria), trava, barreira,
+                resultados, limite_instrucoes))
+            for indice in range(quantidade_nucleos)
+        ]
+        for processo in processos:
+            processo.start()
+
+        # lê a fila antes do join, para os processos não travarem com a fila cheia
+        nucleos = coletar_resultados(processos, resultados, barreira)
+        for processo in processos:
+            processo.join()
+
+        return {
+            "memoria": memoria[:],
+            "nucleos": nucleos,
+        }
+    finally:
+        memoria.destruir()
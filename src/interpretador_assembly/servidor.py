@@ -0,0 +1,393 @@
+"""
+Modo servidor do interpretador.
+
+Em vez de abrir um processo ``python main.py arquivo.asm`` por execução, o \
+    servidor fica aberto e recebe requisições em JSON, uma por linha, pela \
+    entrada padrão ou por um socket Unix local.
+
+Os programas já validados e carregados ficam num cache LRU, indexado pelo \
+    hash do código-fonte, então um programa repetido não passa de novo pela \
+    análise léxica e sintática.
+
+Formato da requisição
+---
+```json
+{
+    "id": 1,
+    "codigo": "MOVE A, 1\\nHALT",
+    "caminho": "programa.asm",
+    "registradores": {"A": 10},
+    "memoria": {"0": 51},
+    "entrada": "3\\n",
+    "limites": {"instrucoes": 100000},
+    "estatisticas": true,
+    "despejo": {"inicio": 0, "fim": 64, "nao_zero": true}
+}
+```
+- ``codigo`` ou ``caminho`` é obrigatório, o resto é opcional
+- ``memoria`` pode ser uma lista (a partir do endereço 0) ou um dicionário \
+    ``{endereco: valor}``, dentro do tamanho da memória
+- ``entrada`` é o texto lido pelo ``INT 1``, uma linha por leitura
+- ``limites.instrucoes``: sem ele, vale o ``limite_instrucoes`` do servidor, \
+    para um laço infinito não prender o servidor
+- ``estatisticas``: se verdadeiro, a resposta inclui as estatísticas da execução; \
+    com o programa no cache, os tempos não têm as fases de validação e carregamento
+- ``despejo``: filtros da memória da resposta (ver ``despejo_estado.celulas``); \
+    com ele, ``memoria`` na resposta é um dicionário ``{endereco: valor}`` \
+    só com as células pedidas, em vez da memória inteira
+
+Formato da resposta
+---
+```json
+{"id": 1, "ok": true, "cache": "acerto", "registradores": {...}, \
+"memoria": [...], "linha_codigo": 2, "saida": ["A"]}
+```
+Em caso de erro, ``ok`` é ``false`` e ``erro`` tem o tipo e a mensagem.
+
+A requisição ``{"comando": "estatisticas"}`` retorna os contadores do cache.
+
+Conexões
+---
+No socket, cada conexão é atendida numa thread, com um \
+    ``InterpretadorAssembly`` próprio, então uma conexão aberta não \
+    bloqueia as outras. Os caches de programas e resultados são \
+    compartilhados, protegidos por uma trava.
+
+Memoização
+---
+Com ``resultados`` (ver ``memoizacao.CacheResultados``), programas \
+    determinísticos (sem ``INT 1``) com o mesmo estado inicial retornam o \
+    resultado guardado, sem executar, e a resposta tem ``"memoizado": true``. \
+    Requisições com ``estatisticas`` sempre executam.
+"""
+
+import hashlib
+import json
+import os
+import socketserver
+import threading
+from collections import OrderedDict
+from interpretador_assembly.despejo_estado import celulas
+from interpretador_assembly.erros.requisicao_invalida_error import RequisicaoInvalidaError
+from interpretador_assembly.interpretador_assembly import InterpretadorAssembly
+from interpretador_assembly.memoizacao import assinatura_mnemonicos, programa_deterministico
+
+
+def despejar_memoria(memoria:list, filtros:dict):
+    "Células da memória que passam nos filtros do ``despejo`` da requisição"
+    return {str(endereco): valor for endereco, valor in celulas(
+        memoria, filtros.get("inicio", 0), filtros.get("fim"), filtros.get("nao_zero", False))}
+
+
+def carregar_memoria(memoria_interpretador:list, memoria):
+    """
+    Copia a ``memoria`` da requisição para a memória do interpretador.
+
+    Erros
+    ---
+    ``RequisicaoInvalidaError``: se a lista for maior que a memória, \
+        ou um endereço do dicionário não for um endereço da memória
+    """
+    tamanho = len(memoria_interpretador)
+    if isinstance(memoria, list):
+        # a atribuição da fatia aumentaria a memória
+        if len(memoria) > tamanho:
+            raise RequisicaoInvalidaError(
+                f"memory list has {len(memoria)} cells, memory size is {tamanho}")
+        memoria_interpretador[:len(memoria)] = memoria
+        return
+
+    if not isinstance(memoria, dict):
+        raise RequisicaoInvalidaError("memory must be a list or an object")
+    for endereco, valor in memoria.items():
+        try:
+            indice = int(endereco)
+        except ValueError as erro:
+            raise RequisicaoInvalidaError(f"invalid memory address '{endereco}'") from erro
+        # endereço negativo escreveria a partir do fim da memória
+        if not 0 <= indice < tamanho:
+            raise RequisicaoInvalidaError(
+                f"memory address {indice} out of range, memory size is {tamanho}")
+        memoria_interpretador[indice] = valor
+
+
+class CacheProgramas:
+    """
+    Cache LRU de programas validados e carregados.
+
+    Limites
+    ---
+    ``max_programas``: quantidade máxima de programas no cache
+
+    ``max_bytes``: soma máxima do tamanho dos programas, \
+        aproximado pelo tamanho do código-fonte em bytes
+    """
+
+    def __init__(self, max_programas=128, max_bytes=16 * 1024 * 1024):
+        self.max_programas = max_programas
+        self.max_bytes = max_bytes
+        self.programas = OrderedDict()
+        self.bytes_usados = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+
+    @staticmethod
+    def gerar_chave(codigo:str):
+        "Hash do código-fonte, usado como chave do cache"
+        return hashlib.sha256(codigo.encode("utf-8")).hexdigest()
+
+    def obter(self, chave:str):
+        "Retorna o programa do cache, ou None se não estiver no cache"
+        programa = self.programas.get(chave)
+        if programa is None:
+            self.falhas += 1
+            return None
+
+        # marca como usado recentemente
+        self.programas.move_to_end(chave)
+        self.acertos += 1
+        return programa
+
+    def adicionar(self, chave:str, programa:dict):
+        "Adiciona programa no cache, removendo os menos usados se passar do limite"
+        # programa maior que o cache inteiro não é guardado
+        if programa["bytes"] > self.max_bytes:
+            return
+
+        if chave in self.programas:
+            self.bytes_usados -= self.programas.pop(chave)["bytes"]
+
+        self.programas[chave] = programa
+        self.bytes_usados += programa["bytes"]
+
+        while len(self.programas) > self.max_programas or self.bytes_usados > self.max_bytes:
+            _, removido = self.programas.popitem(last=False)
+            self.bytes_usados -= removido["bytes"]
+            self.remocoes += 1
+
+    def estatisticas(self):
+        "Contadores do cache, para dimensionar os limites"
+        consultas = self.acertos + self.falhas
+        return {
+            "programas": len(self.programas),
+            "bytes": self.bytes_usados,
+            "max_programas": self.max_programas,
+            "max_bytes": self.max_bytes,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "remocoes": self.remocoes,
+            "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+        }
+
+
+class ServidorSocketUnix(socketserver.ThreadingUnixStreamServer):
+    "Servidor do socket Unix, com uma thread por conexão"
+
+    # com a fila padrão (5), vários clientes conectando juntos são recusados
+    request_queue_size = 128
+
+    # conexões abertas não impedem o processo de terminar
+    daemon_threads = True
+
+
+class ServidorInterpretador:
+    """
+    Recebe requisições JSON, executa os programas e retorna o resultado.
+
+    Cada fluxo de requisições (entrada padrão ou conexão do socket) usa \
+        um ``InterpretadorAssembly``, reiniciando o estado a cada \
+        requisição, então os mnemônicos são injetados uma vez por conexão.
+
+    ``limite_instrucoes``: limite das requisições sem ``limites.instrucoes``
+    """
+
+    def __init__(self, max_programas=128, max_bytes=16 * 1024 * 1024, resultados=None,
+                 limite_instrucoes=10_000_000):
+        self.interpretador = InterpretadorAssembly()
+        self.cache = CacheProgramas(max_programas, max_bytes)
+        self.limite_instrucoes = limite_instrucoes
+
+        # Opcional: memoizacao.CacheResultados
+        self.resultados = resultados
+
+        # os caches são compartilhados pelas threads do socket
+        self.trava = threading.Lock()
+
+    def carregar_programa(self, codigo:str, interpretador=None):
+        """
+        Retorna o programa validado e carregado, usando o cache.
+
+        Retorna
+        ---
+        ``(programa, acerto)``: o programa e se ele veio do cache
+        """
+        chave = self.cache.gerar_chave(codigo)
+        with self.trava:
+            programa = self.cache.obter(chave)
+        if programa is not None:
+            return programa, True
+
+        interpretador = interpretador or self.interpretador
+        interpretador.executar_validacao(codigo)
+        interpretador.carregar_codigo(codigo)
+
+        programa = {
+            "instrucoes": interpretador.instrucoes,
+            "instrucoes_decodificadas": interpretador.instrucoes_decodificadas,
+            "labels": dict(interpretador.labels),
+            "bytes": len(codigo.encode("utf-8")),
+            "chave": chave,
+            "deterministico": programa_deterministico(interpretador),
+            "assinatura": assinatura_mnemonicos(interpretador.mnemonicos),
+        }
+        with self.trava:
+            self.cache.adicionar(chave, programa)
+        return programa, False
+
+    def executar_requisicao(self, requisicao:dict, interpretador=None):
+        """
+        Executa uma requisição e retorna a resposta.
+
+        ``interpretador``: o da conexão (padrão: o do servidor)
+        """
+        if requisicao.get("comando") == "estatisticas":
+            with self.trava:
+                resposta = {"id": requisicao.get("id"), "ok": True,
+                            "cache": self.cache.estatisticas()}
+                if self.resultados is not None:
+                    resposta["resultados"] = self.resultados.estatisticas()
+            return resposta
+
+        codigo = requisicao.get("codigo")
+        if codigo is None:
+            with open(requisicao["caminho"], "r", encoding="utf-8") as arquivo:
+                codigo = arquivo.read()
+
+        interpretador = interpretador or self.interpretador
+        # só as fases desta requisição: num acerto do cache não há validação nem carregamento
+        interpretador.tempos_fases.clear()
+        programa, acerto = self.carregar_programa(codigo, interpretador)
+
+        interpretador.instrucoes = programa["instrucoes"]
+        interpretador.instrucoes_decodificadas = programa["instrucoes_decodificadas"]
+        interpretador.labels = dict(programa["labels"])
+        interpretador.reiniciar_estado()
+
+        # Estado inicial
+        interpretador.registers.update(requisicao.get("registradores", {}))
+        carregar_memoria(interpretador.memory, requisicao.get("memoria", {}))
+
+        limites = requisicao.get("limites", {})
+        limite_instrucoes = limites.get("instrucoes", self.limite_instrucoes)
+
+        chave_resultado = None
+        if self.resultados is not None and programa["deterministico"] \
+                and not requisicao.get("estatisticas"):
+            chave_resultado = self.resultados.gerar_chave(
+                programa["chave"], programa["assinatura"], interpretador.registers,
+                interpretador.memory, limite_instrucoes)
+            with self.trava:
+                resultado = self.resultados.obter(chave_resultado)
+            if resultado is not None:
+                if "despejo" in requisicao:
+                    resultado["memoria"] = despejar_memoria(resultado["memoria"],
+                                                            requisicao["despejo"])
+                return {"id": requisicao.get("id"), "ok": True,
+                        "cache": "acerto" if acerto else "falha", "memoizado": True, **resultado}
+
+        # INT 1 lê uma linha da entrada por vez, INT 2 escreve na saída
+        linhas_entrada = iter(requisicao.get("entrada", "").splitlines())
+        saida = []
+
+        def ler_entrada():
+            try:
+                return next(linhas_entrada)
+            except StopIteration as erro:
+                raise EOFError("no more input for INT 1") from erro
+
+        interpretador.entrada = ler_entrada
+        interpretador.saida = saida.append
+
+        interpretador.executar_codigo(limite_instrucoes)
+
+        resultado = {
+            "registradores": interpretador.registers,
+            "memoria": interpretador.memory,
+            "linha_codigo": interpretador.linha_codigo,
+            "saida": saida,
+        }
+        if chave_resultado is not None:
+            with self.trava:
+                self.resultados.adicionar(chave_resultado, resultado)
+        if "despejo" in requisicao:
+            resultado["memoria"] = despejar_memoria(resultado["memoria"], requisicao["despejo"])
+
+        resposta = {
+            "id": requisicao.get("id"),
+            "ok": True,
+            "cache": "acerto" if acerto else "falha",
+            **resultado,
+        }
+        if requisicao.get("estatisticas"):
+            resposta["estatisticas"] = interpretador.obter_estatisticas().para_dict()
+        return resposta
+
+    def processar_linha(self, linha:str, interpretador=None):
+        "Processa uma linha JSON e retorna a linha JSON de resposta"
+        requisicao = {}
+        try:
+            requisicao = json.loads(linha)
+            resposta = self.executar_requisicao(requisicao, interpretador)
+        except Exception as erro:  # pylint: disable=broad-except
+            # o servidor não pode parar por causa de um programa com erro
+            resposta = {
+                "id": requisicao.get("id") if isinstance(requisicao, dict) else None,
+                "ok": False,
+                "erro": {"tipo": type(erro).__name__, "mensagem": str(erro)},
+            }
+        return json.dumps(resposta, ensure_ascii=False)
+
+    def atender(self, entrada, saida):
+        """
+        Lê requisições de ``entrada`` e escreve as respostas em ``saida``, \
+            uma por linha, até a entrada acabar.
+        """
+        for linha in entrada:
+            if not linha.strip():
+                continue
+            saida.write(self.processar_linha(linha) + "\n")
+            saida.flush()
+
+    def criar_servidor_socket(self, caminho_socket:str):
+        """
+        Cria o servidor do socket Unix, com uma thread e um interpretador \
+            por conexão. ``serve_forever()`` começa a atender.
+        """
+        servidor = self
+
+        class TratadorRequisicao(socketserver.StreamRequestHandler):
+            "Cada conexão pode enviar várias requisições, uma por linha"
+
+            def handle(self):
+                interpretador = InterpretadorAssembly()
+                for linha in self.rfile:
+                    linha = linha.decode("utf-8")
+                    if not linha.strip():
+                        continue
+                    resposta = servidor.processar_linha(linha, interpretador) + "\n"
+                    self.wfile.write(resposta.encode("utf-8"))
+                    self.wfile.flush()
+
+        if os.path.exists(caminho_socket):
+            os.remove(caminho_socket)
+
+        return ServidorSocketUnix(caminho_socket, TratadorRequisicao)
+
+    def atender_socket(self, caminho_socket:str):
+        "Atende requisições num socket Unix local, até ser interrompido"
+        with self.criar_servidor_socket(caminho_socket) as servidor_socket:
+            try:
+                servidor_socket.serve_forever()
+            finally:
+                os.remove(caminho_socket)
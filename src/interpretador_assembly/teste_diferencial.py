@@ -0,0 +1,413 @@
+"""
+Teste diferencial entre os modos de execução.
+
+Todo caminho de execução (imagem binária, validação incremental, \
+    depurador, histórico, servidor com memoização, memória compartilhada, \
+    ...) precisa dar exatamente o mesmo resultado que a \
+    execução de referência (``carregar_codigo()`` + ``executar_codigo()``).
+
+O teste roda o mesmo programa, com o mesmo estado inicial e entrada, em \
+    todos os motores e compara registradores (inclusive o CP), memória, \
+    saída do INT e erro. Se algum motor divergir, encontra a primeira \
+    instrução em que o estado ficou diferente (busca binária no limite \
+    de instruções).
+
+Também tem um gerador de programas aleatórios válidos, feito a partir \
+    dos ``parametros`` de cada mnemônico.
+
+Exemplo
+---
+```python
+divergencias = testar_aleatorio(quantidade=200, semente=1)
+```
+"""
+
+import random
+from interpretador_assembly import formato_binario
+from interpretador_assembly.depuracao import Depurador
+from interpretador_assembly.erros.limite_execucao_error import LimiteExecucaoError
+from interpretador_assembly.execucao_reversa import HistoricoExecucao
+from interpretador_assembly.interpretador_assembly import InterpretadorAssembly
+from interpretador_assembly.mapa_memoria import MapaAcessosMemoria
+from interpretador_assembly.memoizacao import CacheResultados
+from interpretador_assembly.multinucleo import MemoriaCompartilhada
+from interpretador_assembly.servidor import ServidorInterpretador
+from interpretador_assembly.validacao_incremental import ValidadorIncremental
+
+REGISTRADORES = ["A", "B", "C", "D", "E", "F", "G", "H"]
+
+# mnemônicos com estes efeitos não entram no corpo dos programas gerados
+EFEITOS_EXCLUIDOS = {"parada", "vincula_variavel", "sincronizacao"}
+
+# nos programas gerados, o segundo operando destes é sempre literal, para \
+# os valores não crescerem exponencialmente dentro dos laços (MULT A, A)
+SEGUNDO_OPERANDO_LITERAL = {"MULT"}
+
+CARACTERES_TEXTO = "ab -:,!"
+
+# endereços observados pelo motor do depurador (as variáveis geradas ficam aqui)
+ENDERECOS_OBSERVADOS = range(16)
+
+
+def ler_linhas(linhas):
+    "Função de entrada do INT 1 que lê ``linhas``, como a entrada do servidor"
+    linhas = iter(linhas)
+
+    def ler_entrada():
+        try:
+            return next(linhas)
+        except StopIteration as erro:
+            raise EOFError("no more input for INT 1") from erro
+    return ler_entrada
+
+
+def motor_referencia(codigo:str):
+    "Execução de referência"
+    interpretador = InterpretadorAssembly()
+    interpretador.executar_validacao(codigo)
+    interpretador.carregar_codigo(codigo)
+    return interpretador
+
+
+def motor_imagem_binaria(codigo:str):
+    "Monta a imagem binária e executa a partir dela"
+    imagem = formato_binario.montar_codigo(InterpretadorAssembly(), codigo)
+    interpretador = InterpretadorAssembly()
+    formato_binario.decodificar_imagem(interpretador, imagem)
+    return interpretador
+
+
+def motor_validacao_incremental(codigo:str):
+    "Carrega pelo validador incremental (uma instrução por linha)"
+    interpretador = InterpretadorAssembly()
+    ValidadorIncremental(interpretador, codigo).preparar_execucao()
+    return interpretador
+
+
+def motor_instrumentado(codigo:str):
+    "Referência com o mapa de acessos à memória ligado, que não pode mudar o resultado"
+    interpretador = motor_referencia(codigo)
+    interpretador.mapa_memoria = MapaAcessosMemoria(len(interpretador.memory), 3)
+    return interpretador
+
+
+def motor_depurador(codigo:str):
+    """
+    Referência com o depurador: ponto de parada em todas as instruções, \
+        observação (com pausa) dos registradores e observação (com ação) \
+        de ``ENDERECOS_OBSERVADOS``. Executa com ``continuar()`` até terminar.
+    """
+    interpretador = motor_referencia(codigo)
+    depurador = Depurador(interpretador)
+    for indice, instrucao in enumerate(interpretador.instrucoes_decodificadas):
+        if instrucao is not None:
+            depurador.adicionar_ponto_parada(indice)
+    for registrador in REGISTRADORES:
+        depurador.observar(registrador)
+    for endereco in ENDERECOS_OBSERVADOS:
+        depurador.observar(endereco, acao=lambda evento: None)
+
+    def executar(limite_instrucoes, _entrada):
+        # o limite de continuar() conta a partir das instruções já executadas
+        while depurador.continuar(limite_instrucoes - interpretador.instrucoes_executadas):
+            pass
+    return interpretador, executar
+
+
+def motor_historico(codigo:str):
+    """
+    Referência com o histórico ligado: executa, desfaz tudo e executa de \
+        novo, com as mesmas entradas. A saída é só a da segunda execução.
+    """
+    interpretador = motor_referencia(codigo)
+
+    def executar(limite_instrucoes, _entrada):
+        historico = HistoricoExecucao(interpretador, limite_instrucoes + 1)
+        historico.ligar()
+        entrada, saida = interpretador.entrada, interpretador.saida
+        lidas = []
+
+        def ler_entrada():
+            lidas.append(entrada())
+            return lidas[-1]
+
+        interpretador.entrada = ler_entrada
+        interpretador.saida = lambda texto: None
+        try:
+            interpretador.executar_codigo(limite_instrucoes)
+        except Exception:  # pylint: disable=broad-except
+            # a segunda execução para no mesmo erro
+            pass
+
+        historico.voltar(len(historico))
+        interpretador.entrada = ler_linhas(lidas)
+        interpretador.saida = saida
+        interpretador.executar_codigo(limite_instrucoes)
+    return interpretador, executar
+
+
+def motor_servidor(codigo:str):
+    """
+    Executa a mesma requisição duas vezes num ``ServidorInterpretador`` com \
+        memoização. A segunda vem do cache de programas e, se o programa \
+        for determinístico, do cache de resultados.
+
+    A resposta de erro do servidor não tem a saída, então, quando a \
+        execução dá erro, a saída não é comparada.
+    """
+    servidor = ServidorInterpretador(resultados=CacheResultados())
+    interpretador = servidor.interpretador
+
+    def executar(limite_instrucoes, entrada):
+        saida = interpretador.saida
+        requisicao = {
+            "codigo": codigo,
+            "registradores": dict(interpretador.registers),
+            "memoria": list(interpretador.memory),
+            "entrada": entrada,
+            "limites": {"instrucoes": limite_instrucoes},
+        }
+        try:
+            servidor.executar_requisicao(requisicao)
+        except Exception:
+            interpretador.saida = None
+            raise
+
+        resposta = servidor.executar_requisicao(requisicao)
+        interpretador.registers = resposta["registradores"]
+        interpretador.memory = resposta["memoria"]
+        interpretador.linha_codigo = resposta["linha_codigo"]
+        for texto in resposta["saida"]:
+            saida(texto)
+    return interpretador, executar
+
+
+def motor_memoria_compartilhada(codigo:str):
+    """
+    Referência com a memória em ``shared_memory`` (um núcleo só).
+
+    A memória compartilhada só guarda números (double), então programas \
+        que guardam texto na memória ou inteiros acima de 2**53 divergem.
+    """
+    interpretador = motor_referencia(codigo)
+    interpretador.memoria_compartilhada = True
+    return interpretador
+
+
+# nome -> função que recebe o código e retorna o interpretador carregado, \
+#   ou ``(interpretador, executar)`` se não executar com ``executar_codigo()``, \
+#   com ``executar(limite_instrucoes, entrada)``
+MOTORES = {
+    "referencia": motor_referencia,
+    "imagem_binaria": motor_imagem_binaria,
+    "validacao_incremental": motor_validacao_incremental,
+    "instrumentado": motor_instrumentado,
+    "depurador": motor_depurador,
+    "historico": motor_historico,
+    "servidor": motor_servidor,
+}
+
+MOTORES_OPCIONAIS = {
+    "memoria_compartilhada": motor_memoria_compartilhada,
+}
+
+
+def executar_motor(motor, codigo:str, estado_inicial=None, entrada="", limite_instrucoes=10000):
+    """
+    Executa o código num motor e retorna o estado final.
+
+    Retorna
+    ---
+    ``{"registradores", "memoria", "saida", "erro", "limite", "instrucao"}``
+
+    - ``saida``: None se o motor não tem como saber a saída
+    - ``limite``: se parou pelo limite de instruções
+    - ``instrucao``: texto da instrução em que parou
+    """
+    estado_inicial = estado_inicial or {}
+    interpretador = motor(codigo)
+    if isinstance(interpretador, tuple):
+        interpretador, executar = interpretador
+    else:
+        def executar(limite, _entrada):
+            interpretador.executar_codigo(limite)
+    interpretador.registers.update(estado_inicial.get("registradores", {}))
+    for endereco, valor in estado_inicial.get("memoria", {}).items():
+        interpretador.memory[int(endereco)] = valor
+
+    memoria_compartilhada = None
+    if getattr(interpretador, "memoria_compartilhada", False):
+        memoria_compartilhada = MemoriaCompartilhada.criar(interpretador.memory)
+        interpretador.memory = memoria_compartilhada
+
+    saida = []
+    interpretador.entrada = ler_linhas(entrada.splitlines())
+    interpretador.saida = saida.append
+
+    erro = None
+    limite = False
+    try:
+        executar(limite_instrucoes, entrada)
+    except LimiteExecucaoError:
+        limite = True
+    except Exception as erro_execucao:  # pylint: disable=broad-except
+        # a mensagem tem o número da linha, que muda entre os motores
+        erro = type(erro_execucao).__name__
+
+    linha = interpretador.linha_codigo
+    instrucao = interpretador.instrucoes[linha].strip() \
+        if 0 <= linha < len(interpretador.instrucoes) else None
+
+    estado = {
+        "registradores": dict(interpretador.registers),
+        "memoria": list(interpretador.memory),
+        "saida": saida if interpretador.saida is not None else None,
+        "erro": erro,
+        "limite": limite,
+        "instrucao": instrucao,
+    }
+    if memoria_compartilhada is not None:
+        interpretador.memory = []
+        memoria_compartilhada.destruir()
+    return estado
+
+
+def estados_iguais(estado_a:dict, estado_b:dict):
+    """
+    Compara dois estados, sem o texto da instrução (muda de formatação \
+        entre motores) e sem a saída se algum motor não souber a saída.
+    """
+    chaves = ["registradores", "memoria", "erro", "limite"]
+    if estado_a["saida"] is not None and estado_b["saida"] is not None:
+        chaves.append("saida")
+    return all(estado_a[chave] == estado_b[chave] for chave in chaves)
+
+
+def comparar_motores(codigo:str, estado_inicial=None, entrada="", motores=None,
+                     limite_instrucoes=10000):
+    """
+    Executa o código em todos os motores e compara com o primeiro.
+
+    Retorna None se todos derem o mesmo resultado. Senão, retorna a \
+        primeira divergência:
+    ```
+    {"passo": 12, "motores": ["referencia", "imagem_binaria"],
+     "instrucao": {motor: instrução executada no passo}, "estados": {motor: estado}}
+    ```
+    """
+    motores = motores or MOTORES
+    nome_referencia = next(iter(motores))
+
+    def executar_todos(limite):
+        return {nome: executar_motor(motor, codigo, estado_inicial, entrada, limite)
+                for nome, motor in motores.items()}
+
+    def primeiro_diferente(estados):
+        referencia = estados[nome_referencia]
+        return next((nome for nome, estado in estados.items()
+                     if not estados_iguais(referencia, estado)), None)
+
+    estados = executar_todos(limite_instrucoes)
+    if primeiro_diferente(estados) is None:
+        return None
+
+    # busca binária pelo primeiro passo com estado diferente:
+    # iguais depois de ``inicio`` instruções, diferentes depois de ``fim``
+    inicio, fim = 0, limite_instrucoes
+    if primeiro_diferente(executar_todos(0)) is not None:
+        fim = 0
+    while fim - inicio > 1:
+        meio = (inicio + fim) // 2
+        if primeiro_diferente(executar_todos(meio)) is None:
+            inicio = meio
+        else:
+            fim = meio
+
+    # a instrução do passo ``fim`` é a que estava para executar depois de ``fim - 1``
+    antes = executar_todos(max(fim - 1, 0))
+    depois = executar_todos(fim)
+    divergente = primeiro_diferente(depois)
+    return {
+        "passo": fim,
+        "motores": [nome_referencia, divergente],
+        "instrucao": {nome: estado["instrucao"] for nome, estado in antes.items()},
+        "estados": depois,
+    }
+
+
+def gerar_programa(interpretador, gerador:random.Random, tamanho=20,
+                   quantidade_variaveis=4, quantidade_labels=4, mnemonicos=None):
+    """
+    Gera um programa aleatório válido, a partir dos ``parametros`` dos mnemônicos.
+
+    O programa começa declarando as variáveis (VAR) e iniciando todos os \
+        registradores e variáveis com literais, para não guardar texto na memória.
+
+    Mnemônicos sem ``efeitos`` declarados, ou com ``EFEITOS_EXCLUIDOS``, \
+        ficam de fora.
+    """
+    nomes_mnemonicos = mnemonicos or sorted(
+        nome for nome, mnemonico in interpretador.mnemonicos.items()
+        if mnemonico.efeitos is not None and not EFEITOS_EXCLUIDOS.intersection(mnemonico.efeitos))
+
+    variaveis = [f"v{i}" for i in range(quantidade_variaveis)]
+    labels = [f"L{i}" for i in range(quantidade_labels)]
+    enderecos = gerador.sample(range(16), quantidade_variaveis)
+
+    linhas = [f"VAR {variavel}, {endereco}" for variavel, endereco in zip(variaveis, enderecos)]
+    linhas += [f"MOVE {registrador}, {gerador.randint(0, 9)}" for registrador in REGISTRADORES]
+    linhas += [f"MOVE {variavel}, {gerador.randint(0, 9)}" for variavel in variaveis]
+
+    def gerar_token(tipos_permitidos, desvio):
+        tipo = gerador.choice(tipos_permitidos)
+        if tipo == "label":
+            return gerador.choice(labels) if desvio else gerador.choice(variaveis)
+        if tipo in ("variavel", "nome_variavel"):
+            return gerador.choice(variaveis)
+        if tipo == "registrador":
+            return gerador.choice(REGISTRADORES)
+        if tipo == "endereco":
+            return str(gerador.choice(enderecos))
+        if tipo == "literal":
+            return str(gerador.randint(1, 9))
+        if tipo == "texto":
+            # com pontuação, para exercitar '--', ':' e ',' dentro do literal
+            return '"' + "".join(gerador.choice(CARACTERES_TEXTO)
+                                 for _ in range(gerador.randint(0, 6))) + '"'
+        raise ValueError(f"unknown parameter type '{tipo}'")
+
+    corpo = []
+    for _ in range(tamanho):
+        nome_mnemonico = gerador.choice(nomes_mnemonicos)
+        mnemonico = interpretador.mnemonicos[nome_mnemonico]
+        parametros = [gerar_token(parametro["tipos_permitidos"], mnemonico.desvio and posicao == 0)
+                      for posicao, parametro in enumerate(mnemonico.parametros)]
+        if nome_mnemonico in SEGUNDO_OPERANDO_LITERAL:
+            parametros[1] = gerar_token(["literal"], None)
+        corpo.append(f"{nome_mnemonico} {', '.join(parametros)}".strip())
+
+    # cada label numa linha aleatória do corpo
+    for label, posicao in zip(labels, gerador.sample(range(len(corpo)), quantidade_labels)):
+        corpo[posicao] = f"{label}: {corpo[posicao]}"
+
+    return "\n".join(linhas + corpo + ["HALT"])
+
+
+def testar_aleatorio(quantidade=100, semente=None, motores=None, tamanho=20,
+                     limite_instrucoes=2000):
+    """
+    Gera ``quantidade`` programas aleatórios e compara todos os motores.
+
+    Retorna a lista de ``(codigo, divergencia)`` encontradas.
+    """
+    gerador = random.Random(semente)
+    interpretador = InterpretadorAssembly()
+    divergencias = []
+    for _ in range(quantidade):
+        codigo = gerar_programa(interpretador, gerador, tamanho)
+        entrada = "\n".join(gerador.choice("0123456789abc") for _ in range(8))
+        divergencia = comparar_motores(codigo, entrada=entrada, motores=motores,
+                                       limite_instrucoes=limite_instrucoes)
+        if divergencia is not None:
+            divergencias.append((codigo, divergencia))
+    return divergencias
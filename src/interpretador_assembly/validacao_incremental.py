@@ -0,0 +1,310 @@
+"""
+Validação incremental, para integração com editores.
+
+Em vez de rodar ``executar_validacao()`` + ``carregar_codigo()`` no código \
+    inteiro a cada tecla, o ``ValidadorIncremental`` recebe edições de \
+    linha (inserir, remover, substituir) e valida só as linhas afetadas:
+
+- a linha editada
+- as linhas com desvio para uma label que passou a existir ou deixou de existir
+
+Como funciona
+---
+Cada linha do código ocupa uma posição em ``instrucoes`` (linhas vazias ou \
+    só com comentário viram instrução vazia, que a execução pula). Assim o \
+    índice da instrução é o número da linha, sem reconstruir a lista.
+
+Cada linha tem um id fixo. O número atual de cada id fica em ``numeros``, \
+    renumerado só quando preciso: uma edição na linha ``k`` só marca os \
+    números a partir de ``k`` como desatualizados, e eles são refeitos de \
+    uma vez (``dict.update``) na próxima consulta a uma linha depois de ``k``.
+    As labels também guardam o id da linha que as define, então uma edição \
+    não percorre as labels; o número delas só é calculado em ``labels``.
+
+Cada linha é validada como no ``executar_validacao()`` de um interpretador \
+    novo: sem as labels e variáveis que a execução deixa no interpretador.
+
+Exemplo
+---
+```python
+validador = ValidadorIncremental(interpretador, codigo)
+validador.substituir_linha(3, "JTRUE fim")  # [(3, None)] se estiver certo
+validador.preparar_execucao()
+interpretador.executar_codigo()
+```
+"""
+
+from interpretador_assembly.erros.lexical_error import LexicalError
+from interpretador_assembly.erros.semantic_error import SemanticError
+from interpretador_assembly.interpretador_assembly import remover_comentario, separar_label
+
+ERROS_VALIDACAO = (LexicalError, SyntaxError, SemanticError)
+
+
+class ValidadorIncremental:
+    """
+    Mantém ``instrucoes`` do interpretador e o índice de labels atualizados \
+        a cada edição, com os erros de cada linha.
+
+    Atributos
+    ---
+    ``linhas``: texto de cada linha do código
+
+    ``definicoes``: ``{label: ids das linhas que definem}``. Fica separado \
+        de ``interpretador.labels`` porque o VAR adiciona labels durante a execução
+    """
+
+    def __init__(self, interpretador, codigo=""):
+        self.interpretador = interpretador
+        self.carregar(codigo)
+
+    def carregar(self, codigo:str):
+        """
+        Valida e carrega o código inteiro.
+
+        Retorna os erros encontrados, como em ``diagnosticos()``.
+        """
+        self.interpretador.instrucoes = []
+        self.linhas = []
+
+        # Cada linha tem um id que não muda quando outras linhas são
+        # inseridas ou removidas, para não precisar renumerar os índices abaixo
+        self.ids = []
+        self.numeros = {}               # id -> número da linha (ver numero_da_linha())
+        self.desatualizados_a_partir = None
+        self.proximo_id = 0
+        self.erros = {}                 # id -> erro da linha
+        self.label_da_linha = {}        # id -> label definida na linha
+        self.referencia_da_linha = {}   # id -> label usada no desvio da linha
+        self.definicoes = {}            # label -> ids das linhas que definem
+        self.referencias = {}           # label -> ids das linhas que usam no desvio
+
+        for numero, linha in enumerate(codigo.split('\n')):
+            id_linha = self.gerar_id()
+            self.ids.append(id_linha)
+            self.numeros[id_linha] = numero
+            self.linhas.append(linha)
+            self.interpretador.instrucoes.append("")
+            self.registrar_linha(id_linha, numero)
+
+        for numero, id_linha in enumerate(self.ids):
+            self.verificar_linha(id_linha, numero)
+
+        return self.diagnosticos()
+
+    def gerar_id(self):
+        "Retorna um novo id de linha"
+        self.proximo_id += 1
+        return self.proximo_id
+
+    def marcar_desatualizados(self, numero:int):
+        "Os números das linhas a partir de ``numero`` mudaram"
+        if self.desatualizados_a_partir is None or numero < self.desatualizados_a_partir:
+            self.desatualizados_a_partir = numero
+
+    def numero_da_linha(self, id_linha:int):
+        """
+        Número atual da linha com o id.
+
+        Números guardados antes da primeira linha editada continuam certos; \
+            os outros são refeitos de uma vez, só quando consultados.
+        """
+        numero = self.numeros[id_linha]
+        inicio = self.desatualizados_a_partir
+        if inicio is not None and numero >= inicio:
+            self.numeros.update(zip(self.ids[inicio:], range(inicio, len(self.ids))))
+            self.desatualizados_a_partir = None
+            numero = self.numeros[id_linha]
+        return numero
+
+    @property
+    def labels(self):
+        "``{label: numero_linha}``; label repetida: vale a última, como no carregar_codigo()"
+        return {label: max(map(self.numero_da_linha, ids))
+                for label, ids in self.definicoes.items()}
+
+    def inserir_linha(self, numero:int, texto:str):
+        "Insere uma linha antes da linha ``numero`` e retorna os erros afetados"
+        id_linha = self.gerar_id()
+        self.ids.insert(numero, id_linha)
+        self.numeros[id_linha] = numero
+        self.marcar_desatualizados(numero)
+        self.linhas.insert(numero, texto)
+        self.interpretador.instrucoes.insert(numero, "")
+
+        labels_alteradas = self.registrar_linha(id_linha, numero)
+        return self.verificar_afetadas({id_linha: numero}, labels_alteradas)
+
+    def remover_linha(self, numero:int):
+        "Remove a linha ``numero`` e retorna os erros afetados"
+        id_linha = self.ids[numero]
+        labels_alteradas = self.desregistrar_linha(id_linha)
+
+        del self.ids[numero]
+        del self.numeros[id_linha]
+        self.marcar_desatualizados(numero)
+        del self.linhas[numero]
+        del self.interpretador.instrucoes[numero]
+        self.erros.pop(id_linha, None)
+        return self.verificar_afetadas({}, labels_alteradas)
+
+    def substituir_linha(self, numero:int, texto:str):
+        "Troca o texto da linha ``numero`` e retorna os erros afetados"
+        id_linha = self.ids[numero]
+        labels_alteradas = self.desregistrar_linha(id_linha)
+
+        self.linhas[numero] = texto
+        labels_alteradas ^= self.registrar_linha(id_linha, numero)
+        return self.verificar_afetadas({id_linha: numero}, labels_alteradas)
+
+    def aplicar_edicoes(self, edicoes:list):
+        """
+        Aplica uma lista de edições, em ordem.
+
+        Cada edição é ``("inserir", numero, texto)``, ``("remover", numero)`` \
+            ou ``("substituir", numero, texto)``.
+
+        Retorna os erros afetados por todas as edições, como ``(numero_linha, erro)``.
+        """
+        operacoes = {
+            "inserir": self.inserir_linha,
+            "remover": self.remover_linha,
+            "substituir": self.substituir_linha,
+        }
+        afetadas = {}
+        for tipo, *argumentos in edicoes:
+            for numero, erro in operacoes[tipo](*argumentos):
+                afetadas[self.ids[numero]] = erro
+
+        # os números podem ter mudado com as edições seguintes,
+        # e linhas afetadas podem ter sido removidas depois
+        return sorted(((self.numero_da_linha(id_linha), erro)
+                       for id_linha, erro in afetadas.items() if id_linha in self.numeros),
+                      key=lambda item: item[0])
+
+    def diagnosticos(self):
+        "Retorna todos os erros atuais, como ``(numero_linha, erro)``"
+        return sorted(((self.numero_da_linha(id_linha), erro)
+                       for id_linha, erro in self.erros.items()), key=lambda item: item[0])
+
+    def preparar_execucao(self):
+        """
+        Deixa o interpretador pronto para ``executar_codigo()``.
+
+        Lança o primeiro erro do código, se tiver algum.
+        """
+        erros = self.diagnosticos()
+        if erros:
+            raise erros[0][1]
+
+        interpretador = self.interpretador
+        interpretador.labels = self.labels
+        interpretador.decodificar_programa()
+        interpretador.reiniciar_estado()
+
+    def separar_linha(self, texto:str):
+        """
+        Retorna ``(label, instrucao)`` da linha, como no ``carregar_codigo()``.
+
+        ``label`` é None se a linha não tiver label.
+        """
+        return separar_label(remover_comentario(texto).strip())
+
+    def registrar_linha(self, id_linha:int, numero:int):
+        """
+        Adiciona a instrução, a label e a referência de desvio da linha.
+
+        Retorna as labels que passaram a existir.
+        """
+        label, instrucao = self.separar_linha(self.linhas[numero])
+        self.interpretador.instrucoes[numero] = instrucao
+        labels_alteradas = set()
+
+        if label is not None:
+            self.label_da_linha[id_linha] = label
+            definicoes = self.definicoes.setdefault(label, set())
+            if not definicoes:
+                labels_alteradas.add(label)
+            definicoes.add(id_linha)
+
+        decodificada = self.interpretador.decodificar_instrucao(instrucao)
+        if decodificada is not None:
+            _, mnemonico, parametros = decodificada
+            if mnemonico is not None and mnemonico.desvio:
+                referencia = parametros[0] if parametros else ""
+                self.referencia_da_linha[id_linha] = referencia
+                self.referencias.setdefault(referencia, set()).add(id_linha)
+
+        return labels_alteradas
+
+    def desregistrar_linha(self, id_linha:int):
+        """
+        Remove a label e a referência de desvio da linha.
+
+        Retorna as labels que deixaram de existir.
+        """
+        labels_alteradas = set()
+
+        label = self.label_da_linha.pop(id_linha, None)
+        if label is not None:
+            definicoes = self.definicoes[label]
+            definicoes.discard(id_linha)
+            if not definicoes:
+                del self.definicoes[label]
+                labels_alteradas.add(label)
+
+        referencia = self.referencia_da_linha.pop(id_linha, None)
+        if referencia is not None:
+            referencias = self.referencias[referencia]
+            referencias.discard(id_linha)
+            if not referencias:
+                del self.referencias[referencia]
+
+        return labels_alteradas
+
+    def verificar_afetadas(self, linhas_editadas:dict, labels_alteradas:set):
+        """
+        Verifica as linhas editadas e as que usam as labels alteradas.
+
+        ``linhas_editadas``: ``{id: numero_linha}``
+        """
+        afetadas = dict(linhas_editadas)
+        for label in labels_alteradas:
+            for id_linha in self.referencias.get(label, ()):
+                if id_linha not in afetadas:
+                    afetadas[id_linha] = self.numero_da_linha(id_linha)
+
+        resultado = []
+        for id_linha, numero in afetadas.items():
+            resultado.append((numero, self.verificar_linha(id_linha, numero)))
+        return sorted(resultado, key=lambda item: item[0])
+
+    def verificar_linha(self, id_linha:int, numero:int):
+        "Valida uma linha, guarda e retorna o erro (ou None)"
+        interpretador = self.interpretador
+        linha = self.linhas[numero]
+        erro = None
+
+        # sem labels e variáveis de uma execução anterior, como no executar_validacao()
+        labels, variaveis = interpretador.labels, interpretador.variaveis
+        interpretador.labels, interpretador.variaveis = {}, {}
+        try:
+            if remover_comentario(linha).strip():
+                interpretador.analisar_erro_lexico(linha, numero)
+                interpretador.analisar_erro_sintatico(linha, numero)
+
+            if id_linha in self.referencia_da_linha:
+                referencia = self.referencia_da_linha[id_linha]
+                if referencia not in self.definicoes:
+                    raise SemanticError(interpretador.MENSAGENS_ERRO_SEMANTICO[
+                        "undefined_label"](linha, numero, referencia))
+        except ERROS_VALIDACAO as erro_linha:
+            erro = erro_linha
+        finally:
+            interpretador.labels, interpretador.variaveis = labels, variaveis
+
+        if erro is None:
+            self.erros.pop(id_linha, None)
+        else:
+            self.erros[id_linha] = erro
+        return erro
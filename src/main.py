@@ -1,29 +1,322 @@
+"""
+Uso
+---
+    python main.py [arquivo.asm] [--estatisticas json|prometheus]
+                   [--gravar ARQUIVO | --reproduzir ARQUIVO [--rapido]]
+                   [--mapa-memoria [TAXA]] [--observar LOCAL] [--ponto-parada LABEL]
+                   [--despejo json|hex|binario [--despejo-arquivo ARQUIVO]
+                    [--intervalo INICIO:FIM] [--nao-zero]]
+        Valida e executa o arquivo assembly. Sem arquivo, executa assembly-sample.asm
+        Com --estatisticas, imprime os contadores da execução no formato escolhido
+        Com --gravar, grava as entradas e saídas do INT no arquivo
+        Com --reproduzir, o INT 1 lê as entradas gravadas, sem terminal.
+            --rapido não executa o INT 2 e escreve as saídas gravadas de uma vez
+        Com --mapa-memoria, mostra o heatmap de acessos à memória, \
+            contando 1 de cada TAXA acessos (padrão: todos)
+        Com --observar, mostra cada mudança do endereço, variável ou registrador
+        Com --ponto-parada, mostra cada vez que a instrução (label ou índice) executa
+        (--observar e --ponto-parada podem ser repetidos)
+        Com --despejo, em vez do conteúdo inteiro do interpretador, escreve \
+            os registradores e a memória no formato escolhido, na saída padrão \
+            ou no arquivo (--intervalo limita os endereços, --nao-zero pula \
+            as células com 0)
+
+    python main.py montar arquivo.asm [-o imagem.iasm]
+        Valida o arquivo assembly e salva a imagem binária do programa
+
+    python main.py executar-binario imagem.iasm [opções de execução acima]
+        Executa uma imagem binária, sem análise léxica e sintática
+
+    python main.py analisar arquivo.asm
+        Mostra os blocos básicos, laços e caminhos quentes do programa, em JSON
+
+    python main.py servidor [--socket CAMINHO] [--max-programas N] [--max-bytes N]
+                            [--memoizar [--max-resultados N] [--max-bytes-resultados N]
+                             [--diretorio-resultados PASTA]] [--limite-instrucoes N]
+        Fica aberto recebendo requisições JSON, uma por linha, pela entrada \
+            padrão ou pelo socket Unix informado
+        Com --memoizar, guarda o resultado dos programas sem INT 1 e devolve \
+            sem executar quando o estado inicial se repete (em disco com \
+            --diretorio-resultados)
+        Requisições sem limites.instrucoes param depois de --limite-instrucoes \
+            instruções (padrão: 10000000). No socket, cada conexão tem uma thread
+
+    python main.py testar-diferencial [--programas N] [--semente S] [--memoria-compartilhada]
+        Gera N programas aleatórios e compara o resultado de todos os modos de execução
+"""
+
+import argparse
+import json
 import os
 import sys
+from interpretador_assembly import despejo_estado, formato_binario
+from interpretador_assembly.depuracao import Depurador
+from interpretador_assembly.fluxo_controle import obter_grafo
+from interpretador_assembly.gravacao_int import GravadorInt, ReprodutorInt
 from interpretador_assembly.interpretador_assembly import InterpretadorAssembly
+from interpretador_assembly.mapa_memoria import MapaAcessosMemoria
+from interpretador_assembly.memoizacao import CacheResultados
+from interpretador_assembly.servidor import ServidorInterpretador
+from interpretador_assembly import teste_diferencial
 
-if __name__ == "__main__":
 
-    # Ler arquivo
-    DIRETORIO_SCRIPT = os.path.dirname(__file__)
-
-    # Se usuário inseriu diretório do arquivo assembly como argumento, lê
-    if len(sys.argv) > 1:
-        DIRETORIO_ARQUIVO_ASSEMBLY = sys.argv[1]
-
-    # Senão, lê <pasta do arquivo main.py>/assembly-sample.asm
-    else:
-        DIRETORIO_ARQUIVO_ASSEMBLY = os.path.join(DIRETORIO_SCRIPT, "assembly-sample.asm")
+def executar_arquivo(diretorio_arquivo_assembly, opcoes):
+    "Valida, carrega e executa um arquivo assembly"
 
     # Abre arquivo
-    MY_CODE = open(DIRETORIO_ARQUIVO_ASSEMBLY, "r", encoding="utf-8").read()
+    with open(diretorio_arquivo_assembly, "r", encoding="utf-8") as arquivo:
+        my_code = arquivo.read()
 
     # Executar
     assembler = InterpretadorAssembly()
-    assembler.executar_validacao(MY_CODE)
-    assembler.carregar_codigo(MY_CODE)
-    assembler.executar_codigo()
+    assembler.executar_validacao(my_code)
+    assembler.carregar_codigo(my_code)
+    executar_interpretador(assembler, opcoes)
+
+
+def adicionar_opcoes_execucao(parser):
+    "Opções comuns a todos os comandos que executam um programa"
+    parser.add_argument("--estatisticas", choices=["json", "prometheus"])
+    gravacao = parser.add_mutually_exclusive_group()
+    gravacao.add_argument("--gravar", metavar="ARQUIVO",
+                          help="grava as entradas e saídas do INT")
+    gravacao.add_argument("--reproduzir", metavar="ARQUIVO",
+                          help="lê as entradas do INT 1 de uma gravação")
+    parser.add_argument("--rapido", action="store_true",
+                        help="com --reproduzir, escreve as saídas gravadas sem executar o INT 2")
+    parser.add_argument("--mapa-memoria", metavar="TAXA", type=int, nargs="?", const=1,
+                        help="mostra o heatmap de acessos à memória, amostrando 1 de cada TAXA")
+    parser.add_argument("--observar", metavar="LOCAL", action="append", default=[],
+                        help="mostra as mudanças do endereço, variável ou registrador")
+    parser.add_argument("--ponto-parada", metavar="LABEL", action="append", default=[],
+                        help="mostra cada execução da instrução (label ou índice)")
+    parser.add_argument("--despejo", choices=despejo_estado.FORMATOS,
+                        help="escreve só os registradores e a memória, no formato escolhido")
+    parser.add_argument("--despejo-arquivo", metavar="ARQUIVO",
+                        help="arquivo do despejo (padrão: saída padrão)")
+    parser.add_argument("--intervalo", metavar="INICIO:FIM", type=ler_intervalo,
+                        default=(0, None), help="endereços do despejo, FIM não incluído")
+    parser.add_argument("--nao-zero", action="store_true",
+                        help="no despejo, pula as células de memória com 0")
+
+
+def ler_intervalo(texto:str):
+    "Lê ``INICIO:FIM`` (qualquer um pode faltar) como ``(inicio, fim)``"
+    try:
+        inicio, fim = texto.split(":")
+        return int(inicio or 0), int(fim) if fim else None
+    except ValueError as erro:
+        raise argparse.ArgumentTypeError(f"invalid range '{texto}', expected INICIO:FIM") from erro
+
+
+def mostrar_evento(evento):
+    "Imprime um evento do depurador na saída de erro"
+    print(f"[{evento['tipo']}] {evento['indice']}: {evento['instrucao']}"
+          + (f"  {evento['local']}: {evento['anterior']} -> {evento['atual']}"
+             if evento["tipo"] == "observacao" else ""), file=sys.stderr)
+
+
+def executar_interpretador(assembler, opcoes):
+    "Executa o programa carregado, com gravação ou reprodução do INT"
+    if opcoes.mapa_memoria:
+        assembler.mapa_memoria = MapaAcessosMemoria(len(assembler.memory), opcoes.mapa_memoria)
+
+    if opcoes.observar or opcoes.ponto_parada:
+        depurador = Depurador(assembler)
+        for local in opcoes.observar:
+            depurador.observar(local, acao=mostrar_evento)
+        for local in opcoes.ponto_parada:
+            depurador.adicionar_ponto_parada(local, acao=mostrar_evento)
+
+    if opcoes.gravar:
+        with GravadorInt(assembler, opcoes.gravar):
+            assembler.executar_codigo()
+
+    elif opcoes.reproduzir:
+        with ReprodutorInt(assembler, opcoes.reproduzir, opcoes.rapido) as reprodutor:
+            assembler.executar_codigo()
+        if reprodutor.divergencia is not None:
+            print(f"Divergência da gravação: {reprodutor.divergencia}", file=sys.stderr)
+
+    else:
+        assembler.executar_codigo()
+
+    if opcoes.despejo:
+        despejar_estado(assembler, opcoes)
+        exibir_resultado(assembler, opcoes.estatisticas, conteudo=False)
+    else:
+        exibir_resultado(assembler, opcoes.estatisticas)
+
+    if assembler.mapa_memoria is not None:
+        print("---")
+        print(assembler.mapa_memoria.heatmap_texto(assembler.variaveis))
+
+
+def despejar_estado(assembler, opcoes):
+    "Escreve o despejo do estado no arquivo ou na saída padrão"
+    inicio, fim = opcoes.intervalo
+    filtros = {"inicio": inicio, "fim": fim, "nao_zero": opcoes.nao_zero}
+    if opcoes.despejo_arquivo:
+        despejo_estado.despejar(assembler, opcoes.despejo_arquivo, opcoes.despejo, **filtros)
+        return
 
     print("---")
-    print("Conteúdo do interpretador:")
-    print(assembler)
+    sys.stdout.flush()
+    if opcoes.despejo == "binario":
+        despejo_estado.escrever_binario(assembler, sys.stdout.buffer, **filtros)
+        sys.stdout.buffer.flush()
+    else:
+        despejo_estado.ESCRITORES[opcoes.despejo](assembler, sys.stdout, **filtros)
+
+
+def exibir_resultado(assembler, formato_estatisticas=None, conteudo=True):
+    """
+    Imprime o estado do interpretador e as estatísticas
+
+    ``conteudo``: imprime o interpretador inteiro (``print(assembler)``)
+    """
+    if conteudo:
+        print("---")
+        print("Conteúdo do interpretador:")
+        print(assembler)
+
+    if formato_estatisticas == "json":
+        print("---")
+        print(assembler.obter_estatisticas().para_json())
+    elif formato_estatisticas == "prometheus":
+        print("---")
+        print(assembler.obter_estatisticas().para_prometheus(), end="")
+
+
+def executar(argumentos, diretorio_script):
+    "Executa um arquivo assembly, com as opções da linha de comando"
+    parser = argparse.ArgumentParser(prog="main.py")
+    parser.add_argument("arquivo", nargs="?",
+                        default=os.path.join(diretorio_script, "assembly-sample.asm"))
+    adicionar_opcoes_execucao(parser)
+    opcoes = parser.parse_args(argumentos)
+
+    executar_arquivo(opcoes.arquivo, opcoes)
+
+
+def montar(argumentos):
+    "Monta a imagem binária de um arquivo assembly"
+    parser = argparse.ArgumentParser(prog="main.py montar")
+    parser.add_argument("arquivo")
+    parser.add_argument("-o", "--saida", help="caminho da imagem (padrão: <arquivo>.iasm)")
+    opcoes = parser.parse_args(argumentos)
+
+    with open(opcoes.arquivo, "r", encoding="utf-8") as arquivo:
+        codigo = arquivo.read()
+
+    imagem = formato_binario.montar_codigo(InterpretadorAssembly(), codigo)
+    caminho_imagem = opcoes.saida or os.path.splitext(opcoes.arquivo)[0] + ".iasm"
+    formato_binario.salvar_imagem(caminho_imagem, imagem)
+
+    print(f"{caminho_imagem}: {len(imagem)} bytes "
+          f"(código-fonte: {len(codigo.encode('utf-8'))} bytes, sem comentários e espaços: "
+          f"{formato_binario.tamanho_codigo_sem_comentarios(codigo)} bytes)")
+
+
+def executar_binario(argumentos):
+    "Executa uma imagem binária"
+    parser = argparse.ArgumentParser(prog="main.py executar-binario")
+    parser.add_argument("imagem")
+    adicionar_opcoes_execucao(parser)
+    opcoes = parser.parse_args(argumentos)
+
+    assembler = InterpretadorAssembly()
+    formato_binario.carregar_imagem(assembler, opcoes.imagem)
+    executar_interpretador(assembler, opcoes)
+
+
+def analisar(argumentos):
+    "Mostra o resumo do grafo de fluxo de controle de um arquivo assembly"
+    parser = argparse.ArgumentParser(prog="main.py analisar")
+    parser.add_argument("arquivo")
+    opcoes = parser.parse_args(argumentos)
+
+    with open(opcoes.arquivo, "r", encoding="utf-8") as arquivo:
+        codigo = arquivo.read()
+
+    assembler = InterpretadorAssembly()
+    assembler.executar_validacao(codigo)
+    assembler.carregar_codigo(codigo)
+    print(json.dumps(obter_grafo(assembler).resumo(), ensure_ascii=False, indent=4))
+
+
+def iniciar_servidor(argumentos):
+    "Inicia o modo servidor"
+    parser = argparse.ArgumentParser(prog="main.py servidor")
+    parser.add_argument("--socket", help="caminho do socket Unix (padrão: entrada padrão)")
+    parser.add_argument("--max-programas", type=int, default=128)
+    parser.add_argument("--max-bytes", type=int, default=16 * 1024 * 1024)
+    parser.add_argument("--memoizar", action="store_true",
+                        help="devolve o resultado guardado de execuções determinísticas")
+    parser.add_argument("--max-resultados", type=int, default=1024)
+    parser.add_argument("--max-bytes-resultados", type=int, default=64 * 1024 * 1024)
+    parser.add_argument("--diretorio-resultados", help="pasta do cache de resultados em disco")
+    parser.add_argument("--limite-instrucoes", type=int, default=10_000_000,
+                        help="limite das requisições sem limites.instrucoes")
+    opcoes = parser.parse_args(argumentos)
+
+    resultados = None
+    if opcoes.memoizar:
+        resultados = CacheResultados(opcoes.max_resultados, opcoes.max_bytes_resultados,
+                                     opcoes.diretorio_resultados)
+
+    servidor = ServidorInterpretador(opcoes.max_programas, opcoes.max_bytes, resultados,
+                                     opcoes.limite_instrucoes)
+    if opcoes.socket:
+        servidor.atender_socket(opcoes.socket)
+    else:
+        servidor.atender(sys.stdin, sys.stdout)
+
+
+def testar_diferencial(argumentos):
+    "Compara os modos de execução com programas aleatórios"
+    parser = argparse.ArgumentParser(prog="main.py testar-diferencial")
+    parser.add_argument("--programas", type=int, default=100)
+    parser.add_argument("--semente", type=int)
+    parser.add_argument("--memoria-compartilhada", action="store_true",
+                        help="inclui a memória compartilhada (só guarda doubles)")
+    opcoes = parser.parse_args(argumentos)
+
+    motores = dict(teste_diferencial.MOTORES)
+    if opcoes.memoria_compartilhada:
+        motores.update(teste_diferencial.MOTORES_OPCIONAIS)
+
+    divergencias = teste_diferencial.testar_aleatorio(opcoes.programas, opcoes.semente, motores)
+    for codigo, divergencia in divergencias:
+        print("---")
+        print(codigo)
+        print(f"Primeira divergência no passo {divergencia['passo']} "
+              f"({' x '.join(divergencia['motores'])}):")
+        for nome, instrucao in divergencia["instrucao"].items():
+            print(f"    {nome}: {instrucao}")
+
+    print(f"{opcoes.programas} programas, {len(divergencias)} com divergência")
+    if divergencias:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+
+    # Ler arquivo
+    DIRETORIO_SCRIPT = os.path.dirname(__file__)
+
+    COMANDOS = {
+        "montar": montar,
+        "executar-binario": executar_binario,
+        "analisar": analisar,
+        "servidor": iniciar_servidor,
+        "testar-diferencial": testar_diferencial,
+    }
+
+    if len(sys.argv) > 1 and sys.argv[1] in COMANDOS:
+        COMANDOS[sys.argv[1]](sys.argv[2:])
+
+    # Se usuário inseriu diretório do arquivo assembly como argumento, lê
+    # Senão, lê <pasta do arquivo main.py>/assembly-sample.asm
+    else:
+        executar(sys.argv[1:], DIRETORIO_SCRIPT)
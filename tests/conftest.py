@@ -0,0 +1,43 @@
+"""
+Configuração dos testes.
+
+O pacote fica em ``src`` e o ``main.py`` roda de lá, então os testes \
+    colocam ``src`` no caminho de importação do mesmo jeito.
+"""
+
+import os
+import sys
+
+import pytest
+
+DIRETORIO_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, DIRETORIO_SRC)
+
+# pylint: disable=wrong-import-position
+from interpretador_assembly.interpretador_assembly import InterpretadorAssembly
+
+CAMINHO_EXEMPLO = os.path.join(DIRETORIO_SRC, "assembly-sample.asm")
+
+
+def carregar(codigo:str, entradas=()):
+    """
+    Valida e carrega o código num interpretador novo.
+
+    ``entradas``: linhas lidas pelo ``INT 1``; a saída do ``INT 2`` fica \
+        em ``interpretador.saidas``
+    """
+    interpretador = InterpretadorAssembly()
+    interpretador.executar_validacao(codigo)
+    interpretador.carregar_codigo(codigo)
+    linhas = iter(entradas)
+    interpretador.entrada = lambda: next(linhas)
+    interpretador.saidas = []
+    interpretador.saida = interpretador.saidas.append
+    return interpretador
+
+
+@pytest.fixture
+def codigo_exemplo():
+    "Código do assembly-sample.asm"
+    with open(CAMINHO_EXEMPLO, "r", encoding="utf-8") as arquivo:
+        return arquivo.read()
@@ -0,0 +1,39 @@
+"Decodificação: desvios com o índice da instrução e labels inexistentes"
+
+import pytest
+
+from conftest import carregar
+from benchmark import PROGRAMAS, VOLTAS, medir
+from interpretador_assembly.erros.semantic_error import SemanticError
+from interpretador_assembly.interpretador_assembly import InterpretadorAssembly
+
+
+def test_desvio_guarda_indice_da_instrucao():
+    # linhas vazias e comentários não contam no índice
+    interpretador = carregar("-- início\nMOVE A, 0\n\nlaco: ADD A, 1\nCMP A, 3\n"
+                             "JFALSE laco\nJTRUE fim\nfim: HALT")
+    decodificadas = interpretador.instrucoes_decodificadas
+    assert [instrucao[2] for instrucao in decodificadas[3:5]] == [[1], [5]]
+    assert decodificadas[1][2] == ["A", "1"]
+
+    interpretador.labels["laco"] = 0
+    assert interpretador.resolver_desvio(("JUMP", interpretador.mnemonicos["JUMP"], ["laco"]), 3) \
+        == ("JUMP", interpretador.mnemonicos["JUMP"], [0])
+
+
+def test_label_inexistente_no_carregamento():
+    interpretador = InterpretadorAssembly()
+    codigo = "MOVE A, 0\nJUMP fim\nHALT"
+    interpretador.executar_validacao(codigo)
+    with pytest.raises(SemanticError):
+        interpretador.carregar_codigo(codigo)
+
+
+def test_instrucoes_dos_programas_do_benchmark():
+    esperadas = {
+        "sequencial": VOLTAS + 2,
+        "laco_jfalse": 3 * VOLTAS + 2,
+        "laco_jtrue_jump": 4 * VOLTAS + 1,
+        "saltos": VOLTAS + 1,
+    }
+    assert {nome: medir(codigo, 1)[1] for nome, codigo in PROGRAMAS} == esperadas
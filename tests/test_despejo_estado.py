@@ -0,0 +1,107 @@
+"""
+Despejo do estado: leitura de volta dos formatos e filtros.
+"""
+
+import io
+import json
+
+import pytest
+
+from conftest import carregar
+from interpretador_assembly import despejo_estado
+from interpretador_assembly.erros.despejo_invalido_error import DespejoInvalidoError
+
+CODIGO = "VAR x, 3\nVAR y, 5\nMOVE A, 7\nMOVE x, 2\nMOVE y, 0\nHALT"
+
+
+def executado():
+    interpretador = carregar(CODIGO)
+    interpretador.executar_codigo()
+    return interpretador
+
+
+def binario(interpretador, **filtros):
+    arquivo = io.BytesIO()
+    despejo_estado.escrever_binario(interpretador, arquivo, **filtros)
+    return despejo_estado.ler_binario(arquivo.getvalue())
+
+
+def test_binario_ida_e_volta():
+    interpretador = executado()
+    interpretador.memory[10] = -2**40
+    interpretador.memory[11] = 1.5
+    interpretador.memory[12] = "texto ç"
+    interpretador.memory[13] = 2**70
+
+    lido = binario(interpretador)
+    assert lido["linha_codigo"] == interpretador.linha_codigo
+    assert lido["registradores"] == interpretador.registers
+    assert lido["memoria"] == dict(enumerate(interpretador.memory))
+
+
+def test_binario_sem_seek_igual_com_seek():
+    interpretador = executado()
+
+    class SemSeek(io.BytesIO):
+        def seekable(self):
+            return False
+
+    com_seek, sem_seek = io.BytesIO(), SemSeek()
+    despejo_estado.escrever_binario(interpretador, com_seek, nao_zero=True)
+    despejo_estado.escrever_binario(interpretador, sem_seek, nao_zero=True)
+    assert com_seek.getvalue() == sem_seek.getvalue()
+
+
+def test_json_ida_e_volta():
+    interpretador = executado()
+    arquivo = io.StringIO()
+    despejo_estado.escrever_json(interpretador, arquivo, inicio=2, fim=6, nao_zero=True)
+
+    lido = json.loads(arquivo.getvalue())
+    assert lido["registradores"] == interpretador.registers
+    assert lido["memoria"] == {"3": 2}
+
+
+def test_desde_inclui_celulas_zeradas():
+    interpretador = executado()
+    interpretador.memory[5] = 9
+    antes = despejo_estado.capturar(interpretador)
+    interpretador.memory[3] = 4
+    interpretador.memory[5] = 0
+    interpretador.registers["A"] = 8
+
+    esperado = {3: 4, 5: 0}
+    assert dict(despejo_estado.celulas(interpretador.memory, desde=antes)) == esperado
+    assert dict(despejo_estado.celulas(interpretador.memory, nao_zero=True, desde=antes)) == esperado
+    assert binario(interpretador, nao_zero=True, desde=antes)["memoria"] == esperado
+    assert binario(interpretador, desde=antes)["registradores"] == {"A": 8}
+
+    # registrador que não existia no instantâneo também mudou
+    interpretador.registers["D"] = 0
+    assert despejo_estado.registradores(interpretador, antes) == {"A": 8, "D": 0}
+
+
+def test_hex_marca_celulas_fora_do_filtro():
+    interpretador = executado()
+    arquivo = io.StringIO()
+    despejo_estado.escrever_hex(interpretador, arquivo, fim=8, nao_zero=True)
+    assert "00000000: -- -- -- 0x2 -- -- -- --" in arquivo.getvalue().splitlines()
+
+
+@pytest.mark.parametrize("alterar", [
+    lambda dados: dados[:5],
+    lambda dados: b"XXXX" + dados[4:],
+    lambda dados: dados[:-3],
+    lambda dados: dados.replace(b"'abc'", b"'ab\xff"),
+    lambda dados: dados.replace(b"'abc'", b"(1, 2"),
+    lambda dados: dados.replace(b"'abc'", b"a.b.c"),
+])
+def test_despejo_corrompido(alterar):
+    interpretador = carregar("HALT")
+    interpretador.memory[0] = "abc"
+    arquivo = io.BytesIO()
+    despejo_estado.escrever_binario(interpretador, arquivo, fim=1)
+    dados = alterar(arquivo.getvalue())
+
+    with pytest.raises(DespejoInvalidoError):
+        despejo_estado.ler_binario(dados)
@@ -0,0 +1,50 @@
+"Contadores de execução e exportação"
+
+import json
+
+from conftest import carregar
+from interpretador_assembly.execucao_reversa import HistoricoExecucao
+
+
+def desvios(interpretador):
+    return [(desvio["tomados"], desvio["nao_tomados"])
+            for desvio in interpretador.obter_estatisticas().desvios]
+
+
+def test_desvio_para_a_proxima_instrucao_conta_como_tomado():
+    interpretador = carregar("CMP CP, 0\nJTRUE prox\nprox: HALT")
+    interpretador.executar_codigo()
+    assert desvios(interpretador) == [(1, 0)]
+
+
+def test_desvio_nao_tomado():
+    interpretador = carregar("CMP CP, 1\nJTRUE prox\nprox: HALT")
+    interpretador.executar_codigo()
+    assert desvios(interpretador) == [(0, 1)]
+
+
+def test_contadores_do_laco():
+    interpretador = carregar("MOVE A, 0\nlaco: ADD A, 1\nCMP A, 3\nJFALSE laco\nHALT")
+    interpretador.executar_codigo()
+    estatisticas = interpretador.obter_estatisticas()
+    assert estatisticas.instrucoes_executadas == 1 + 3 * 3 + 1
+    assert desvios(interpretador) == [(2, 1)]
+
+
+def test_desfazer_desvio_para_a_proxima_instrucao():
+    interpretador = carregar("CMP CP, 0\nJTRUE prox\nprox: HALT")
+    historico = HistoricoExecucao(interpretador)
+    historico.ligar()
+    interpretador.executar_codigo()
+    historico.voltar(2)
+    assert desvios(interpretador) == [(0, 0)]
+
+
+def test_exportacao(codigo_exemplo):
+    interpretador = carregar(codigo_exemplo, ["3"])
+    interpretador.executar_codigo()
+    estatisticas = interpretador.obter_estatisticas()
+    dados = json.loads(estatisticas.para_json())
+    assert dados["chamadas_int"] == 2
+    assert dados["instrucoes_executadas"] == sum(dados["execucoes_por_instrucao"])
+    assert "tomado" in estatisticas.para_prometheus()
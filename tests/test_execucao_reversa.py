@@ -0,0 +1,119 @@
+"Execução reversa: desfazer e executar de novo chega no mesmo estado"
+
+import pytest
+
+from conftest import carregar
+from interpretador_assembly.depuracao import Depurador
+from interpretador_assembly.erros.limite_execucao_error import LimiteExecucaoError
+from interpretador_assembly.execucao_reversa import HistoricoExecucao
+
+CODIGO = """\
+    VAR x, 5
+    VAR texto, 40
+    MOVE A, 0
+    MOVE B, 4
+laco: ADD A, B
+    MOVE x, A
+    SUBT B, 1
+    CMP B, 0
+    JFALSE laco
+    CARREGARTEXTO texto, "oi: --"
+    PREENCHER 50, 7, 3
+    MOVEBLOCO 60, 50, 3
+fim: HALT
+"""
+
+
+def estado(interpretador):
+    return {
+        "registradores": dict(interpretador.registers),
+        "memoria": list(interpretador.memory),
+        "labels": dict(interpretador.labels),
+        "variaveis": dict(interpretador.variaveis),
+        "linha_codigo": interpretador.linha_codigo,
+        "contagem_instrucoes": list(interpretador.contagem_instrucoes),
+        "contagem_desvios_tomados": list(interpretador.contagem_desvios_tomados),
+        "instrucoes_executadas": interpretador.instrucoes_executadas,
+    }
+
+
+def executado(capacidade=100000):
+    interpretador = carregar(CODIGO)
+    historico = HistoricoExecucao(interpretador, capacidade)
+    historico.ligar()
+    inicial = estado(interpretador)
+    interpretador.executar_codigo()
+    return interpretador, historico, inicial
+
+
+def test_desfazer_tudo_volta_ao_inicio():
+    interpretador, historico, inicial = executado()
+    assert estado(interpretador)["memoria"][60:63] == [7, 7, 7]
+
+    # o HALT também é uma entrada do histórico
+    executadas = interpretador.instrucoes_executadas
+    assert historico.voltar(executadas + 1) == executadas
+    assert estado(interpretador) == inicial
+
+
+@pytest.mark.parametrize("quantidade", [1, 2, 3, 7, 12, 20])
+def test_desfazer_e_refazer(quantidade):
+    interpretador, historico, _ = executado()
+    final = estado(interpretador)
+
+    assert historico.voltar(quantidade) == quantidade
+    assert estado(interpretador) != final
+    interpretador.executar_codigo()
+    assert estado(interpretador) == final
+
+
+def test_voltar_ate_label_e_alteracao():
+    interpretador, historico, _ = executado()
+
+    assert historico.voltar_ate("laco") is not None
+    assert interpretador.linha_codigo == interpretador.labels["laco"]
+    assert interpretador.registers["B"] == 1
+
+    interpretador, historico, _ = executado()
+    historico.voltar_ate_alteracao(41)
+    assert interpretador.memory[40:47] == [0] * 7
+    assert historico.voltar_ate_alteracao("x") is not None
+    assert interpretador.memory[5] == 9
+    assert interpretador.linha_codigo == 5
+
+
+def test_capacidade_limita_o_historico():
+    interpretador, historico, _ = executado(capacidade=5)
+    final = estado(interpretador)
+    assert len(historico) == 5
+    assert historico.voltar(10) == 5
+    interpretador.executar_codigo()
+    assert estado(interpretador) == final
+
+    with pytest.raises(ValueError):
+        HistoricoExecucao(interpretador, 0)
+
+
+def test_parado_antes_do_halt_sem_executar():
+    # pausa da observação e limite de instruções param com o HALT para executar
+    interpretador = carregar("MOVE A, 1\nADD A, 2\nHALT")
+    historico = HistoricoExecucao(interpretador)
+    historico.ligar()
+    depurador = Depurador(interpretador)
+    depurador.observar("A")
+    depurador.continuar()
+    assert depurador.continuar()["indice"] == 1
+    assert interpretador.linha_codigo == 2
+
+    assert historico.voltar(1) == 1
+    assert interpretador.contagem_instrucoes == [1, 0, 0]
+    assert interpretador.instrucoes_executadas == 1
+
+    interpretador = carregar("MOVE A, 1\nADD A, 2\nHALT")
+    historico = HistoricoExecucao(interpretador)
+    historico.ligar()
+    with pytest.raises(LimiteExecucaoError):
+        interpretador.executar_codigo(2)
+    assert historico.voltar(1) == 1
+    assert interpretador.contagem_instrucoes == [1, 0, 0]
+    assert interpretador.instrucoes_executadas == 1
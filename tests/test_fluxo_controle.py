@@ -0,0 +1,102 @@
+"Grafo de fluxo de controle: blocos, dominadores e laços"
+
+import random
+
+import pytest
+
+from conftest import carregar
+from interpretador_assembly.fluxo_controle import GrafoFluxoControle, obter_grafo
+
+LACOS_ANINHADOS = """\
+    MOVE A, 0
+externo: MOVE B, 0
+interno: ADD B, 1
+    CMP B, 3
+    JFALSE interno
+    ADD A, 1
+    CMP A, 2
+    JFALSE externo
+    HALT
+    MOVE A, 9
+"""
+
+
+def grafo_de(codigo):
+    interpretador = carregar(codigo)
+    return GrafoFluxoControle(interpretador.instrucoes_decodificadas, interpretador.labels)
+
+
+def test_blocos_e_arestas():
+    grafo = grafo_de(LACOS_ANINHADOS)
+    inicios = [(bloco.inicio, bloco.fim) for bloco in grafo.blocos]
+    assert inicios == [(0, 1), (1, 2), (2, 5), (5, 8), (8, 9), (9, 10)]
+    assert [bloco.sucessores for bloco in grafo.blocos] == [[1], [2], [2, 3], [1, 4], [], []]
+    assert grafo.blocos[2].labels == ["interno"]
+    assert grafo.alcancaveis == {0, 1, 2, 3, 4}
+    assert not grafo.instrucao_alcancavel(9)
+
+
+def test_dominadores_e_lacos():
+    grafo = grafo_de(LACOS_ANINHADOS)
+    assert grafo.dominador_imediato == {1: 0, 2: 1, 3: 2, 4: 3}
+    assert grafo.domina(1, 4) and not grafo.domina(3, 2)
+
+    lacos = {laco.cabecalho: laco for laco in grafo.lacos}
+    assert set(lacos) == {1, 2}
+    assert lacos[1].blocos == {1, 2, 3} and lacos[1].profundidade == 1
+    assert lacos[2].blocos == {2} and lacos[2].profundidade == 2
+    assert [bloco.profundidade_laco for bloco in grafo.blocos] == [0, 1, 2, 1, 0, 0]
+    assert [bloco.indice for bloco in grafo.caminhos_quentes()] == [2, 1, 3]
+    assert grafo.resumo()["profundidade_maxima"] == 2
+
+
+def test_desvio_para_a_proxima_instrucao():
+    grafo = grafo_de("CMP A, 0\nJTRUE proxima\nproxima: HALT")
+    assert [bloco.sucessores for bloco in grafo.blocos] == [[1], []]
+    assert grafo.blocos[1].predecessores == [0]
+    assert not grafo.lacos
+
+
+def test_obter_grafo_recalcula_so_com_programa_novo():
+    interpretador = carregar(LACOS_ANINHADOS)
+    grafo = obter_grafo(interpretador)
+    assert obter_grafo(interpretador) is grafo
+    interpretador.decodificar_programa()
+    assert obter_grafo(interpretador) is not grafo
+
+
+def alcancaveis_sem(grafo, removido):
+    "Blocos alcançáveis da entrada sem passar por ``removido``"
+    vistos, pendentes = set(), [0] if removido != 0 else []
+    while pendentes:
+        bloco = pendentes.pop()
+        if bloco not in vistos:
+            vistos.add(bloco)
+            pendentes.extend(s for s in grafo.blocos[bloco].sucessores if s != removido)
+    return vistos
+
+
+def programa_aleatorio(gerador, tamanho):
+    linhas = []
+    for numero in range(tamanho):
+        instrucao = gerador.choice([
+            "ADD A, 1", "CMP A, 3", f"JTRUE l{gerador.randrange(tamanho)}",
+            f"JFALSE l{gerador.randrange(tamanho)}", f"JUMP l{gerador.randrange(tamanho)}",
+            "HALT", "MOVE B, A",
+        ])
+        linhas.append(f"l{numero}: {instrucao}")
+    return "\n".join(linhas)
+
+
+@pytest.mark.parametrize("semente", range(20))
+def test_dominadores_pela_definicao(semente):
+    grafo = grafo_de(programa_aleatorio(random.Random(semente), 12))
+    for bloco in grafo.alcancaveis:
+        # d domina b se b não é alcançável sem passar por d
+        esperados = {d for d in grafo.alcancaveis
+                     if d == bloco or bloco not in alcancaveis_sem(grafo, d)}
+        assert grafo.dominadores[bloco] == esperados
+
+    for laco in grafo.lacos:
+        assert all(grafo.domina(laco.cabecalho, bloco) for bloco in laco.blocos)
+        assert all(laco.cabecalho in grafo.blocos[retorno].sucessores for retorno in laco.retornos)
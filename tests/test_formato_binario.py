@@ -0,0 +1,79 @@
+"Imagem binária: montar, decodificar e tamanho"
+
+import pytest
+
+from conftest import carregar
+from interpretador_assembly import formato_binario
+from interpretador_assembly.erros.imagem_invalida_error import ImagemInvalidaError
+from interpretador_assembly.interpretador_assembly import InterpretadorAssembly
+
+PROGRAMA_PEQUENO = "MOVE A, 1\nlaco: ADD A, 1\nCMP A, 10\nJFALSE laco\nHALT"
+
+
+def decodificar(imagem):
+    interpretador = InterpretadorAssembly()
+    variaveis = formato_binario.decodificar_imagem(interpretador, imagem)
+    return interpretador, variaveis
+
+
+def sem_mnemonicos(interpretador):
+    return [instrucao and (instrucao[0], instrucao[2])
+            for instrucao in interpretador.instrucoes_decodificadas]
+
+
+@pytest.mark.parametrize("codigo", [
+    PROGRAMA_PEQUENO,
+    "VAR x, 7\n\n-- comentário\n\nfim:\nMOVE x, 300\nINT 2, x\nHALT",
+    'CARREGARTEXTO 10, "ola mundo"\nMOVEBLOCO 40, 10, 9\nHALT',
+])
+def test_ida_e_volta(codigo):
+    original = carregar(codigo)
+    interpretador, _ = decodificar(formato_binario.montar(original))
+
+    assert sem_mnemonicos(interpretador) == sem_mnemonicos(original)
+    assert interpretador.labels == original.labels
+
+    original.executar_codigo()
+    interpretador.executar_codigo()
+    assert interpretador.memory == original.memory
+    assert interpretador.registers == original.registers
+
+
+def test_ida_e_volta_exemplo(codigo_exemplo):
+    original = carregar(codigo_exemplo, ["3"])
+    interpretador, variaveis = decodificar(formato_binario.montar(original))
+    assert variaveis == {"valor": 0}
+    assert sem_mnemonicos(interpretador) == sem_mnemonicos(original)
+
+
+def test_imagem_menor_que_codigo_sem_comentarios(codigo_exemplo):
+    programa_grande = "\n".join(f"l{i}: MOVE A, {i}\nADD B, A\nCMP B, {i * 3}\nJTRUE l{i // 2}"
+                                for i in range(250)) + "\nHALT"
+    for codigo in (PROGRAMA_PEQUENO, programa_grande, codigo_exemplo):
+        imagem = formato_binario.montar(carregar(codigo))
+        assert len(imagem) < formato_binario.tamanho_codigo_sem_comentarios(codigo)
+
+
+def test_halt_ocupa_um_byte():
+    com_halt = formato_binario.montar(carregar("HALT\nHALT"))
+    assert len(com_halt) - len(formato_binario.montar(carregar("HALT"))) == 1
+
+
+def test_varint():
+    for valor in (0, 1, 127, 128, 300, 2**32):
+        dados = bytearray()
+        formato_binario.escrever_varint(dados, valor)
+        assert formato_binario.ler_varint(dados, 0) == (valor, len(dados))
+
+
+@pytest.mark.parametrize("imagem", [b"", b"XXXX\x02", b"IASM\x01", b"IASM\x02\x05"])
+def test_imagem_invalida(imagem):
+    with pytest.raises(ImagemInvalidaError):
+        decodificar(imagem)
+
+
+def test_imagem_truncada():
+    imagem = formato_binario.montar(carregar(PROGRAMA_PEQUENO))
+    for tamanho in range(len(imagem)):
+        with pytest.raises(ImagemInvalidaError):
+            decodificar(imagem[:tamanho])
@@ -0,0 +1,97 @@
+"""
+Gravação e reprodução do INT, e o contador de instruções usado nos eventos.
+"""
+
+from conftest import carregar
+from interpretador_assembly.depuracao import Depurador
+from interpretador_assembly.execucao_reversa import HistoricoExecucao
+from interpretador_assembly.gravacao_int import GravadorInt, ReprodutorInt, ler_gravacao
+
+
+def test_gravar_e_reproduzir(codigo_exemplo, tmp_path):
+    caminho = str(tmp_path / "sessao.iagr")
+    gravado = carregar(codigo_exemplo, ["3"])
+    with GravadorInt(gravado, caminho):
+        gravado.executar_codigo()
+    assert len(ler_gravacao(caminho)) == 2
+
+    interpretador = carregar(codigo_exemplo)
+    entrada, saida = interpretador.entrada, interpretador.saida
+    with ReprodutorInt(interpretador, caminho) as reprodutor:
+        interpretador.executar_codigo()
+
+    assert reprodutor.divergencia is None
+    assert interpretador.saidas == gravado.saidas == ["&"]
+    assert interpretador.entrada is entrada
+    assert interpretador.saida == saida
+
+
+def test_reproducao_com_divergencia(codigo_exemplo, tmp_path):
+    caminho = str(tmp_path / "sessao.iagr")
+    gravado = carregar(codigo_exemplo, ["3"])
+    with GravadorInt(gravado, caminho):
+        gravado.executar_codigo()
+
+    interpretador = carregar("MOVE A, 1\n" + codigo_exemplo)
+    with ReprodutorInt(interpretador, caminho, rapido=True) as reprodutor:
+        interpretador.executar_codigo()
+
+    assert reprodutor.divergencia["tipo"] == "entrada"
+    assert interpretador.saidas == ["&"]
+
+
+def test_reproducao_rapida_escreve_a_gravacao(tmp_path):
+    caminho = str(tmp_path / "sessao.iagr")
+    codigo = "VAR v, 5\nMOVE v, 72\nINT 2, v\nMOVE v, 105\nINT 2, v\nINT 2, 5\nHALT"
+    gravado = carregar(codigo)
+    with GravadorInt(gravado, caminho):
+        gravado.executar_codigo()
+
+    # a memória diferente não muda a saída: o INT 2 não executa
+    interpretador = carregar(codigo.replace("105", "106"))
+    original = interpretador.instrucoes_decodificadas[2][1]
+    historico = HistoricoExecucao(interpretador)
+    historico.ligar()
+    with ReprodutorInt(interpretador, caminho, rapido=True):
+        interpretador.executar_codigo()
+        assert interpretador.saidas == []
+    assert interpretador.saidas == ["Hii"]
+    assert interpretador.contagem_instrucoes == gravado.contagem_instrucoes
+    assert interpretador.memory[5] == 106
+
+    historico.desligar()
+    assert interpretador.instrucoes_decodificadas[2][1] is original
+
+
+def test_restaurar_depois_de_erro(codigo_exemplo, tmp_path):
+    caminho = str(tmp_path / "vazia.iagr")
+    with GravadorInt(carregar("HALT"), caminho) as gravador:
+        gravador.interpretador.executar_codigo()
+
+    interpretador = carregar(codigo_exemplo)
+    entrada = interpretador.entrada
+    try:
+        with ReprodutorInt(interpretador, caminho):
+            interpretador.executar_codigo()
+    except EOFError:
+        pass
+    assert interpretador.entrada is entrada
+
+
+def test_contador_de_instrucoes_executadas(codigo_exemplo):
+    interpretador = carregar(codigo_exemplo, ["3"])
+    interpretador.executar_codigo()
+    assert interpretador.instrucoes_executadas == sum(interpretador.contagem_instrucoes) > 0
+
+    interpretador = carregar("MOVE A, 1\nADD A, 2\nADD A, 4\nHALT")
+    historico = HistoricoExecucao(interpretador)
+    historico.ligar()
+    depurador = Depurador(interpretador)
+    depurador.adicionar_ponto_parada(2)
+
+    depurador.continuar()
+    assert interpretador.instrucoes_executadas == sum(interpretador.contagem_instrucoes) == 2
+    depurador.continuar()
+    historico.voltar(3)
+    assert interpretador.instrucoes_executadas == sum(interpretador.contagem_instrucoes) == 1
+    assert interpretador.registers["A"] == 1
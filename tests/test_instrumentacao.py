@@ -0,0 +1,138 @@
+"""
+Estatísticas, grafo de fluxo e observações com as instruções instrumentadas \
+    pelo ``Depurador`` e pelo ``HistoricoExecucao``.
+"""
+
+from conftest import carregar
+from interpretador_assembly.depuracao import Depurador
+from interpretador_assembly.execucao_reversa import HistoricoExecucao
+from interpretador_assembly.fluxo_controle import GrafoFluxoControle
+from interpretador_assembly.memoizacao import programa_deterministico
+
+
+def test_metadados_repassados_pelos_envoltorios(codigo_exemplo):
+    interpretador = carregar(codigo_exemplo)
+    originais = list(interpretador.instrucoes_decodificadas)
+    HistoricoExecucao(interpretador).ligar()
+    Depurador(interpretador).adicionar_ponto_parada(1)
+
+    for original, instrumentada in zip(originais, interpretador.instrucoes_decodificadas):
+        if original is None or original[1] is None:
+            continue
+        mnemonico, envolvido = original[1], instrumentada[1]
+        assert envolvido is not mnemonico
+        for atributo in ("parametros", "desvio", "leituras", "escritas", "efeitos", "custo", "puro"):
+            assert getattr(envolvido, atributo) == getattr(mnemonico, atributo)
+        assert envolvido.efeitos_instrucao(original[2]) == mnemonico.efeitos_instrucao(original[2])
+
+
+def test_estatisticas_com_depurador(codigo_exemplo):
+    sem_depurador = carregar(codigo_exemplo, ["3"])
+    sem_depurador.executar_codigo()
+
+    interpretador = carregar(codigo_exemplo, ["3"])
+    depurador = Depurador(interpretador)
+    depurador.observar(5, acao=lambda evento: None)
+    depurador.adicionar_ponto_parada(1, acao=lambda evento: None)
+    interpretador.executar_codigo()
+
+    esperadas = sem_depurador.obter_estatisticas().para_dict()
+    obtidas = interpretador.obter_estatisticas().para_dict()
+    del esperadas["tempos"], obtidas["tempos"]
+    assert esperadas["chamadas_int"] == 2
+    assert obtidas == esperadas
+
+
+def test_observar_variavel_com_historico():
+    interpretador = carregar("VAR x, 5\nMOVE x, 1\nMOVE x, 2\nHALT")
+    HistoricoExecucao(interpretador).ligar()
+
+    eventos = []
+    observacao = Depurador(interpretador).observar("x", acao=eventos.append)
+    interpretador.executar_codigo()
+
+    assert (observacao.tipo, observacao.local) == ("memoria", 5)
+    assert [(evento["anterior"], evento["atual"]) for evento in eventos] == [(0, 1), (1, 2)]
+
+
+def test_grafo_com_historico():
+    codigo = "VAR x, 5\nMOVE x, 1\nMOVE A, x\nHALT\nMOVE A, 1"
+    esperado = GrafoFluxoControle(carregar(codigo).instrucoes_decodificadas, {})
+
+    interpretador = carregar(codigo)
+    HistoricoExecucao(interpretador).ligar()
+    grafo = GrafoFluxoControle(interpretador.instrucoes_decodificadas, interpretador.labels)
+
+    assert len(grafo.blocos) == len(esperado.blocos) == 2
+    assert not grafo.instrucao_alcancavel(4)
+
+
+def test_memoizacao_com_instrumentacao(codigo_exemplo):
+    interpretador = carregar(codigo_exemplo)
+    Depurador(interpretador).observar("A", acao=lambda evento: None)
+    HistoricoExecucao(interpretador).ligar()
+    assert not programa_deterministico(interpretador)
+
+    interpretador = carregar("MOVE A, 1\nINT 2, A\nHALT")
+    HistoricoExecucao(interpretador).ligar()
+    assert programa_deterministico(interpretador)
+
+
+def test_remover_depurador_mantem_historico():
+    interpretador = carregar("MOVE A, 1\nADD A, 2\nHALT")
+    depurador = Depurador(interpretador)
+    depurador.observar("A", acao=lambda evento: None)
+    historico = HistoricoExecucao(interpretador)
+    historico.ligar()
+    depurador.remover_tudo()
+    interpretador.executar_codigo()
+
+    assert len(historico) == 3
+    assert historico.voltar(2) == 2
+    assert interpretador.registers["A"] == 1
+
+
+def test_desligar_historico_mantem_depurador():
+    interpretador = carregar("MOVE A, 1\nADD A, 2\nHALT")
+    historico = HistoricoExecucao(interpretador)
+    historico.ligar()
+    eventos = []
+    Depurador(interpretador).observar("A", acao=eventos.append)
+    historico.desligar()
+    interpretador.executar_codigo()
+
+    assert [evento["atual"] for evento in eventos] == [1, 3]
+    assert len(historico) == 0
+
+
+def test_camadas_voltam_ao_original():
+    interpretador = carregar("MOVE A, 1\nADD A, 2\nHALT")
+    originais = list(interpretador.instrucoes_decodificadas)
+    depurador = Depurador(interpretador)
+    historico = HistoricoExecucao(interpretador)
+
+    depurador.adicionar_ponto_parada(1, acao=lambda evento: None)
+    historico.ligar()
+    depurador.observar("A", acao=lambda evento: None)
+    historico.desligar()
+    depurador.remover_tudo()
+
+    assert interpretador.instrucoes_decodificadas == originais
+
+
+def test_pausa_antes_de_gravar_no_historico():
+    interpretador = carregar("MOVE A, 1\nADD A, 2\nADD A, 4\nHALT")
+    historico = HistoricoExecucao(interpretador)
+    historico.ligar()
+    depurador = Depurador(interpretador)
+    depurador.adicionar_ponto_parada(2)
+
+    assert depurador.continuar()["indice"] == 2
+    assert len(historico) == 2
+    assert depurador.continuar() is None
+    assert interpretador.registers["A"] == 7
+
+    assert historico.voltar(4) == 4
+    assert interpretador.registers == {"CP": 0}
+    assert interpretador.linha_codigo == 0
+    assert sum(interpretador.contagem_instrucoes) == 0
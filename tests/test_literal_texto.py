@@ -0,0 +1,55 @@
+"Literais de texto com pontuação, '--' e ':'"
+
+import pytest
+
+from conftest import carregar
+from interpretador_assembly.erros.lexical_error import LexicalError
+from interpretador_assembly.interpretador_assembly import (InterpretadorAssembly,
+                                                           remover_comentario, separar_label)
+from interpretador_assembly.validacao_incremental import ValidadorIncremental
+
+
+def texto_na_memoria(interpretador, inicio):
+    fim = interpretador.memory.index(0, inicio)
+    return "".join(map(chr, interpretador.memory[inicio:fim]))
+
+
+@pytest.mark.parametrize("texto", ["a:b", "a--b", "Olá, mundo!", "x: y -- z", "(1+2)*3=9;", "'"])
+def test_carregar_texto_com_pontuacao(texto):
+    interpretador = carregar(f'inicio: CARREGARTEXTO 2, "{texto}"  -- comentário: "x"\nHALT')
+    interpretador.executar_codigo()
+    assert texto_na_memoria(interpretador, 2) == texto
+    assert interpretador.labels["inicio"] == 0
+
+
+def test_label_e_comentario_fora_do_literal():
+    assert remover_comentario('CARREGARTEXTO 2, "a--b" -- c') == 'CARREGARTEXTO 2, "a--b" '
+    assert remover_comentario("MOVE A, 1 -- c") == "MOVE A, 1 "
+    assert remover_comentario('CARREGARTEXTO 2, "a--b') == 'CARREGARTEXTO 2, "a--b'
+    assert separar_label('CARREGARTEXTO 2, "a:b"') == (None, 'CARREGARTEXTO 2, "a:b"')
+    assert separar_label('fim : HALT') == ("fim", " HALT")
+
+
+@pytest.mark.parametrize("codigo, erro", [
+    ('CARREGARTEXTO 2, "a:b', SyntaxError),
+    ('CARREGARTEXTO 2, "a" -- "b', None),
+    ("MOVE A;, 1", LexicalError),
+    ("CARREGARTEXTO 10, 5", SyntaxError),
+    ("CARREGARTEXTO 10, A", SyntaxError),
+])
+def test_validacao(codigo, erro):
+    if erro is None:
+        carregar(codigo)
+    else:
+        with pytest.raises(erro):
+            carregar(codigo)
+
+
+def test_texto_sem_aspas_recusado_antes_de_executar():
+    interpretador = InterpretadorAssembly()
+    validador = ValidadorIncremental(interpretador, "CARREGARTEXTO 10, 5\nHALT")
+    assert [(numero, type(erro)) for numero, erro in validador.diagnosticos()] == \
+        [(0, SyntaxError)]
+    with pytest.raises(SyntaxError):
+        validador.preparar_execucao()
+    assert validador.substituir_linha(0, 'CARREGARTEXTO 10, "5"') == [(0, None)]
@@ -0,0 +1,61 @@
+"Mapa de acessos à memória e amostragem"
+
+from conftest import carregar
+from interpretador_assembly.mapa_memoria import MapaAcessosMemoria
+
+
+def test_contagem_exata():
+    interpretador = carregar("VAR x, 3\nMOVE x, 5\nADD x, x\nMOVE A, x\nHALT")
+    interpretador.mapa_memoria = MapaAcessosMemoria(len(interpretador.memory))
+    interpretador.executar_codigo()
+    mapa = interpretador.mapa_memoria
+    assert mapa.leituras[3] >= 3
+    assert mapa.escritas[3] >= 2
+    assert "x" in mapa.heatmap_texto(interpretador.variaveis)
+
+
+def test_amostragem_sem_aliasing_em_rodizio():
+    # laço que passa por N endereços em rodízio: o intervalo fixo 1/N
+    # contaria tudo num endereço só
+    taxa = 8
+    mapa = MapaAcessosMemoria(taxa, taxa)
+    for _ in range(20000):
+        for endereco in range(taxa):
+            mapa.registrar_leitura(endereco)
+
+    estimativas = mapa.estimar(mapa.leituras)
+    for estimativa in estimativas:
+        assert abs(estimativa - 20000) < 20000 * 0.15
+
+
+def test_leituras_e_escritas_independentes():
+    taxa = 4
+    mapa = MapaAcessosMemoria(2, taxa)
+    for _ in range(40000):
+        mapa.registrar_leitura(0)
+        mapa.registrar_escrita(1)
+    assert abs(mapa.estimar(mapa.leituras)[0] - 40000) < 40000 * 0.05
+    assert abs(mapa.estimar(mapa.escritas)[1] - 40000) < 40000 * 0.05
+
+
+def test_semente_reproduzivel():
+    def contar(semente):
+        mapa = MapaAcessosMemoria(16, 5, semente)
+        for acesso in range(5000):
+            mapa.registrar_leitura(acesso % 16)
+        return list(mapa.leituras)
+
+    assert contar(1) == contar(1)
+    assert contar(1) != contar(2)
+
+
+def test_zerar_recomeca_sorteio():
+    mapa = MapaAcessosMemoria(4, 3)
+    for acesso in range(100):
+        mapa.registrar_escrita(acesso % 4)
+    antes = list(mapa.escritas)
+    mapa.zerar()
+    assert list(mapa.escritas) == [0] * 4
+    for acesso in range(100):
+        mapa.registrar_escrita(acesso % 4)
+    assert list(mapa.escritas) == antes
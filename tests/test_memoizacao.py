@@ -0,0 +1,85 @@
+"""
+Memoização: chave do cache, assinatura dos mnemônicos e resultados iguais \
+    aos da execução.
+"""
+
+import os
+import subprocess
+import sys
+
+from conftest import DIRETORIO_SRC, carregar
+from interpretador_assembly import memoizacao
+from interpretador_assembly.interpretador_assembly import InterpretadorAssembly
+from interpretador_assembly.memoizacao import (CacheResultados, assinatura_mnemonicos,
+                                               programa_deterministico)
+from interpretador_assembly.modelos.mnemonico import Mnemonico
+from interpretador_assembly.servidor import ServidorInterpretador
+
+CODIGO = "VAR x, 3\nMOVE A, 5\nlaco: ADD x, A\nSUBT A, 1\nCMP A, 0\nJFALSE laco\nINT 2, x\nHALT"
+
+ASSINATURA_EM_OUTRO_PROCESSO = (
+    "from interpretador_assembly.interpretador_assembly import InterpretadorAssembly\n"
+    "from interpretador_assembly.memoizacao import assinatura_mnemonicos\n"
+    "print(assinatura_mnemonicos(InterpretadorAssembly().mnemonicos))\n"
+)
+
+
+def test_assinatura_estavel_entre_processos():
+    assinatura = assinatura_mnemonicos(InterpretadorAssembly().mnemonicos)
+    assert assinatura == assinatura_mnemonicos(InterpretadorAssembly().mnemonicos)
+
+    for semente in ("1", "2"):
+        ambiente = dict(os.environ, PYTHONHASHSEED=semente, PYTHONPATH=DIRETORIO_SRC)
+        resultado = subprocess.run([sys.executable, "-c", ASSINATURA_EM_OUTRO_PROCESSO],
+                                   env=ambiente, capture_output=True, text=True, check=True)
+        assert resultado.stdout.strip() == assinatura
+
+
+def test_assinatura_muda_com_os_mnemonicos():
+    interpretador = InterpretadorAssembly()
+    original = assinatura_mnemonicos(interpretador.mnemonicos)
+
+    interpretador.mnemonicos["ADD"].custo = 3
+    com_custo = assinatura_mnemonicos(interpretador.mnemonicos)
+    assert com_custo != original
+
+    class NOP(Mnemonico):
+        def __init__(self):
+            super().__init__()
+            self.efeitos = []
+
+        def executar(self, interpretador_assembly, params:list):
+            pass
+
+    interpretador.mnemonicos["NOP"] = NOP()
+    assert assinatura_mnemonicos(interpretador.mnemonicos) not in (original, com_custo)
+
+
+def test_chave_depende_de_assinatura_e_versao(monkeypatch):
+    argumentos = ({"A": 1}, [0] * 4, 100)
+    chave = CacheResultados.gerar_chave("programa", "assinatura", *argumentos)
+    assert chave == CacheResultados.gerar_chave("programa", "assinatura", *argumentos)
+    assert chave != CacheResultados.gerar_chave("programa", "outra", *argumentos)
+    assert chave != CacheResultados.gerar_chave("programa", "assinatura", {"A": 2}, [0] * 4, 100)
+    assert chave != CacheResultados.gerar_chave("programa", "assinatura", {"A": 1}, [0] * 4, 99)
+
+    monkeypatch.setattr(memoizacao, "VERSAO_RESULTADOS", memoizacao.VERSAO_RESULTADOS + 1)
+    assert chave != CacheResultados.gerar_chave("programa", "assinatura", *argumentos)
+
+
+def test_resultado_memoizado_igual_ao_executado(tmp_path):
+    assert programa_deterministico(carregar(CODIGO))
+    assert not programa_deterministico(carregar("INT 1, A\nHALT"))
+
+    sem_cache = ServidorInterpretador().executar_requisicao({"codigo": CODIGO})
+    diretorio = str(tmp_path / "resultados")
+    for _ in range(2):
+        # o segundo servidor lê o resultado do disco
+        resultados = CacheResultados(diretorio=diretorio)
+        servidor = ServidorInterpretador(resultados=resultados)
+        for _ in range(2):
+            resposta = servidor.executar_requisicao({"codigo": CODIGO})
+            for campo in ("registradores", "memoria", "linha_codigo", "saida"):
+                assert resposta[campo] == sem_cache[campo]
+    assert resultados.acertos_disco == 1
+    assert len(os.listdir(diretorio)) == 1
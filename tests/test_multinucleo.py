@@ -0,0 +1,106 @@
+"Vários núcleos com memória compartilhada: CAS, FADD e BARREIRA"
+
+import multiprocessing
+import os
+
+import pytest
+
+from conftest import carregar
+from interpretador_assembly import multinucleo
+from interpretador_assembly.erros.nucleo_interrompido_error import NucleoInterrompidoError
+from interpretador_assembly.multinucleo import executar_multinucleo
+
+NUCLEOS = 4
+REPETICOES = 1000
+
+CONTADOR_FADD = f"""\
+VAR contador, 10
+    MOVE B, 0
+laco: FADD A, contador, 1
+    ADD B, 1
+    CMP B, {REPETICOES}
+    JFALSE laco
+    HALT
+"""
+
+# seção crítica com trava feita com CAS: o incremento não é atômico
+CONTADOR_CAS = f"""\
+VAR trava, 20
+VAR contador, 21
+    MOVE B, 0
+laco: CAS trava, 0, 1
+    JFALSE laco
+    MOVE A, contador
+    ADD A, 1
+    MOVE contador, A
+    MOVE trava, 0
+    ADD B, 1
+    CMP B, {REPETICOES}
+    JFALSE laco
+    HALT
+"""
+
+
+def test_fadd_atomico():
+    resultado = executar_multinucleo(CONTADOR_FADD, NUCLEOS)
+    assert [nucleo["erro"] for nucleo in resultado["nucleos"]] == [None] * NUCLEOS
+    assert resultado["memoria"][10] == NUCLEOS * REPETICOES
+
+
+def test_trava_com_cas():
+    resultado = executar_multinucleo(CONTADOR_CAS, NUCLEOS)
+    assert [nucleo["erro"] for nucleo in resultado["nucleos"]] == [None] * NUCLEOS
+    assert resultado["memoria"][21] == NUCLEOS * REPETICOES
+    assert resultado["memoria"][20] == 0
+
+
+def test_barreira():
+    # cada núcleo escreve a sua célula e, depois da barreira, soma as dos outros
+    variaveis = "".join(f"VAR c{indice}, {30 + indice}\n" for indice in range(NUCLEOS))
+    soma = "".join(f"ADD A, c{indice}\n" for indice in range(NUCLEOS))
+    codigos = [f"{variaveis}MOVE c{indice}, {indice + 1}\nBARREIRA\nMOVE A, 0\n{soma}HALT"
+               for indice in range(NUCLEOS)]
+    resultado = executar_multinucleo(codigos, NUCLEOS)
+    assert [nucleo["registradores"]["A"] for nucleo in resultado["nucleos"]] == \
+        [NUCLEOS * (NUCLEOS + 1) // 2] * NUCLEOS
+    assert [nucleo["registradores"]["NUCLEO"] for nucleo in resultado["nucleos"]] == \
+        list(range(NUCLEOS))
+
+
+def test_erro_num_nucleo_libera_a_barreira():
+    codigos = ["laco: JUMP laco", "BARREIRA\nHALT"]
+    resultado = executar_multinucleo(codigos, 2, limite_instrucoes=1000,
+                                     tempo_limite_barreira=30)
+    erros = [nucleo["erro"]["tipo"] for nucleo in resultado["nucleos"]]
+    assert erros == ["LimiteExecucaoError", "BrokenBarrierError"]
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                    reason="the patched function only reaches the core with fork")
+def test_nucleo_morto_sem_resultado(monkeypatch):
+    executar_nucleo = multinucleo.executar_nucleo
+
+    def morrer_no_nucleo_1(indice, *argumentos):
+        if indice == 1:
+            os._exit(3)
+        executar_nucleo(indice, *argumentos)
+
+    # o núcleo 0 fica na barreira até o núcleo 1 ser dado como morto
+    monkeypatch.setattr(multinucleo, "executar_nucleo", morrer_no_nucleo_1)
+    with pytest.raises(NucleoInterrompidoError, match="core 1 exited with code 3"):
+        executar_multinucleo("BARREIRA\nHALT", 2)
+
+
+def test_um_codigo_por_nucleo():
+    with pytest.raises(ValueError):
+        executar_multinucleo(["HALT"], 2)
+
+
+def test_atomicas_sem_varios_nucleos():
+    interpretador = carregar("VAR x, 5\nMOVE x, 3\nCAS x, 3, 7\nMOVE B, CP\n"
+                             "CAS x, 3, 9\nFADD A, x, 2\nBARREIRA\nHALT")
+    interpretador.executar_codigo()
+    assert interpretador.memory[5] == 9
+    assert interpretador.registers["A"] == 7
+    assert interpretador.registers["B"] == 1
+    assert interpretador.registers["CP"] == 0
@@ -0,0 +1,160 @@
+"Protocolo do modo servidor"
+
+import io
+import json
+import socket
+import threading
+
+import pytest
+
+from interpretador_assembly.memoizacao import CacheResultados
+from interpretador_assembly.servidor import CacheProgramas, ServidorInterpretador
+
+LACO_INFINITO = "laco: JUMP laco"
+
+
+def requisitar(servidor, **requisicao):
+    return json.loads(servidor.processar_linha(json.dumps(requisicao)))
+
+
+def test_execucao_e_cache():
+    servidor = ServidorInterpretador()
+    codigo = "MOVE A, 1\nADD A, B\nINT 2, A\nHALT"
+
+    primeira = requisitar(servidor, id=1, codigo=codigo, registradores={"B": 64})
+    segunda = requisitar(servidor, id=2, codigo=codigo, registradores={"B": 65})
+
+    assert (primeira["id"], primeira["ok"], primeira["cache"]) == (1, True, "falha")
+    assert primeira["registradores"]["A"] == 65
+    assert primeira["saida"] == ["A"]
+    assert (segunda["cache"], segunda["registradores"]["A"]) == ("acerto", 66)
+
+
+def test_entrada_memoria_e_estatisticas(codigo_exemplo):
+    servidor = ServidorInterpretador()
+    resposta = requisitar(servidor, codigo=codigo_exemplo, entrada="3\n", estatisticas=True)
+    assert resposta["saida"] == ["&"]
+    assert resposta["estatisticas"]["chamadas_int"] == 2
+
+    resposta = requisitar(servidor, codigo="MOVE A, 3\nHALT", memoria={"2": 9})
+    assert resposta["memoria"][2] == 9
+
+
+def test_tempos_so_da_requisicao():
+    servidor = ServidorInterpretador()
+    primeira = requisitar(servidor, codigo="MOVE A, 3\nHALT", estatisticas=True)
+    segunda = requisitar(servidor, codigo="MOVE A, 3\nHALT", estatisticas=True)
+    assert set(primeira["estatisticas"]["tempos"]) == {"validacao", "carregamento", "execucao"}
+    assert (segunda["cache"], set(segunda["estatisticas"]["tempos"])) == ("acerto", {"execucao"})
+
+
+def test_erros():
+    servidor = ServidorInterpretador()
+    assert requisitar(servidor, id=3, codigo="MOVE 1A, 2")["erro"]["tipo"] == "LexicalError"
+    resposta = json.loads(servidor.processar_linha("não é json"))
+    assert resposta["ok"] is False and resposta["id"] is None
+    resposta = requisitar(servidor, codigo="INT 1, 0\nHALT")
+    assert resposta["erro"]["tipo"] == "EOFError"
+
+
+@pytest.mark.parametrize("memoria", [[0] * 257, {"256": 1}, {"-1": 1}, {"x": 1}, "0"])
+def test_memoria_fora_da_memoria(memoria):
+    servidor = ServidorInterpretador()
+    resposta = requisitar(servidor, codigo="HALT", memoria=memoria)
+    assert (resposta["ok"], resposta["erro"]["tipo"]) == (False, "RequisicaoInvalidaError")
+    assert len(requisitar(servidor, codigo="HALT", memoria=[1] * 256)["memoria"]) == 256
+
+
+def test_limite_padrao():
+    servidor = ServidorInterpretador(limite_instrucoes=1000)
+    resposta = requisitar(servidor, codigo=LACO_INFINITO)
+    assert resposta["erro"]["tipo"] == "LimiteExecucaoError"
+    assert "1000" in resposta["erro"]["mensagem"]
+
+    resposta = requisitar(servidor, codigo=LACO_INFINITO, limites={"instrucoes": 10})
+    assert "10 " in resposta["erro"]["mensagem"]
+
+
+def test_memoizacao_e_despejo():
+    servidor = ServidorInterpretador(resultados=CacheResultados())
+    codigo = "PREENCHER 4, 7, 2\nHALT"
+    primeira = requisitar(servidor, codigo=codigo, despejo={"nao_zero": True, "fim": 100})
+    segunda = requisitar(servidor, codigo=codigo, despejo={"nao_zero": True, "fim": 100})
+    assert "memoizado" not in primeira
+    assert segunda["memoizado"] is True
+    assert primeira["memoria"] == segunda["memoria"] == {"4": 7, "5": 7}
+
+    estatisticas = requisitar(servidor, comando="estatisticas")
+    assert estatisticas["resultados"]["acertos"] == 1
+
+
+def test_cache_programas_lru():
+    cache = CacheProgramas(max_programas=2, max_bytes=100)
+    for chave in "abc":
+        cache.adicionar(chave, {"bytes": 10})
+    assert list(cache.programas) == ["b", "c"]
+    cache.adicionar("d", {"bytes": 95})
+    assert list(cache.programas) == ["d"]
+    cache.adicionar("e", {"bytes": 101})
+    assert "e" not in cache.programas
+
+
+def test_atender():
+    saida = io.StringIO()
+    entrada = io.StringIO('{"id": 1, "codigo": "HALT"}\n\n{"comando": "estatisticas"}\n')
+    ServidorInterpretador().atender(entrada, saida)
+    respostas = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+    assert [resposta["ok"] for resposta in respostas] == [True, True]
+
+
+@pytest.fixture
+def servidor_socket(tmp_path):
+    caminho = str(tmp_path / "servidor.sock")
+    servidor = ServidorInterpretador(limite_instrucoes=200_000)
+    servidor_socket = servidor.criar_servidor_socket(caminho)
+    thread = threading.Thread(target=servidor_socket.serve_forever, daemon=True)
+    thread.start()
+    yield caminho
+    servidor_socket.shutdown()
+    servidor_socket.server_close()
+
+
+def conectar(caminho):
+    conexao = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conexao.settimeout(10)
+    conexao.connect(caminho)
+    return conexao, conexao.makefile("rw", encoding="utf-8")
+
+
+def test_conexao_aberta_nao_bloqueia_outras(servidor_socket):
+    parada, _ = conectar(servidor_socket)
+    conexao, arquivo = conectar(servidor_socket)
+    try:
+        arquivo.write(json.dumps({"id": 1, "codigo": "MOVE A, 2\nHALT"}) + "\n")
+        arquivo.flush()
+        assert json.loads(arquivo.readline())["registradores"]["A"] == 2
+    finally:
+        conexao.close()
+        parada.close()
+
+
+def test_conexoes_simultaneas(servidor_socket):
+    respostas = {}
+
+    def cliente(numero):
+        conexao, arquivo = conectar(servidor_socket)
+        with conexao:
+            for repeticao in range(5):
+                codigo = f"MOVE A, {numero}\nlaco: ADD A, 1\nCMP A, {numero + 50}\nJFALSE laco\nHALT"
+                arquivo.write(json.dumps({"id": repeticao, "codigo": codigo}) + "\n")
+                arquivo.flush()
+                resposta = json.loads(arquivo.readline())
+                respostas.setdefault(numero, []).append(resposta["registradores"]["A"])
+
+    threads = [threading.Thread(target=cliente, args=(numero,)) for numero in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert respostas == {numero: [numero + 50] * 5 for numero in range(8)}
@@ -0,0 +1,57 @@
+"Teste diferencial: motores que concordam e a busca pela primeira divergência"
+
+from interpretador_assembly import teste_diferencial
+from interpretador_assembly.teste_diferencial import (MOTORES, comparar_motores, estados_iguais,
+                                                      executar_motor, motor_referencia,
+                                                      motor_servidor)
+
+CODIGO = """\
+    VAR total, 3
+    MOVE A, 0
+    MOVE B, 0
+laco: ADD A, 1
+    INT 1, 30
+    CMP A, 5
+    JFALSE laco
+    ADD B, 7
+    MOVE total, B
+    CARREGARTEXTO 8, "fim: a--b"
+    INT 2, total
+    HALT
+"""
+
+
+def motor_quebrado(codigo):
+    "Referência com uma instrução errada"
+    return motor_referencia(codigo.replace("ADD B, 7", "ADD B, 8"))
+
+
+def test_motores_concordam():
+    assert comparar_motores(CODIGO, entrada="1\n2\n3\n4\n5") is None
+    assert comparar_motores(CODIGO, {"registradores": {"D": 4}, "memoria": {"20": 9}},
+                            entrada="1\n2\n3\n4\n5", limite_instrucoes=10) is None
+    assert set(MOTORES) >= {"depurador", "historico", "servidor"}
+    assert teste_diferencial.testar_aleatorio(15, semente=5) == []
+
+
+def test_divergencia_forcada():
+    motores = {"referencia": motor_referencia, "quebrado": motor_quebrado}
+    divergencia = comparar_motores(CODIGO, entrada="1\n2\n3\n4\n5", motores=motores)
+
+    # 3 instruções antes do laço, 4 por volta, e o ADD B é a 24ª
+    assert divergencia["passo"] == 24
+    assert divergencia["motores"] == ["referencia", "quebrado"]
+    assert divergencia["instrucao"] == {"referencia": "ADD B, 7", "quebrado": "ADD B, 8"}
+    estados = divergencia["estados"]
+    assert (estados["referencia"]["registradores"]["B"],
+            estados["quebrado"]["registradores"]["B"]) == (7, 8)
+
+
+def test_saida_do_servidor_so_sem_erro():
+    codigo = "MOVE A, 1\nINT 2, A\nlaco: JUMP laco"
+    estado = executar_motor(motor_servidor, codigo, limite_instrucoes=50)
+    assert estado["limite"] and estado["saida"] is None
+    assert estados_iguais(estado, executar_motor(motor_referencia, codigo, limite_instrucoes=50))
+
+    estado = executar_motor(motor_servidor, "MOVE A, 65\nINT 2, A\nHALT")
+    assert estado["saida"] == ["A"]
@@ -0,0 +1,153 @@
+"Validação incremental comparada com a validação do código inteiro"
+
+import random
+
+import pytest
+
+from conftest import carregar
+from interpretador_assembly.interpretador_assembly import InterpretadorAssembly, remover_comentario
+from interpretador_assembly.validacao_incremental import ERROS_VALIDACAO, ValidadorIncremental
+
+LINHAS_POSSIVEIS = [
+    "MOVE A, 1", "ADD A, 2", "CMP A, 10", "JTRUE fim", "JFALSE laco", "JUMP meio",
+    "laco: ADD B, 1", "fim: HALT", "meio:", "-- comentário", "", "MOVE 1A, 2",
+    "ADD A", "HALT", "VAR x, 3", "MOVE x, A", 'CARREGARTEXTO 2, "a: b -- c"',
+    'laco: CARREGARTEXTO 2, "fim:"  -- "x"', "fim HALT", "x HALT",
+]
+
+
+def resumo(erros):
+    # a mensagem tem o número da linha de quando o erro foi encontrado
+    return [(numero, type(erro).__name__) for numero, erro in erros]
+
+
+def estado(validador):
+    return (resumo(validador.diagnosticos()), validador.labels,
+            validador.interpretador.instrucoes, validador.linhas)
+
+
+def novo_validador(codigo):
+    return ValidadorIncremental(InterpretadorAssembly(), codigo)
+
+
+def executado(interpretador):
+    "Estado depois de executar, com o tipo do erro que parou a execução"
+    try:
+        interpretador.executar_codigo(200)
+        erro = None
+    except Exception as erro_execucao:  # pylint: disable=broad-except
+        erro = type(erro_execucao).__name__
+    return erro, interpretador.registers, interpretador.memory
+
+
+def comparar_com_validar_tudo(validador, codigo):
+    "Compara com ``executar_validacao()`` e ``carregar_codigo()`` num interpretador novo"
+    completo = InterpretadorAssembly()
+    try:
+        completo.executar_validacao(codigo)
+        completo.carregar_codigo(codigo)
+        erro = None
+    except ERROS_VALIDACAO as erro_completo:
+        erro = type(erro_completo).__name__
+
+    # a validação completa para no primeiro erro léxico ou sintático, \
+    #   e os erros de label só aparecem depois, no carregar_codigo()
+    erros = [tipo for _, tipo in resumo(validador.diagnosticos())]
+    sintaticos = [tipo for tipo in erros if tipo != "SemanticError"]
+    assert erro == (sintaticos or erros or [None])[0]
+    if erro is not None:
+        return
+
+    # o carregar_codigo() pula as linhas vazias
+    validador.preparar_execucao()
+    interpretador = validador.interpretador
+    indices = [numero for numero, linha in enumerate(validador.linhas)
+               if remover_comentario(linha).strip()]
+    assert [interpretador.instrucoes[numero] for numero in indices] == completo.instrucoes
+    assert {label: indices.index(numero) for label, numero in interpretador.labels.items()} \
+        == completo.labels
+    assert executado(interpretador) == executado(completo)
+
+
+@pytest.mark.parametrize("semente", range(20))
+def test_edicoes_aleatorias_iguais_a_validar_tudo(semente):
+    gerador = random.Random(semente)
+    linhas = [gerador.choice(LINHAS_POSSIVEIS) for _ in range(15)]
+    validador = novo_validador("\n".join(linhas))
+
+    for _ in range(40):
+        operacao = gerador.choice(["inserir", "remover", "substituir"])
+        if operacao == "remover" and len(linhas) > 1:
+            numero = gerador.randrange(len(linhas))
+            validador.remover_linha(numero)
+            del linhas[numero]
+        elif operacao == "inserir":
+            numero = gerador.randrange(len(linhas) + 1)
+            texto = gerador.choice(LINHAS_POSSIVEIS)
+            validador.inserir_linha(numero, texto)
+            linhas.insert(numero, texto)
+        else:
+            numero = gerador.randrange(len(linhas))
+            texto = gerador.choice(LINHAS_POSSIVEIS)
+            validador.substituir_linha(numero, texto)
+            linhas[numero] = texto
+
+        assert estado(validador) == estado(novo_validador("\n".join(linhas)))
+        # executa entre as edições: o VAR deixa labels e variáveis no interpretador
+        comparar_com_validar_tudo(validador, "\n".join(linhas))
+
+
+def test_aplicar_edicoes_retorna_numeros_finais():
+    validador = novo_validador("MOVE A, 1\nJTRUE fim\nHALT")
+    afetadas = validador.aplicar_edicoes([
+        ("substituir", 1, "JTRUE fim"),
+        ("inserir", 0, "MOVE 1A, 2"),
+        ("inserir", 0, "-- topo"),
+        ("inserir", 5, "fim: HALT"),
+    ])
+    assert [(numero, erro is None) for numero, erro in afetadas] == [
+        (0, True), (1, False), (3, True), (5, True)]
+
+
+def test_execucao_igual_a_carregar_tudo(codigo_exemplo):
+    linhas = codigo_exemplo.split("\n")
+    validador = novo_validador("\n".join(linhas[:10]))
+    for numero, linha in enumerate(linhas[10:], 10):
+        validador.inserir_linha(numero, linha)
+
+    validador.preparar_execucao()
+    interpretador = validador.interpretador
+    interpretador.entrada = lambda: "3"
+    interpretador.saida = lambda texto: None
+    interpretador.executar_codigo()
+
+    completo = carregar(codigo_exemplo, ["3"])
+    completo.executar_codigo()
+    assert interpretador.registers == completo.registers
+    assert interpretador.memory == completo.memory
+
+
+def test_edicao_no_fim_nao_renumera():
+    validador = novo_validador("\n".join(["MOVE A, 1"] * 2000 + ["fim: HALT"]))
+    validador.substituir_linha(1999, "JTRUE fim")
+    validador.inserir_linha(2001, "JUMP fim")
+    assert validador.desatualizados_a_partir == 2001
+    assert validador.diagnosticos() == []
+
+
+def test_erro_de_label_some_quando_label_aparece():
+    validador = novo_validador("JTRUE fim\nHALT")
+    assert resumo(validador.diagnosticos())[0][:2] == (0, "SemanticError")
+    assert validador.inserir_linha(2, "fim: HALT") == [(0, None), (2, None)]
+    assert validador.diagnosticos() == []
+
+
+def test_validacao_depois_de_executar():
+    # "fim HALT" é erro mesmo com a label fim e a execução anterior no interpretador
+    validador = novo_validador("fim: HALT\nHALT\nVAR x, 3")
+    validador.preparar_execucao()
+    validador.interpretador.executar_codigo()
+    assert resumo(validador.substituir_linha(1, "fim HALT")) == [(1, "SyntaxError")]
+    assert resumo(validador.substituir_linha(1, "x HALT")) == [(1, "SyntaxError")]
+    with pytest.raises(SyntaxError):
+        InterpretadorAssembly().executar_validacao("fim: HALT\nfim HALT\nVAR x, 3")
@@ -0,0 +1,51 @@
+"Metadados dos mnemônicos: plugins com declarações inválidas são recusados"
+
+import pytest
+
+from interpretador_assembly import mnemonicos
+from interpretador_assembly.erros.mnemonico_invalido_error import MnemonicoInvalidoError
+from interpretador_assembly.interpretador_assembly import InterpretadorAssembly
+from interpretador_assembly.modelos.mnemonico import Mnemonico
+
+
+def criar_plugin(**metadados):
+    "Mnemônico NOP válido, com os ``metadados`` trocados"
+
+    class NOP(Mnemonico):
+        def __init__(self):
+            super().__init__()
+            self.parametros = [{"nome": "destino", "tipos_permitidos": ["label"]}]
+            self.leituras = []
+            self.escritas = []
+            self.efeitos = []
+            for nome, valor in metadados.items():
+                setattr(self, nome, valor)
+
+        def executar(self, interpretador_assembly, params:list):
+            pass
+
+    return NOP
+
+
+def test_plugin_valido_e_puro(monkeypatch):
+    monkeypatch.setattr(mnemonicos, "NOP", criar_plugin(), raising=False)
+    interpretador = InterpretadorAssembly()
+    assert interpretador.mnemonicos["NOP"].puro
+    assert interpretador.mnemonicos["ADD"].puro
+    assert not any(interpretador.mnemonicos[nome].puro for nome in ("INT", "JUMP", "HALT"))
+
+
+@pytest.mark.parametrize("metadados, mensagem", [
+    ({"efeitos": ["teletransporte"]}, "unknown effects"),
+    ({"custo": 1.5}, "custo"),
+    ({"custo": "2"}, "custo"),
+    ({"custo": True}, "custo"),
+    ({"desvio": "incondicional", "parametros": []}, "first parameter of a branch"),
+    ({"desvio": "sempre"}, "unknown desvio"),
+    ({"parametros": [{"nome": "x", "tipos_permitidos": ["ponteiro"]}]}, "parameter types"),
+    ({"escritas": ["outro"]}, "not a parameter or a register"),
+])
+def test_plugin_invalido_recusado(monkeypatch, metadados, mensagem):
+    monkeypatch.setattr(mnemonicos, "NOP", criar_plugin(**metadados), raising=False)
+    with pytest.raises(MnemonicoInvalidoError, match=f"mnemonic 'NOP': .*{mensagem}"):
+        InterpretadorAssembly()